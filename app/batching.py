@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collect items from concurrent callers into batches for one function call.
+
+    A batch is dispatched when ``max_batch_size`` items are queued or
+    ``max_wait_ms`` has passed since the oldest queued item arrived. ``fn``
+    runs in the default executor so the event loop keeps accepting work
+    while a batch is being processed; results are scattered back to each
+    caller's futures in order.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[list[T]], Sequence[R]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+    ) -> None:
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: asyncio.Queue | None = None
+        self._arrived: asyncio.Event | None = None
+        self._worker: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._batches = 0
+        self._items = 0
+        self._fill_total = 0.0
+        self._delays: deque[float] = deque(maxlen=1000)
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._arrived = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def submit_many(self, items: Sequence[T]) -> list[R]:
+        """Queue several items and wait for all of their results."""
+        if not items:
+            return []
+        queue = self._ensure_started()
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        futures = []
+        for item in items:
+            fut = loop.create_future()
+            queue.put_nowait((item, fut, now))
+            futures.append(fut)
+        self._arrived.set()
+        return list(await asyncio.gather(*futures))
+
+    async def submit(self, item: T) -> R:
+        return (await self.submit_many([item]))[0]
+
+    async def _run(self) -> None:
+        queue = self._queue
+        arrived = self._arrived
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = batch[0][2] + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Wait for a wake-up rather than wait_for(queue.get()): on 3.11 a
+                # get() that completes as the timeout fires loses its item.
+                arrived.clear()
+                try:
+                    await asyncio.wait_for(arrived.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+            started = time.monotonic()
+            self._batches += 1
+            self._items += len(batch)
+            self._fill_total += len(batch) / self.max_batch_size
+            self._delays.extend(started - enqueued for _, _, enqueued in batch)
+
+            try:
+                results = await loop.run_in_executor(None, self.fn, [item for item, _, _ in batch])
+            except Exception as exc:
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+            for (_, fut, _), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    async def stop(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    def stats(self) -> dict:
+        delays = sorted(self._delays)
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "mean_fill_ratio": round(self._fill_total / self._batches, 4) if self._batches else 0.0,
+            "mean_queue_delay_ms": round(1000 * sum(delays) / len(delays), 3) if delays else 0.0,
+            "p95_queue_delay_ms": round(1000 * delays[int(0.95 * (len(delays) - 1))], 3) if delays else 0.0,
+        }
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.config import settings
+from app.schemas import Span
+
+# Rough per-object overhead of a cached Span (pydantic model + field values)
+_SPAN_OVERHEAD = 400
+
+
+@dataclass(frozen=True)
+class CachedResult:
+    """Extracted text and final merged spans for one (upload, model) pair."""
+
+    text: str
+    spans: tuple[Span, ...]
+    sources_used: tuple[str, ...]
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.text) + sum(
+            _SPAN_OVERHEAD + sys.getsizeof(span.text) for span in self.spans
+        )
+
+
+class ResultCache:
+    """LRU of redaction results bounded by an approximate byte budget.
+
+    Entries are keyed on the upload's SHA-256, its document kind (the same
+    bytes extract differently as PDF and as text), the detector model and
+    PIPELINE_VERSION, so a repeat upload can skip extraction and detection
+    and go straight to masking. Only unmasked text and spans are kept; the
+    token map is regenerated for every request. That text is plaintext PII,
+    so entries also expire ``ttl_sec`` after they were stored, like the
+    documents in storage.
+    """
+
+    def __init__(self, max_bytes: int, ttl_sec: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        # key -> (result, size, stored at monotonic time)
+        self._entries: OrderedDict[str, tuple[CachedResult, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(digest: str, model: str, kind: str) -> str:
+        return f"{settings.PIPELINE_VERSION}:{model}:{kind}:{digest}"
+
+    def get(self, key: str) -> CachedResult | None:
+        if self.max_bytes <= 0:
+            return None
+        item = self._entries.get(key)
+        if item is not None and time.monotonic() - item[2] > self.ttl_sec:
+            self._drop(key)
+            item = None
+        if item is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return item[0]
+
+    def put(self, key: str, result: CachedResult) -> None:
+        size = result.nbytes()
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (result, size, time.monotonic())
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+            self._evictions += 1
+
+    def _drop(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def purge_expired(self) -> int:
+        """Drop every entry older than ``ttl_sec``; returns how many were removed."""
+        cutoff = time.monotonic() - self.ttl_sec
+        expired = [key for key, (_, _, stored_at) in self._entries.items() if stored_at < cutoff]
+        for key in expired:
+            self._drop(key)
+        return len(expired)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+result_cache = ResultCache(
+    settings.RESULT_CACHE_MAX_BYTES,
+    min(settings.RESULT_CACHE_TTL_SEC or settings.DOC_TTL_SEC, settings.DOC_TTL_SEC),
+)
@@ -8,6 +8,69 @@ class Settings(BaseSettings):
     DOC_TTL_SEC: int = 3600  # default: 1 hour
     GEMINI_API_KEY: str = ""
 
+    # Document storage: "memory" (process-local) or "sqlite" (WAL, survives restarts)
+    STORAGE_BACKEND: str = "memory"
+    STORAGE_MAX_BYTES: int = 512 * 1024 * 1024  # memory backend LRU budget; 0 = unbounded
+    STORAGE_COMPRESS_LEVEL: int = 6  # zlib level for masked text and audits at rest
+    STORAGE_TEXT_CACHE_BYTES: int = 32 * 1024 * 1024  # recently decompressed texts kept for /chat
+    STORAGE_SQLITE_PATH: str = "data/documents.sqlite3"
+    # uvicorn worker count (also uvicorn's --workers default); >1 needs the sqlite backend and FERNET_KEY
+    WEB_CONCURRENCY: int = 1
+
+    # Upload ingestion
+    MAX_UPLOAD_BYTES: int = 512 * 1024 * 1024
+    INGEST_CHUNK_SIZE: int = 1024 * 1024
+    INGEST_SPOOL_MAX_MEMORY: int = 8 * 1024 * 1024  # larger uploads spill to a temp file
+    TXT_SNIFF_BYTES: int = 64 * 1024  # prefix used to detect the charset of text uploads
+    PDF_EXTRACT_WORKERS: int = 0  # process pool size for page extraction; 0 = CPU count / WEB_CONCURRENCY
+    PDF_PARALLEL_MIN_PAGES: int = 32  # smaller PDFs are extracted inline
+
+    # CPU-bound stages (PDF parsing, decoding, regex, merge, mask, encrypt): "thread", "process" or "inline"
+    OFFLOAD_EXECUTOR: str = "thread"
+    OFFLOAD_WORKERS: int = 0  # 0 = CPU count / WEB_CONCURRENCY
+    OFFLOAD_MAX_PENDING: int = 256  # stages waiting for a worker before requests get 503
+    LOOP_LAG_INTERVAL_MS: float = 100.0  # event-loop lag sampling period (/metrics)
+
+    # POST /redaction/batch/{model}: files redacted at once, and files (or zip members) per request
+    BATCH_CONCURRENCY: int = 4
+    BATCH_MAX_FILES: int = 1000
+
+    # GET /download: gzip/br for bodies of at least this size, at this level
+    DOWNLOAD_COMPRESS_MIN_BYTES: int = 1024
+    DOWNLOAD_COMPRESS_LEVEL: int = 6
+
+    # POST /redaction/stream/{model}: progress polling period and masked text piece size
+    STREAM_PROGRESS_INTERVAL_MS: float = 100.0
+    STREAM_CHUNK_CHARS: int = 16 * 1024
+
+    # Background jobs (POST /jobs/{model}): worker tasks, queue bound, how long finished jobs stay pollable
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_MAX: int = 100
+    JOB_RETAIN_SEC: int = 3600
+
+    # Repeat uploads reuse extracted text + spans; bump PIPELINE_VERSION to invalidate
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 0 disables the cache
+    RESULT_CACHE_TTL_SEC: int = 0  # 0 = DOC_TTL_SEC; never longer than DOC_TTL_SEC
+    PIPELINE_VERSION: str = "1"
+
+    NER_MODEL_PATH: str = "models/ner.bin"
+    NER_MODEL_MMAP: bool = True  # share weights across workers via the page cache
+    NER_WARMUP: bool = False  # load the model at startup instead of on first request
+    NER_BATCH_MAX_SIZE: int = 64  # sentences per batched tagger call
+    NER_BATCH_MAX_WAIT_MS: float = 2.0  # how long the first queued sentence may wait
+
+    # Detectors run concurrently; NER/LLM still running after this are skipped (0 = wait for all)
+    DETECT_DEADLINE_SEC: float = 0.0
+
+    # LLM detection latency budget and circuit breaker
+    LLM_TIMEOUT_SEC: float = 30.0  # also the Gemini client's HTTP timeout
+    LLM_WORKERS: int = 8  # threads for LLM calls, separate from the default executor
+    LLM_HEDGE: bool = False  # fire a second request once the p95 latency has passed
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_SLOW_CALL_SEC: float = 15.0  # successful calls slower than this count as failures
+    LLM_BREAKER_THRESHOLD: int = 5
+    LLM_BREAKER_COOLDOWN_SEC: float = 60.0
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
 
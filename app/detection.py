@@ -0,0 +1,111 @@
+"""Run the detectors for a redaction model concurrently.
+
+Regex and the Korean name detector are CPU-bound and run in the offload
+executor; NER tags through the cross-request batcher (which also runs in
+the executor) and the LLM call is an async task of its own. All of them
+start at once, so a hybrid request takes about as long as its slowest
+detector instead of the sum of all three.
+
+``DETECT_DEADLINE_SEC`` caps how long the optional detectors (NER, LLM)
+may take. Detectors still running at the deadline are cancelled and
+recorded as ``<source>_skipped``, the same way an open LLM breaker is.
+Regex is never cut off: it is the baseline that catches structured PII,
+so its result is always waited for. An LLM call that runs out of its own
+budget (``LLM_TIMEOUT_SEC``) keeps the spans it had streamed in and is
+recorded as ``llm_partial``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+
+from app import llm_guard
+from app.config import settings
+from app.detectors import korean_name_detector, ner_detector, regex_detector
+from app.offload import offloader
+from app.schemas import JobProgress, Span
+
+log = logging.getLogger(__name__)
+
+# Sources per model, in the order they are reported in sources_used
+SOURCES = {
+    "regex": ("regex",),
+    "ner": ("ner",),
+    "gemini": ("llm",),
+    "hybrid": ("regex", "ner", "llm"),
+}
+
+
+async def _regex(text: str) -> list[Span]:
+    return await offloader.run(regex_detector.detect, text)
+
+
+async def _ner(text: str) -> list[Span]:
+    tagged, names = await asyncio.gather(
+        ner_detector.detect_async(text),
+        offloader.run(korean_name_detector.detect, text),
+    )
+    return tagged + names
+
+
+async def _llm(text: str) -> list[Span] | None:
+    # None means the breaker or budget skipped the call
+    return await llm_guard.detect(text)
+
+
+_RUNNERS = {"regex": _regex, "ner": _ner, "llm": _llm}
+
+
+def _report_done(progress: JobProgress, source: str, task: asyncio.Task) -> None:
+    """Record a finished detector in ``progress`` the way it will appear in sources_used.
+
+    Cancelled and failed detectors are left out; a skipped call (the LLM
+    guard returned None) is reported as ``<source>_skipped``.
+    """
+    if task.cancelled() or task.exception() is not None:
+        return
+    progress.detectors_done.append(_used(source, task.result()))
+
+
+def _used(source: str, spans: list[Span] | None) -> str:
+    if spans is None:
+        return f"{source}_skipped"
+    if isinstance(spans, llm_guard.PartialSpans):
+        return f"{source}_partial"
+    return source
+
+
+async def detect(model: str, text: str, progress: JobProgress | None = None) -> tuple[list[Span], list[str]]:
+    """Run every detector for ``model`` at once; return (unmerged spans, sources used)."""
+    sources = SOURCES[model]
+    tasks = {source: asyncio.ensure_future(_RUNNERS[source](text)) for source in sources}
+    if progress is not None:
+        for source, task in tasks.items():
+            task.add_done_callback(functools.partial(_report_done, progress, source))
+
+    try:
+        optional = [task for source, task in tasks.items() if source != "regex"]
+        if optional and settings.DETECT_DEADLINE_SEC > 0:
+            _, late = await asyncio.wait(optional, timeout=settings.DETECT_DEADLINE_SEC)
+            for task in late:
+                task.cancel()
+        # Regex is always awaited; without a deadline this waits for everything
+        await asyncio.wait(tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+
+    all_spans: list[Span] = []
+    sources_used: list[str] = []
+    for source, task in tasks.items():
+        if task.cancelled():
+            log.warning("%s detection missed the %.1fs deadline", source, settings.DETECT_DEADLINE_SEC)
+            sources_used.append(f"{source}_skipped")
+            continue
+        spans = task.result()
+        sources_used.append(_used(source, spans))
+        if spans is not None:
+            all_spans.extend(spans)
+    return all_spans, sources_used
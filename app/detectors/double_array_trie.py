@@ -0,0 +1,96 @@
+"""Static double-array trie over a small key set.
+
+Every node is a slot in two parallel int arrays: a transition from state
+``s`` on code ``c`` goes to ``t = base[s] + c`` and is valid only when
+``check[t] == s``. Characters are mapped to dense codes ``1..K``; code 0
+is the end-of-key marker, so a state is terminal when ``base[s] + 0``
+checks back to it.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator
+
+_END = 0
+
+
+class DoubleArrayTrie:
+    def __init__(self, keys: Iterable[str]) -> None:
+        unique = sorted(set(k for k in keys if k))
+        self.codes: dict[str, int] = {}
+        for key in unique:
+            for ch in key:
+                if ch not in self.codes:
+                    self.codes[ch] = len(self.codes) + 1
+        self.base = array("i", [0])
+        self.check = array("i", [-1])
+        self._build(unique)
+        self.size = len(unique)
+
+    def _ensure(self, n: int) -> None:
+        if n >= len(self.base):
+            grow = n + 1 - len(self.base)
+            self.base.extend([0] * grow)
+            self.check.extend([-1] * grow)
+
+    def _build(self, keys: list[str]) -> None:
+        root = 0
+        self.check[root] = root
+        if not keys:
+            return
+        # Each work item: (state, list of key suffixes reaching that state)
+        stack: list[tuple[int, list[str]]] = [(root, keys)]
+        next_free = 1
+        while stack:
+            state, suffixes = stack.pop()
+            children: dict[int, list[str]] = {}
+            for suffix in suffixes:
+                code = self.codes[suffix[0]] if suffix else _END
+                children.setdefault(code, []).append(suffix[1:] if suffix else "")
+            labels = sorted(children)
+
+            b = max(1, next_free - labels[0])
+            while True:
+                self._ensure(b + labels[-1])
+                if all(self.check[b + c] == -1 for c in labels):
+                    break
+                b += 1
+            self.base[state] = b
+            for c in labels:
+                self.check[b + c] = state
+            while next_free < len(self.check) and self.check[next_free] != -1:
+                next_free += 1
+
+            for c in labels:
+                if c != _END:
+                    stack.append((b + c, children[c]))
+
+    def _terminal(self, state: int) -> bool:
+        t = self.base[state] + _END
+        return t < len(self.check) and self.check[t] == state and t != state
+
+    def prefix_ends(self, text: str, pos: int, max_len: int | None = None) -> Iterator[int]:
+        """Yield end offsets of every key that is a prefix of ``text[pos:]``."""
+        state = 0
+        base, check, codes = self.base, self.check, self.codes
+        limit = len(text) if max_len is None else min(len(text), pos + max_len)
+        for i in range(pos, limit):
+            code = codes.get(text[i])
+            if code is None:
+                return
+            t = base[state] + code
+            if t >= len(check) or check[t] != state:
+                return
+            state = t
+            if self._terminal(state):
+                yield i + 1
+
+    def __contains__(self, key: str) -> bool:
+        return any(end == len(key) for end in self.prefix_ends(key, 0))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def nbytes(self) -> int:
+        return self.base.itemsize * len(self.base) + self.check.itemsize * len(self.check)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from app.detectors.double_array_trie import DoubleArrayTrie
+from app.schemas import Span
+
+# ---------- Lexicon ----------
+_SURNAMES = (
+    "김 이 박 최 정 강 조 윤 장 임 한 오 서 신 권 황 안 송 류 유 홍 전 고 문 양 손 배 백 허 "
+    "남 심 노 하 곽 성 차 주 우 구 민 진 지 엄 채 원 천 방 공 현 함 변 염 여 추 도 소 석 선 "
+    "설 마 길 연 위 표 명 기 반 왕 금 옥 육 인 맹 제 모 탁 국 어 은 편 용 예 봉 경 "
+    "남궁 황보 제갈 선우 독고 사공 서문 동방"
+).split()
+
+_GIVEN_NAMES = (
+    "민준 서준 도윤 예준 시우 하준 주원 지호 지후 준서 준우 현우 도현 지훈 건우 우진 선우 서진 민재 "
+    "현준 연우 유준 정우 승우 승현 시윤 준혁 은우 지환 승민 지우 유찬 윤우 민성 준영 시후 진우 지원 "
+    "수호 재윤 시현 동현 태윤 민찬 재원 민규 한결 성민 영수 철수 영호 영철 상철 성수 정호 동훈 상훈 "
+    "재석 재현 성진 경민 진호 태호 민호 준호 상우 영민 병철 광수 "
+    "서연 서윤 지우 서현 민서 하은 하윤 윤서 지유 지민 채원 지아 수아 다은 은서 예은 수빈 소율 예린 "
+    "지원 소윤 하린 유나 채은 가은 나연 예서 민지 수민 서영 지현 은지 혜진 수진 미경 정숙 영희 영자 "
+    "순자 미영 은영 현정 지영 소라 보람 슬기 하늘 유진 예진 민정 수연 지은 혜원 서희 은비 다인 "
+    "혁 준 민 훈 진 철 웅 건 결 솔 별 찬"
+).split()
+
+# Role words that typically precede a name ("대표이사: 김철수", "예금주 박영희")
+_ROLE_CUES = (
+    "성명", "이름", "성함", "대표이사", "대표자", "대표", "이사", "담당자", "담당", "매니저", "팀장",
+    "과장", "부장", "차장", "대리", "사원", "예금주", "배우자", "개발자", "작성자", "신청인", "고객",
+    "수신", "참조", "총괄", "재무팀", "법무팀", "위탁자", "수탁자", "계약자", "임차인", "임대인",
+)
+
+# Honorifics / titles / particles allowed right after a name
+_SUFFIX_CUES = (
+    "님", "씨", "선생님", "대표님", "대표", "이사", "사장", "부장", "과장", "팀장", "차장", "대리", "사원",
+    "교수", "변호사", "회계사", "고객",
+)
+_PARTICLES = (
+    "에게서", "으로서", "께서", "에게", "한테", "이고", "이며", "이다", "입니다", "와", "과", "의",
+    "은", "는", "이", "가", "을", "를", "도", "만", "로", "랑",
+)
+
+_surname_trie = DoubleArrayTrie(_SURNAMES)
+_given_trie = DoubleArrayTrie(_GIVEN_NAMES)
+_suffix_trie = DoubleArrayTrie(_SUFFIX_CUES + _PARTICLES)
+_honorific_trie = DoubleArrayTrie(_SUFFIX_CUES)
+
+_CUE_WINDOW = 12  # characters scanned before a candidate for a role word
+
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+
+def _right_boundary(text: str, end: int) -> tuple[bool, bool]:
+    """Return (is_word_boundary, has_honorific) for a candidate ending at ``end``."""
+    if end >= len(text):
+        return True, False
+    if not _is_hangul(text[end]):
+        # "김민 대리님": a title separated by one space
+        titled = text[end] == " " and any(
+            True for _ in _honorific_trie.prefix_ends(text, end + 1, max_len=4)
+        )
+        return True, titled
+    ends = list(_suffix_trie.prefix_ends(text, end, max_len=4))
+    honorific = any(True for _ in _honorific_trie.prefix_ends(text, end, max_len=4))
+    for e in ends:
+        if e >= len(text) or not _is_hangul(text[e]):
+            return True, honorific
+    # A particle or honorific followed by more Hangul (e.g. "박영희님께") still counts
+    return bool(ends), honorific
+
+
+def _has_role_cue(text: str, start: int) -> bool:
+    window = text[max(0, start - _CUE_WINDOW) : start]
+    window = window.rstrip(" :：\t()")
+    return any(window.endswith(cue) for cue in _ROLE_CUES)
+
+
+def detect(text: str) -> list[Span]:
+    """Single-pass Korean personal name detection over the surname/given-name tries.
+
+    A candidate is a surname followed by a common given name that starts
+    a Hangul word and ends at a word boundary, particle or honorific.
+    Three-syllable names are accepted on shape alone; two-syllable names
+    (surname + one syllable) need a role word or honorific as context.
+    """
+    spans: list[Span] = []
+    n = len(text)
+    i = 0
+    while i < n:
+        if not _is_hangul(text[i]) or (i > 0 and _is_hangul(text[i - 1])):
+            i += 1
+            continue
+
+        best: tuple[int, float] | None = None
+        for surname_end in _surname_trie.prefix_ends(text, i, max_len=2):
+            for end in _given_trie.prefix_ends(text, surname_end, max_len=2):
+                boundary, honorific = _right_boundary(text, end)
+                if not boundary:
+                    continue
+                cue = honorific or _has_role_cue(text, i)
+                if end - i < 3 and not cue:
+                    continue
+                confidence = 0.95 if cue else 0.8
+                if best is None or end > best[0]:
+                    best = (end, confidence)
+
+        if best is None:
+            i += 1
+            continue
+        end, confidence = best
+        spans.append(
+            Span(
+                start=i,
+                end=end,
+                type="PERSON",
+                text=text[i:end],
+                source="ner",
+                confidence=confidence,
+            )
+        )
+        i = end
+
+    return spans
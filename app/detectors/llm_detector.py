@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import logging
+from collections.abc import Iterable, Iterator
 
 from google import genai
 from google.genai import types
@@ -11,6 +12,8 @@ from app.schemas import Span
 
 log = logging.getLogger(__name__)
 
+_MODEL = "gemini-2.5-flash"
+
 _SYSTEM_PROMPT = """\
 You are a PII detection engine. Given a text, find all personally identifiable information spans.
 Return a JSON array of objects with these fields:
@@ -24,16 +27,115 @@ Return ONLY the JSON array, no other text.
 """
 
 
-def detect(text: str, pre_masked_spans: list[Span] | None = None) -> list[Span]:
-    """Use Gemini API to detect PII spans in text."""
-    if not settings.GEMINI_API_KEY:
-        log.warning("GEMINI_API_KEY not set, skipping LLM detection")
-        return []
+class SpanObjectParser:
+    """Incrementally extract span objects from a streamed JSON array.
+
+    Chunks are fed as they arrive; every top-level ``{...}`` inside the array
+    is decoded as soon as its closing brace is seen. Anything outside objects
+    (code fences, whitespace, commas, brackets) is ignored, so a truncated or
+    malformed tail only loses the objects it contains.
+    """
+
+    def __init__(self) -> None:
+        self._buf: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+
+    def feed(self, chunk: str) -> list[dict]:
+        items: list[dict] = []
+        for ch in chunk:
+            if not self._started:
+                # Skip everything (e.g. a ```json fence) until the array opens
+                if ch == "[":
+                    self._started = True
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._buf = [ch]
+                continue
+
+            self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    raw = "".join(self._buf)
+                    self._buf = []
+                    try:
+                        obj = json.loads(raw)
+                    except json.JSONDecodeError:
+                        log.warning("LLM returned invalid span object: %s", raw[:200])
+                        continue
+                    if isinstance(obj, dict):
+                        items.append(obj)
+        return items
+
+
+def _to_span(item: dict, text: str) -> Span | None:
+    """Validate a raw LLM item against the source text and build a Span."""
+    try:
+        start = int(item.get("start", 0))
+        end = int(item.get("end", 0))
+    except (TypeError, ValueError):
+        start = end = 0
+    expected_text = item.get("text", "")
+    if not isinstance(expected_text, str):
+        expected_text = ""
+
+    # Verify text[start:end] matches, attempt substring search if not
+    if text[start:end] != expected_text and expected_text:
+        idx = text.find(expected_text)
+        if idx >= 0:
+            start = idx
+            end = idx + len(expected_text)
+        else:
+            log.warning("LLM span text not found in source: %s", expected_text[:50])
+            return None
 
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
+    try:
+        confidence = float(item.get("confidence", 0.8))
+    except (TypeError, ValueError):
+        confidence = 0.8
+
+    return Span(
+        start=start,
+        end=end,
+        type=item.get("type", "UNKNOWN"),
+        text=text[start:end],
+        source="llm",
+        confidence=confidence,
+    )
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
+
+def parse_stream(chunks: Iterable[str], text: str) -> Iterator[Span]:
+    """Yield validated spans from an iterable of raw response chunks."""
+    parser = SpanObjectParser()
+    for chunk in chunks:
+        if not chunk:
+            continue
+        for item in parser.feed(chunk):
+            span = _to_span(item, text)
+            if span is not None:
+                yield span
+
+
+def _request(text: str) -> dict:
+    return dict(
+        model=_MODEL,
         contents=text,
         config=types.GenerateContentConfig(
             system_instruction=_SYSTEM_PROMPT,
@@ -42,46 +144,28 @@ def detect(text: str, pre_masked_spans: list[Span] | None = None) -> list[Span]:
         ),
     )
 
-    raw = response.text or "[]"
-    # Strip markdown code fences if present
-    raw = raw.strip()
-    if raw.startswith("```"):
-        raw = raw.split("\n", 1)[-1]
-    if raw.endswith("```"):
-        raw = raw.rsplit("```", 1)[0]
-    raw = raw.strip()
 
-    try:
-        items = json.loads(raw)
-    except json.JSONDecodeError:
-        log.error("LLM returned invalid JSON: %s", raw[:200])
-        return []
-
-    spans: list[Span] = []
-    for item in items:
-        start = item.get("start", 0)
-        end = item.get("end", 0)
-        expected_text = item.get("text", "")
-
-        # Verify text[start:end] matches, attempt substring search if not
-        if text[start:end] != expected_text and expected_text:
-            idx = text.find(expected_text)
-            if idx >= 0:
-                start = idx
-                end = idx + len(expected_text)
-            else:
-                log.warning("LLM span text not found in source: %s", expected_text[:50])
-                continue
+def detect(
+    text: str, pre_masked_spans: list[Span] | None = None, received: list[Span] | None = None
+) -> list[Span]:
+    """Use Gemini API to detect PII spans in text.
 
-        spans.append(
-            Span(
-                start=start,
-                end=end,
-                type=item.get("type", "UNKNOWN"),
-                text=text[start:end],
-                source="llm",
-                confidence=float(item.get("confidence", 0.8)),
-            )
-        )
+    The response is streamed and each span is parsed and validated as soon
+    as its object is complete. Spans are appended to ``received`` as they
+    arrive, so a caller that stops waiting still has the ones already in.
+    """
+    spans = [] if received is None else received
+    if not settings.GEMINI_API_KEY:
+        log.warning("GEMINI_API_KEY not set, skipping LLM detection")
+        return spans
+
+    # Bound the request itself: the caller's budget only abandons the thread
+    client = genai.Client(
+        api_key=settings.GEMINI_API_KEY,
+        http_options=types.HttpOptions(timeout=int(settings.LLM_TIMEOUT_SEC * 1000)),
+    )
 
+    response = client.models.generate_content_stream(**_request(text))
+    for span in parse_stream((chunk.text or "" for chunk in response), text):
+        spans.append(span)
     return spans
@@ -1,11 +1,118 @@
 from __future__ import annotations
 
+import logging
+import re
+import threading
+from pathlib import Path
+
+from app.batching import MicroBatcher
+from app.config import settings
+from app.detectors.perceptron import PerceptronTagger, spans_from_tags, tokenize
 from app.schemas import Span
 
+log = logging.getLogger(__name__)
 
-def detect(text: str) -> list[Span]:
-    """Stub NER detector. Returns empty list.
+# Lines are the unit of tagging; very long lines are cut at sentence ends.
+_SENTENCE_RE = re.compile(r"[^\n.!?。]+[.!?。]?")
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+_tagger: PerceptronTagger | None = None
+_load_attempted = False
+_load_lock = threading.Lock()
 
-    Replace with a HuggingFace NER model (e.g., klue/bert-base) in the future.
+
+def get_tagger() -> PerceptronTagger | None:
+    """Load the tagger from NER_MODEL_PATH on first use (None if absent).
+
+    The weights are memory-mapped read-only (NER_MODEL_MMAP), so uvicorn
+    workers share one copy through the OS page cache.
     """
-    return []
+    global _tagger, _load_attempted
+    if not _load_attempted:
+        with _load_lock:
+            if not _load_attempted:
+                path = Path(settings.NER_MODEL_PATH)
+                if not path.is_absolute():
+                    path = BASE_DIR / path
+                if path.exists():
+                    _tagger = PerceptronTagger.load(path, use_mmap=settings.NER_MODEL_MMAP)
+                else:
+                    log.warning("NER model not found at %s, NER detection disabled", path)
+                _load_attempted = True
+    return _tagger
+
+
+def warmup() -> None:
+    """Load the model and run one sentence so the first request pays no cold start."""
+    tagger = get_tagger()
+    if tagger is not None:
+        tagger.prefetch()
+        detect("Name: John Smith\n성명: 홍길동\nФИО: Иванов Иван Иванович")
+
+
+def split_sentences(text: str) -> list[tuple[int, list[tuple[str, int, int]]]]:
+    """Return (offset, tokens) per sentence; token offsets are absolute."""
+    sentences = []
+    for m in _SENTENCE_RE.finditer(text):
+        tokens = tokenize(m.group())
+        if tokens:
+            base = m.start()
+            sentences.append((base, [(w, s + base, e + base) for w, s, e in tokens]))
+    return sentences
+
+
+def _to_spans(text: str, tokens: list[tuple[str, int, int]], tags: list[str]) -> list[Span]:
+    return [
+        Span(start=s, end=e, type=etype, text=text[s:e], source="ner", confidence=0.85)
+        for s, e, etype in spans_from_tags(tokens, tags)
+    ]
+
+
+def detect_batch(texts: list[str]) -> list[list[Span]]:
+    """Tag several documents with a single batched tagger call."""
+    tagger = get_tagger()
+    if tagger is None:
+        return [[] for _ in texts]
+
+    per_doc = [[tokens for _, tokens in split_sentences(t)] for t in texts]
+    flat = [[w for w, _, _ in tokens] for doc in per_doc for tokens in doc]
+    tags = iter(tagger.tag_batch(flat))
+
+    results: list[list[Span]] = []
+    for text, doc in zip(texts, per_doc):
+        spans: list[Span] = []
+        for tokens in doc:
+            spans.extend(_to_spans(text, tokens, next(tags)))
+        results.append(spans)
+    return results
+
+
+def detect(text: str) -> list[Span]:
+    """Detect PERSON / ORG / LOCATION spans with the offline perceptron tagger."""
+    return detect_batch([text])[0]
+
+
+def _tag_sentences(sentences: list[list[str]]) -> list[list[str]]:
+    return get_tagger().tag_batch(sentences)
+
+
+# Shared across requests: sentences from concurrent /redaction calls are
+# tagged together in one batched call.
+batcher: MicroBatcher[list[str], list[str]] = MicroBatcher(
+    _tag_sentences,
+    max_batch_size=settings.NER_BATCH_MAX_SIZE,
+    max_wait_ms=settings.NER_BATCH_MAX_WAIT_MS,
+)
+
+
+async def detect_async(text: str) -> list[Span]:
+    """Like detect(), but tags sentences through the cross-request batcher."""
+    if get_tagger() is None:
+        return []
+    sentences = [tokens for _, tokens in split_sentences(text)]
+    tags = await batcher.submit_many([[w for w, _, _ in tokens] for tokens in sentences])
+    spans: list[Span] = []
+    for tokens, sentence_tags in zip(sentences, tags):
+        spans.extend(_to_spans(text, tokens, sentence_tags))
+    return spans
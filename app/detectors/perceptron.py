@@ -0,0 +1,318 @@
+"""Averaged-perceptron BIO tagger for PERSON / ORG / LOCATION.
+
+Features are hashed (crc32) into a fixed number of buckets, so a trained
+model is nothing more than a ``n_buckets x n_tags`` little-endian float32
+matrix plus a short header, which can be memory-mapped as-is. Inference
+is greedy left-to-right; per-word feature vectors are cached so repeated
+words only cost a few vector additions.
+"""
+
+from __future__ import annotations
+
+import mmap
+import random
+import re
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+TAGS = ("O", "B-PER", "I-PER", "B-ORG", "I-ORG", "B-LOC", "I-LOC")
+ENTITY_TYPES = {"PER": "PERSON", "ORG": "ORG", "LOC": "LOCATION"}
+
+DEFAULT_BUCKETS = 1 << 17
+
+_MAGIC = b"NERP"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHI")  # magic, version, n_tags, n_buckets
+
+# Hangul runs, Latin words (with inner apostrophe/hyphen), Cyrillic words,
+# digit runs, and single punctuation characters.
+_TOKEN_RE = re.compile(r"[가-힣]+|[A-Za-z][A-Za-z'\-]*|[А-Яа-яЁё][А-Яа-яЁё\-]*|\d+|\S")
+
+# Korean particles split off the end of a Hangul run, longest first.
+_PARTICLES = (
+    "에서는", "으로는", "에게는", "께서는",
+    "에서", "에게", "께서", "으로", "이며", "이고", "이다", "까지", "부터", "와의", "과의",
+    "의", "은", "는", "이", "가", "을", "를", "에", "와", "과", "로", "도", "만", "님", "씨",
+)
+_CACHE_LIMIT = 200_000
+
+
+def tokenize(text: str) -> list[tuple[str, int, int]]:
+    """Split text into (token, start, end), separating trailing Korean particles."""
+    tokens: list[tuple[str, int, int]] = []
+    for m in _TOKEN_RE.finditer(text):
+        word, start, end = m.group(), m.start(), m.end()
+        if len(word) >= 3 and "가" <= word[0] <= "힣":
+            for particle in _PARTICLES:
+                if word.endswith(particle) and len(word) - len(particle) >= 2:
+                    cut = end - len(particle)
+                    tokens.append((word[: -len(particle)], start, cut))
+                    tokens.append((particle, cut, end))
+                    break
+            else:
+                tokens.append((word, start, end))
+        else:
+            tokens.append((word, start, end))
+    return tokens
+
+
+def _shape(word: str) -> str:
+    out: list[str] = []
+    for ch in word:
+        if "A" <= ch <= "Z":
+            c = "A"
+        elif "a" <= ch <= "z":
+            c = "a"
+        elif ch.isdigit():
+            c = "d"
+        elif "가" <= ch <= "힣":
+            c = "H"
+        elif "А" <= ch <= "Я" or ch == "Ё":
+            c = "R"
+        elif "а" <= ch <= "я" or ch == "ё":
+            c = "r"
+        else:
+            c = ch
+        if len(out) < 2 or out[-1] != c or out[-2] != c:
+            out.append(c)
+    return "".join(out)
+
+
+def word_features(word: str) -> list[str]:
+    """Features that depend only on the token itself."""
+    lower = word.lower()
+    return [
+        "bias",
+        "w=" + lower,
+        "s1=" + lower[-1:],
+        "s2=" + lower[-2:],
+        "s3=" + lower[-3:],
+        "p1=" + lower[:1],
+        "p2=" + lower[:2],
+        "sh=" + _shape(word),
+        "len=" + str(min(len(word), 6)),
+    ]
+
+
+def context_features(prefix: str, word: str) -> list[str]:
+    """Features describing a neighbouring token at relative position ``prefix``."""
+    return [prefix + "w=" + word.lower(), prefix + "sh=" + _shape(word)]
+
+
+_PAD = "<pad>"
+_OFFSETS = ("-2", "-1", "+1", "+2")
+
+
+def _bucket(feature: str, n_buckets: int) -> int:
+    return zlib.crc32(feature.encode("utf-8")) % n_buckets
+
+
+class PerceptronTagger:
+    """Greedy averaged-perceptron sequence tagger with hashed features."""
+
+    def __init__(self, weights: Sequence[float] | None = None, n_buckets: int = DEFAULT_BUCKETS,
+                 tags: Sequence[str] = TAGS) -> None:
+        self.tags = tuple(tags)
+        self.n_tags = len(self.tags)
+        self.n_buckets = n_buckets
+        self.weights = weights if weights is not None else array("f", bytes(4 * n_buckets * self.n_tags))
+        self._cache: dict[str, list[float]] = {}
+        self._mmap: mmap.mmap | None = None
+        self._tag_rows = self._build_tag_rows()
+
+    # ---------- scoring ----------
+
+    def _row_sum(self, features: Iterable[str]) -> list[float]:
+        n = self.n_tags
+        w = self.weights
+        acc = [0.0] * n
+        for f in features:
+            base = _bucket(f, self.n_buckets) * n
+            for t in range(n):
+                acc[t] += w[base + t]
+        return acc
+
+    def _cached(self, key: str, features: list[str]) -> list[float]:
+        vec = self._cache.get(key)
+        if vec is None:
+            if len(self._cache) > _CACHE_LIMIT:
+                self._cache.clear()
+            vec = self._row_sum(features)
+            self._cache[key] = vec
+        return vec
+
+    def _build_tag_rows(self) -> dict[tuple[str, str], list[float]]:
+        rows: dict[tuple[str, str], list[float]] = {}
+        for p2 in self.tags + (_PAD,):
+            for p1 in self.tags + (_PAD,):
+                rows[(p2, p1)] = self._row_sum(("t-1=" + p1, "t-2t-1=" + p2 + "|" + p1))
+        return rows
+
+    def _static_vectors(self, words: Sequence[str]) -> list[list[float]]:
+        cache = self._cache
+        padded = [_PAD, _PAD, *words, _PAD, _PAD]
+        parts: list[list[list[float]]] = []
+        for off, rel in (("", 0), *zip(_OFFSETS, (-2, -1, 1, 2))):
+            column = []
+            for i in range(len(words)):
+                word = padded[i + 2 + rel]
+                key = off + "\x00" + word
+                vec = cache.get(key)
+                if vec is None:
+                    feats = word_features(word) if not off else context_features(off, word)
+                    vec = self._cached(key, feats)
+                column.append(vec)
+            parts.append(column)
+        return [
+            [a + b + c + d + e for a, b, c, d, e in zip(*vecs)]
+            for vecs in zip(*parts)
+        ]
+
+    def tag(self, words: Sequence[str]) -> list[str]:
+        if not words:
+            return []
+        tags = self.tags
+        out: list[str] = []
+        p2 = p1 = _PAD
+        for vec in self._static_vectors(words):
+            scores = [a + b for a, b in zip(vec, self._tag_rows[(p2, p1)])]
+            best = tags[max(range(self.n_tags), key=scores.__getitem__)]
+            out.append(best)
+            p2, p1 = p1, best
+        return out
+
+    def tag_batch(self, sentences: Sequence[Sequence[str]]) -> list[list[str]]:
+        return [self.tag(words) for words in sentences]
+
+    # ---------- training ----------
+
+    @staticmethod
+    def _all_features(words: Sequence[str], i: int, p2: str, p1: str) -> list[str]:
+        padded = [_PAD, _PAD, *words, _PAD, _PAD]
+        feats = word_features(words[i])
+        for off, rel in zip(_OFFSETS, (-2, -1, 1, 2)):
+            feats.extend(context_features(off, padded[i + 2 + rel]))
+        feats.append("t-1=" + p1)
+        feats.append("t-2t-1=" + p2 + "|" + p1)
+        return feats
+
+    @classmethod
+    def train(cls, examples: Sequence[tuple[Sequence[str], Sequence[str]]], epochs: int = 8,
+              n_buckets: int = DEFAULT_BUCKETS, seed: int = 0) -> PerceptronTagger:
+        """Train on (words, tags) pairs and return a tagger with averaged weights."""
+        n_tags = len(TAGS)
+        tag_index = {t: i for i, t in enumerate(TAGS)}
+        size = n_buckets * n_tags
+        weights = array("d", bytes(8 * size))
+        totals = array("d", bytes(8 * size))
+        stamps = array("l", bytes(array("l").itemsize * size))
+        step = 0
+        rng = random.Random(seed)
+        data = list(examples)
+
+        def update(idx: int, value: float) -> None:
+            totals[idx] += (step - stamps[idx]) * weights[idx]
+            stamps[idx] = step
+            weights[idx] += value
+
+        for _ in range(epochs):
+            rng.shuffle(data)
+            for words, gold in data:
+                p2 = p1 = _PAD
+                for i in range(len(words)):
+                    buckets = [_bucket(f, n_buckets) * n_tags for f in cls._all_features(words, i, p2, p1)]
+                    scores = [0.0] * n_tags
+                    for base in buckets:
+                        for t in range(n_tags):
+                            scores[t] += weights[base + t]
+                    guess = max(range(n_tags), key=scores.__getitem__)
+                    truth = tag_index[gold[i]]
+                    step += 1
+                    if guess != truth:
+                        for base in buckets:
+                            update(base + truth, 1.0)
+                            update(base + guess, -1.0)
+                    # Condition on gold history during training
+                    p2, p1 = p1, gold[i]
+
+        averaged = array("f", bytes(4 * size))
+        for idx in range(size):
+            total = totals[idx] + (step - stamps[idx]) * weights[idx]
+            averaged[idx] = total / step if step else 0.0
+        return cls(averaged, n_buckets=n_buckets)
+
+    # ---------- persistence ----------
+
+    def save(self, path: str | Path) -> None:
+        tag_blob = "\n".join(self.tags).encode("utf-8")
+        weights = self.weights if isinstance(self.weights, array) else array("f", self.weights)
+        with open(path, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, _VERSION, self.n_tags, self.n_buckets))
+            fh.write(struct.pack("<I", len(tag_blob)))
+            fh.write(tag_blob)
+            # Pad so the float32 matrix starts on a 4-byte boundary
+            fh.write(b"\x00" * (-(fh.tell()) % 4))
+            if sys.byteorder != "little":
+                weights = array("f", weights)
+                weights.byteswap()
+            fh.write(weights.tobytes())
+
+    @classmethod
+    def load(cls, path: str | Path, use_mmap: bool = True) -> PerceptronTagger:
+        """Load a model file.
+
+        With ``use_mmap`` the weight matrix is a read-only view over a shared
+        mapping of the file, so every process that opens the same model is
+        served from the same page-cache pages instead of a private copy.
+        """
+        with open(path, "rb") as fh:
+            if use_mmap and sys.byteorder == "little":
+                data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = fh.read()
+        magic, version, n_tags, n_buckets = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a NER perceptron model")
+        offset = _HEADER.size
+        (tag_len,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        tags = bytes(data[offset : offset + tag_len]).decode("utf-8").split("\n")
+        offset += tag_len
+        offset += -offset % 4
+        end = offset + 4 * n_tags * n_buckets
+        if isinstance(data, mmap.mmap):
+            weights = memoryview(data)[offset:end].cast("f")
+        else:
+            weights = array("f")
+            weights.frombytes(data[offset:end])
+            if sys.byteorder != "little":
+                weights.byteswap()
+        tagger = cls(weights, n_buckets=n_buckets, tags=tags)
+        tagger._mmap = data if isinstance(data, mmap.mmap) else None
+        return tagger
+
+    def prefetch(self) -> None:
+        """Ask the OS to page the mapped weights in ahead of first use."""
+        if self._mmap is not None and hasattr(mmap, "MADV_WILLNEED"):
+            self._mmap.madvise(mmap.MADV_WILLNEED)
+
+
+def spans_from_tags(tokens: Sequence[tuple[str, int, int]], tags: Sequence[str]) -> list[tuple[int, int, str]]:
+    """Convert BIO tags over tokens into (start, end, entity_type) character spans."""
+    spans: list[tuple[int, int, str]] = []
+    current: list | None = None
+    for (_, start, end), tag in zip(tokens, tags):
+        if tag == "O":
+            current = None
+            continue
+        prefix, label = tag.split("-", 1)
+        if prefix == "I" and current is not None and current[2] == label:
+            current[1] = end
+            continue
+        current = [start, end, label]
+        spans.append(current)
+    return [(s, e, ENTITY_TYPES[label]) for s, e, label in spans]
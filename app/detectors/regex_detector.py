@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Collection
 
 from app.schemas import Span
 
@@ -57,10 +58,16 @@ PATTERNS: list[tuple[str, re.Pattern, str | None]] = [
 ]
 
 
-def detect(text: str) -> list[Span]:
-    spans: list[Span] = []
+PATTERN_TYPES = frozenset(pii_type for pii_type, _, _ in PATTERNS)
+
+
+def find(text: str, types: Collection[str] | None = None) -> list[tuple[int, int, str]]:
+    """Validated (start, end, type) matches; ``types`` restricts the scan to those PATTERNS."""
+    found: list[tuple[int, int, str]] = []
 
     for pii_type, pattern, validator in PATTERNS:
+        if types is not None and pii_type not in types:
+            continue
         for m in pattern.finditer(text):
             # For patterns with groups, we validate the full concatenated digits
             if validator == "rrn":
@@ -74,19 +81,28 @@ def detect(text: str) -> list[Span]:
 
             # For API_KEY pattern, the span is the captured key group
             if pii_type == "API_KEY" and m.lastindex and m.lastindex >= 1:
-                start, end = m.start(1), m.end(1)
+                found.append((m.start(1), m.end(1), pii_type))
             else:
-                start, end = m.start(), m.end()
-
-            spans.append(
-                Span(
-                    start=start,
-                    end=end,
-                    type=pii_type,
-                    text=text[start:end],
-                    source="regex",
-                    confidence=1.0,
-                )
-            )
-
-    return spans
+                found.append((m.start(), m.end(), pii_type))
+
+    return found
+
+
+def could_match(text: str, end_after: int = 0) -> bool:
+    """True if any PATTERN matches ``text`` (before checksum validation) ending past ``end_after``."""
+    return any(m.end() > end_after for _, pattern, _ in PATTERNS for m in pattern.finditer(text))
+
+
+def detect(text: str, types: Collection[str] | None = None) -> list[Span]:
+    return [
+        Span(
+            start=start,
+            end=end,
+            type=pii_type,
+            text=text[start:end],
+            source="regex",
+            confidence=1.0,
+        )
+        for start, end, pii_type in find(text, types)
+    ]
+
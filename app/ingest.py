@@ -1,24 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+import codecs
+import hashlib
+import mmap
+import multiprocessing
+import os
+import shutil
+import tempfile
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import BinaryIO
+
 from fastapi import HTTPException, UploadFile
 from pypdf import PdfReader
-import io
 
+from app.config import settings
+from app.offload import offloader
+from app.schemas import JobProgress
 
-async def extract_text(file: UploadFile) -> tuple[str, str]:
-    """Extract text from an uploaded TXT or PDF file.
 
-    Returns (text, kind) where kind is "txt" or "pdf".
+class _Spooler:
+    """Chunk sink behind ``spool_upload`` and ``spool_stream``.
+
+    Enforces MAX_UPLOAD_BYTES (413), hashes and spools each chunk, so both
+    readers apply the same limit and produce the same digest.
+    """
+
+    def __init__(self) -> None:
+        self.spool = tempfile.SpooledTemporaryFile(max_size=settings.INGEST_SPOOL_MAX_MEMORY)
+        self._digest = hashlib.sha256()
+        self._size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self._size += len(chunk)
+        if self._size > settings.MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Upload exceeds {settings.MAX_UPLOAD_BYTES} bytes",
+            )
+        self._digest.update(chunk)
+        self.spool.write(chunk)
+
+    def finish(self) -> tuple[tempfile.SpooledTemporaryFile, int, str]:
+        self.spool.seek(0)
+        return self.spool, self._size, self._digest.hexdigest()
+
+
+async def spool_upload(file: UploadFile) -> tuple[tempfile.SpooledTemporaryFile, int, str]:
+    """Stream an upload into a spooled temp file in fixed-size chunks.
+
+    Small uploads stay in memory; anything above INGEST_SPOOL_MAX_MEMORY is
+    rolled over to disk. Raises 413 once MAX_UPLOAD_BYTES is exceeded.
+    Returns (spool positioned at 0, size in bytes, SHA-256 hex digest).
+    """
+    spooler = _Spooler()
+    try:
+        while chunk := await file.read(settings.INGEST_CHUNK_SIZE):
+            spooler.write(chunk)
+    except BaseException:
+        spooler.spool.close()
+        raise
+    return spooler.finish()
+
+
+def spool_stream(stream: BinaryIO) -> tuple[tempfile.SpooledTemporaryFile, int, str]:
+    """Synchronous counterpart of ``spool_upload`` for file-like sources (e.g. zip members)."""
+    spooler = _Spooler()
+    try:
+        while chunk := stream.read(settings.INGEST_CHUNK_SIZE):
+            spooler.write(chunk)
+    except BaseException:
+        spooler.spool.close()
+        raise
+    return spooler.finish()
+
+
+def _pdf_stream(spool: tempfile.SpooledTemporaryFile, size: int) -> BinaryIO:
+    """Return a seekable stream for pypdf without copying the upload.
+
+    Uploads that rolled over to disk are memory-mapped; in-memory spools
+    are handed over as-is. (Passing a path would make pypdf read the whole
+    file into a BytesIO.)
     """
-    filename = (file.filename or "").lower()
-    raw = await file.read()
+    if size > settings.INGEST_SPOOL_MAX_MEMORY:
+        return mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+    return spool
+
+
+@dataclass
+class Document:
+    text: str
+    kind: str  # "txt" | "pdf"
+    page_offsets: list[int] = field(default_factory=list)  # start offset of each page in text
+    encoding: str | None = None  # detected charset of text uploads
+
+    def page_of(self, offset: int) -> int | None:
+        """1-based page number containing ``offset`` (None for non-paged input)."""
+        if not self.page_offsets:
+            return None
+        lo, hi = 0, len(self.page_offsets)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.page_offsets[mid] <= offset:
+                lo = mid + 1
+            else:
+                hi = mid
+        return max(lo, 1)
+
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _pool_workers() -> int:
+    # Split the cores between uvicorn workers instead of giving each a full-size pool
+    return settings.PDF_EXTRACT_WORKERS or max(1, (os.cpu_count() or 1) // settings.WEB_CONCURRENCY)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        _pool = ProcessPoolExecutor(max_workers=_pool_workers(), mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> list[str]:
+    """Worker: extract pages [start, stop) from the PDF at ``path``."""
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        reader = PdfReader(mm)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _copy_spool(spool: BinaryIO, dest: BinaryIO) -> None:
+    """Offload worker: copy the whole upload into ``dest`` for the page workers to open."""
+    spool.seek(0)
+    shutil.copyfileobj(spool, dest, settings.INGEST_CHUNK_SIZE)
+    dest.flush()
+
+
+async def _extract_pages_parallel(spool: BinaryIO, n_pages: int, progress: JobProgress | None = None) -> list[str]:
+    """Fan page ranges out to the process pool and reassemble them in order."""
+    # A few ranges per worker balances uneven pages; each range re-parses the xref once.
+    n_ranges = min(n_pages, _pool_workers() * 4)
+    bounds = [n_pages * i // n_ranges for i in range(n_ranges + 1)]
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as named:
+        # Hundreds of MB for the PDFs this path is for: copy off the event loop
+        await offloader.run(_copy_spool, spool, named, portable=False)
+        loop = asyncio.get_running_loop()
+        pool = _get_pool()
+        futures = [
+            loop.run_in_executor(pool, _extract_page_range, named.name, lo, hi)
+            for lo, hi in zip(bounds, bounds[1:])
+        ]
+        if progress is not None:
+            for fut in futures:
+                fut.add_done_callback(lambda f: _count_pages(progress, f))
+        chunks = await asyncio.gather(*futures)
+    return [page for chunk in chunks for page in chunk]
 
-    if filename.endswith(".pdf"):
-        reader = PdfReader(io.BytesIO(raw))
-        pages = [page.extract_text() or "" for page in reader.pages]
-        text = "\n".join(pages).strip()
+
+def _count_pages(progress: JobProgress, fut: asyncio.Future) -> None:
+    if not fut.cancelled() and fut.exception() is None:
+        progress.pages_extracted += len(fut.result())
+
+
+def _join_pages(pages: list[str]) -> tuple[str, list[int]]:
+    """Join pages with newlines, strip, and return per-page start offsets."""
+    offsets: list[int] = []
+    pos = 0
+    for page in pages:
+        offsets.append(pos)
+        pos += len(page) + 1
+    joined = "\n".join(pages)
+    lead = len(joined) - len(joined.lstrip())
+    text = joined.strip()
+    return text, [min(max(o - lead, 0), len(text)) for o in offsets]
+
+
+def _open_pdf(
+    spool: tempfile.SpooledTemporaryFile, size: int, progress: JobProgress | None
+) -> tuple[int, list[str] | None]:
+    """Offload worker: count the pages and, below PDF_PARALLEL_MIN_PAGES, extract them too."""
+    stream = _pdf_stream(spool, size)
+    try:
+        reader = PdfReader(stream)
+        n_pages = len(reader.pages)
+        if progress is not None:
+            progress.pages_total = n_pages
+        if n_pages >= settings.PDF_PARALLEL_MIN_PAGES:
+            return n_pages, None
+        pages = []
+        for page in reader.pages:
+            pages.append(page.extract_text() or "")
+            if progress is not None:
+                progress.pages_extracted += 1
+        return n_pages, pages
+    finally:
+        if isinstance(stream, mmap.mmap):
+            stream.close()
+
+
+async def _extract_pdf(
+    spool: tempfile.SpooledTemporaryFile, size: int, progress: JobProgress | None = None
+) -> tuple[str, list[int]]:
+    # The spool and progress live in this process, so this stage stays on a thread
+    n_pages, pages = await offloader.run(_open_pdf, spool, size, progress, portable=False)
+    if pages is None:
+        pages = await _extract_pages_parallel(spool, n_pages, progress)
+    return _join_pages(pages)
+
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _hangul_ratio(text: str) -> float:
+    """Share of Hangul syllables among the non-ASCII characters of ``text``."""
+    non_ascii = [ch for ch in text if ord(ch) > 0x7F]
+    if not non_ascii:
+        return 1.0
+    return sum(1 for ch in non_ascii if "가" <= ch <= "힣") / len(non_ascii)
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """Guess the encoding of a text upload from its first bytes.
+
+    Order: BOM, strict UTF-8 (a sequence cut off at the end of the prefix
+    is fine), then CP949 (a superset of EUC-KR) if the result is mostly
+    Hangul. Anything else falls back to UTF-8 with replacement.
+    """
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        decoded = codecs.getincrementaldecoder("cp949")().decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return "utf-8"
+    return "cp949" if _hangul_ratio(decoded) >= 0.6 else "utf-8"
+
+
+def iter_decoded(spool: BinaryIO, encoding: str | None = None) -> Iterator[str]:
+    """Decode a spooled text upload chunk by chunk.
+
+    The encoding is sniffed from the first TXT_SNIFF_BYTES unless given.
+    Yields text pieces of roughly INGEST_CHUNK_SIZE bytes each, so callers
+    that only scan the text never hold all of it at once.
+    """
+    if encoding is None:
+        spool.seek(0)
+        encoding = sniff_encoding(spool.read(settings.TXT_SNIFF_BYTES))
+    spool.seek(0)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    while chunk := spool.read(settings.INGEST_CHUNK_SIZE):
+        if piece := decoder.decode(chunk):
+            yield piece
+    if tail := decoder.decode(b"", final=True):
+        yield tail
+
+
+def _decode_txt(spool: BinaryIO) -> tuple[str, str]:
+    """Sniff the encoding and decode incrementally; returns (text, encoding)."""
+    encoding = sniff_encoding(spool.read(settings.TXT_SNIFF_BYTES))
+    return "".join(iter_decoded(spool, encoding)), encoding
+
+
+def document_kind(filename: str | None) -> str:
+    """Extraction path ``read_document`` takes for ``filename``: "pdf" or "txt"."""
+    return "pdf" if (filename or "").lower().endswith(".pdf") else "txt"
+
+
+async def read_document(
+    spool: tempfile.SpooledTemporaryFile, size: int, filename: str | None, progress: JobProgress | None = None
+) -> Document:
+    """Extract text (and, for PDFs, the page offset table) from a spooled upload.
+
+    ``progress``, when given, is updated with the page count and pages
+    extracted so far.
+    """
+    if document_kind(filename) == "pdf":
+        text, page_offsets = await _extract_pdf(spool, size, progress)
         if not text:
             raise HTTPException(status_code=400, detail="PDF contains no extractable text")
-        return text, "pdf"
+        return Document(text=text, kind="pdf", page_offsets=page_offsets)
 
     # Default: treat as plain text
-    text = raw.decode("utf-8", errors="replace")
-    return text, "txt"
+    text, encoding = await offloader.run(_decode_txt, spool, portable=False)
+    return Document(text=text, kind="txt", encoding=encoding)
+
+
+async def extract_document(file: UploadFile) -> Document:
+    """Spool an upload and extract its text."""
+    spool, size, _ = await spool_upload(file)
+    with spool:
+        return await read_document(spool, size, file.filename)
+
+
+async def extract_text(file: UploadFile) -> tuple[str, str]:
+    """Extract text from an uploaded TXT or PDF file.
+
+    Returns (text, kind) where kind is "txt" or "pdf".
+    """
+    doc = await extract_document(file)
+    return doc.text, doc.kind
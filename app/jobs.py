@@ -0,0 +1,205 @@
+"""In-process background jobs for large-document redaction.
+
+A job wraps one redaction as a coroutine factory taking a JobProgress,
+which the pipeline updates as it goes (stage, pages extracted, detectors
+finished). Jobs live in this process only: with several uvicorn workers a
+client must poll the worker that accepted its job, and jobs do not
+survive a restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.schemas import JobProgress, JobStatus
+
+log = logging.getLogger(__name__)
+
+FINISHED = ("done", "failed", "cancelled")
+
+
+@dataclass
+class Job:
+    model: str
+    filename: str | None
+    work: Callable[[JobProgress], Awaitable[Any]]
+    on_discard: Callable[[], None] | None = None  # releases inputs of a job that never ran
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    state: str = "queued"  # queued | running | done | failed | cancelled
+    progress: JobProgress = field(default_factory=JobProgress)
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: Any = None
+    error_status: int | None = None
+    error: str | None = None
+    task: asyncio.Task | None = None
+
+    def status(self) -> JobStatus:
+        return JobStatus(
+            job_id=self.id,
+            model=self.model,
+            filename=self.filename,
+            state=self.state,
+            progress=self.progress,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            doc_id=self.result.get("doc_id") if isinstance(self.result, dict) else None,
+            error=self.error,
+        )
+
+
+class JobQueue:
+    """Bounded FIFO of redaction jobs run by a fixed pool of worker tasks.
+
+    ``submit`` fails fast with 503 once ``max_queued`` jobs are waiting.
+    Workers start lazily on the running loop (like the NER batcher) and
+    each job's work runs in its own task, so ``cancel`` can interrupt a
+    running job without losing the worker. Finished jobs are kept for
+    ``retain_sec`` so clients can poll them, then forgotten.
+    """
+
+    def __init__(self, workers: int, max_queued: int, retain_sec: float) -> None:
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retain_sec = retain_sec
+        self._jobs: dict[str, Job] = {}
+        self._queue: asyncio.Queue[Job] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._waits: deque[float] = deque(maxlen=1000)
+        self._latencies: deque[float] = deque(maxlen=1000)
+        self._finished = {state: 0 for state in FINISHED}
+
+    def _ensure_started(self) -> asyncio.Queue[Job]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._queue is None:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._workers = []
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.workers:
+            self._workers.append(loop.create_task(self._run()))
+        return self._queue
+
+    def submit(self, job: Job) -> Job:
+        queue = self._ensure_started()
+        self._prune()
+        try:
+            queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Job queue is full ({self.max_queued} waiting); retry later",
+                headers={"Retry-After": "5"},
+            )
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job: Job) -> bool:
+        """Cancel a queued or running job; False if it had already finished."""
+        if job.state in FINISHED:
+            return False
+        if job.state == "queued":
+            # Still in the queue; the worker that dequeues it skips it
+            self._finish(job, "cancelled")
+            if job.on_discard is not None:
+                job.on_discard()
+        elif job.task is not None:
+            job.task.cancel()
+        return True
+
+    def _finish(self, job: Job, state: str) -> None:
+        job.state = state
+        job.finished_at = time.time()
+        self._finished[state] += 1
+        self._latencies.append(job.finished_at - job.created_at)
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            if job.state != "queued":
+                continue
+            job.state = "running"
+            job.started_at = time.time()
+            self._waits.append(job.started_at - job.created_at)
+            job.task = asyncio.ensure_future(job.work(job.progress))
+            try:
+                await asyncio.wait({job.task})
+            except asyncio.CancelledError:
+                # Worker shutdown: take the running job down with it
+                job.task.cancel()
+                raise
+            if job.task.cancelled():
+                self._finish(job, "cancelled")
+            elif isinstance(job.task.exception(), HTTPException):
+                exc = job.task.exception()
+                job.error_status, job.error = exc.status_code, str(exc.detail)
+                self._finish(job, "failed")
+            elif job.task.exception() is not None:
+                log.error("Job %s failed", job.id, exc_info=job.task.exception())
+                job.error_status, job.error = 500, "Internal error"
+                self._finish(job, "failed")
+            else:
+                job.result = job.task.result()
+                job.progress.stage = "done"
+                self._finish(job, "done")
+            job.task = None
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retain_sec
+        stale = [k for k, job in self._jobs.items() if job.finished_at is not None and job.finished_at < cutoff]
+        for k in stale:
+            del self._jobs[k]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._workers = []
+        self._queue = None
+
+    def clear(self) -> None:
+        self._jobs.clear()
+
+    def stats(self) -> dict:
+        states = [job.state for job in self._jobs.values()]
+        waits = sorted(self._waits)
+        latencies = sorted(self._latencies)
+
+        def pct(samples: list[float], q: float) -> float:
+            return round(1000 * samples[int(q * (len(samples) - 1))], 3) if samples else 0.0
+
+        return {
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            **self._finished,
+            "p50_wait_ms": pct(waits, 0.5),
+            "p95_wait_ms": pct(waits, 0.95),
+            "p50_latency_ms": pct(latencies, 0.5),
+            "p95_latency_ms": pct(latencies, 0.95),
+        }
+
+
+queue = JobQueue(settings.JOB_WORKERS, settings.JOB_QUEUE_MAX, settings.JOB_RETAIN_SEC)
@@ -0,0 +1,277 @@
+"""Streaming, structure-preserving JSON redaction.
+
+The document is tokenized incrementally from decoded text pieces and
+copied to the output token by token: keys, numbers, literals, punctuation
+and whitespace pass through verbatim, and only string values whose path
+is selected by the include/exclude rules are run through the detectors
+and re-encoded. The output is therefore valid JSON with the same shape as
+the input.
+
+Rules are JSONPath-style expressions (``$.customers[*].email``,
+``$..phone``, ``$['a b'][0]``). A rule selects a node and everything
+beneath it. A string leaf is scanned when an include rule selects it
+(default: ``$``, the whole document) and no exclude rule does.
+
+Token map values are stored in their JSON-escaped form, so
+``restore_text(masked_json, token_map)`` yields valid JSON equal to the
+input.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Callable, Iterable, Iterator, Sequence
+
+from app.masker import mask_text
+from app.merger import merge_spans
+from app.schemas import Span
+
+_FLUSH_CHARS = 64 * 1024
+
+PathPart = str | int
+Segment = tuple[bool, PathPart | None]  # (recursive descent, selector; None = wildcard)
+
+
+class JSONStreamError(ValueError):
+    """Malformed JSON or path rule."""
+
+
+# ---------- Path rules ----------
+
+_SEGMENT_RE = re.compile(
+    r"""(\.\.|\.)?(?:([^.\[\]'"]+)|\[(\*|\d+|'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")\])"""
+)
+
+
+def compile_path(expr: str) -> list[Segment]:
+    """Parse a JSONPath-style expression into (descendant, selector) segments."""
+    if not expr.startswith("$"):
+        raise JSONStreamError(f"Path must start with '$': {expr!r}")
+    segments: list[Segment] = []
+    pos = 1
+    while pos < len(expr):
+        m = _SEGMENT_RE.match(expr, pos)
+        if m is None or (m.group(2) is not None and m.group(1) is None):
+            raise JSONStreamError(f"Invalid path {expr!r} at position {pos}")
+        descend = m.group(1) == ".."
+        raw = m.group(2) if m.group(2) is not None else m.group(3)
+        if raw == "*":
+            selector: PathPart | None = None
+        elif m.group(3) is not None and raw.isdigit():
+            selector = int(raw)
+        elif m.group(3) is not None:
+            selector = raw[1:-1].replace("\\" + raw[0], raw[0]).replace("\\\\", "\\")
+        else:
+            selector = raw
+        segments.append((descend, selector))
+        pos = m.end()
+    return segments
+
+
+def _selects(selector: PathPart | None, part: PathPart) -> bool:
+    return selector is None or (selector == part and type(selector) is type(part))
+
+
+def path_matches(segments: Sequence[Segment], path: Sequence[PathPart], i: int = 0, j: int = 0) -> bool:
+    """True if the rule selects ``path`` or one of its ancestors."""
+    if i == len(segments):
+        return True
+    descend, selector = segments[i]
+    if not descend:
+        return j < len(path) and _selects(selector, path[j]) and path_matches(segments, path, i + 1, j + 1)
+    return any(
+        _selects(selector, path[k]) and path_matches(segments, path, i + 1, k + 1)
+        for k in range(j, len(path))
+    )
+
+
+# ---------- Tokenizer ----------
+
+_TOKEN_RE = re.compile(
+    r"""(?P<ws>[ \t\r\n]+)
+      |(?P<punct>[{}\[\]:,])
+      |(?P<str>"(?:[^"\\\x00-\x1f]|\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))*")
+      |(?P<num>-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?)
+      |(?P<lit>true|false|null)""",
+    re.VERBOSE,
+)
+_LITERALS = ("true", "false", "null")
+
+
+def _needs_more(m: re.Match | None, buf: str, pos: int) -> bool | None:
+    """Whether the token at ``pos`` might still grow with the next piece.
+
+    Returns None when no continuation can make the input valid.
+    """
+    if m is None:
+        rest = buf[pos : pos + 5]
+        if pos < len(buf) and not (rest[0] == '"' or rest == "-" or any(lit.startswith(rest) for lit in _LITERALS)):
+            return None
+        return True
+    if m.lastgroup == "num":
+        # "1" may still become "1.5" or "1e+3"
+        return m.end() + 2 >= len(buf)
+    return m.lastgroup in ("ws", "lit") and m.end() == len(buf)
+
+
+def iter_tokens(pieces: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Yield (kind, text) JSON tokens from a stream of decoded text pieces.
+
+    Tokens near the end of the buffer are held back until the next piece
+    arrives; an unterminated string keeps the buffer growing until its
+    closing quote shows up.
+    """
+    buf = ""
+    pos = 0
+    offset = 0  # characters dropped from the front of buf, for error messages
+    source = iter(pieces)
+    final = False
+    while True:
+        m = _TOKEN_RE.match(buf, pos)
+        # Only tokens ending within two characters of the buffer end can be cut short
+        if not final and (m is None or m.end() + 2 >= len(buf)):
+            more = _needs_more(m, buf, pos)
+            if more is None:
+                raise JSONStreamError(f"Invalid JSON at character {offset + pos}")
+            if more:
+                piece = next(source, None)
+                if piece is None:
+                    final = True
+                else:
+                    offset += pos
+                    buf = buf[pos:] + piece
+                    pos = 0
+                continue
+        if m is None:
+            if pos >= len(buf):
+                return
+            raise JSONStreamError(f"Invalid JSON at character {offset + pos}")
+        pos = m.end()
+        yield m.lastgroup, m.group()
+
+
+# ---------- Redactor ----------
+
+class _Frame:
+    __slots__ = ("is_map", "state", "child")
+
+    def __init__(self, is_map: bool) -> None:
+        self.is_map = is_map
+        self.state = "key_or_end" if is_map else "value_or_end"
+        self.child: PathPart = "" if is_map else -1
+
+
+def _decode_str(token: str) -> str:
+    return token[1:-1] if "\\" not in token else json.loads(token)
+
+
+def _escaped(value: str) -> str:
+    return json.dumps(value, ensure_ascii=False)[1:-1]
+
+
+class JsonRedactor:
+    """Mask string leaves of a JSON token stream and yield output chunks.
+
+    ``detect`` maps a string value to spans. After iteration ``token_map``
+    holds every token issued (id -> JSON-escaped original) and ``leaves``
+    / ``scanned`` count string values seen and run through ``detect``.
+    """
+
+    def __init__(
+        self,
+        pieces: Iterable[str],
+        detect: Callable[[str], list[Span]],
+        include: Sequence[str] = ("$",),
+        exclude: Sequence[str] = (),
+    ) -> None:
+        self.detect = detect
+        self.include = [compile_path(p) for p in include or ("$",)]
+        self.exclude = [compile_path(p) for p in exclude]
+        self._tokens = iter_tokens(pieces)
+        self.token_map: dict[str, str] = {}
+        self.leaves = 0
+        self.scanned = 0
+
+    def _selected(self, path: Sequence[PathPart]) -> bool:
+        return any(path_matches(rule, path) for rule in self.include) and not any(
+            path_matches(rule, path) for rule in self.exclude
+        )
+
+    def _mask(self, token: str, path: Sequence[PathPart]) -> str:
+        self.leaves += 1
+        if not self._selected(path):
+            return token
+        value = _decode_str(token)
+        self.scanned += 1
+        spans = self.detect(value)
+        if not spans:
+            return token
+        masked, token_map = mask_text(value, merge_spans(spans))
+        self.token_map.update((k, _escaped(v)) for k, v in token_map.items())
+        return json.dumps(masked, ensure_ascii=False)
+
+    def __iter__(self) -> Iterator[str]:
+        stack: list[_Frame] = []
+        top_done = False
+        out: list[str] = []
+        size = 0
+
+        def error(token: str) -> JSONStreamError:
+            return JSONStreamError(f"Unexpected {token!r} in JSON document")
+
+        for kind, token in self._tokens:
+            if kind == "ws":
+                out.append(token)
+                continue
+
+            frame = stack[-1] if stack else None
+            if token in "}]" and kind == "punct":
+                if frame is None or frame.is_map != (token == "}") or frame.state not in (
+                    "key_or_end", "value_or_end", "comma_or_end"
+                ):
+                    raise error(token)
+                stack.pop()
+            elif token == ",":
+                if frame is None or frame.state != "comma_or_end":
+                    raise error(token)
+                frame.state = "key" if frame.is_map else "value"
+            elif token == ":":
+                if frame is None or frame.state != "colon":
+                    raise error(token)
+                frame.state = "value"
+            elif kind == "str" and frame is not None and frame.is_map and frame.state in ("key_or_end", "key"):
+                frame.child = _decode_str(token)
+                frame.state = "colon"
+            else:
+                # Start of a value: advance the enclosing container
+                if frame is None:
+                    if top_done:
+                        raise error(token)
+                    top_done = True
+                elif frame.is_map:
+                    if frame.state != "value":
+                        raise error(token)
+                    frame.state = "comma_or_end"
+                else:
+                    if frame.state not in ("value_or_end", "value"):
+                        raise error(token)
+                    frame.child += 1
+                    frame.state = "comma_or_end"
+
+                if token in "{[" and kind == "punct":
+                    stack.append(_Frame(is_map=token == "{"))
+                elif kind == "str":
+                    token = self._mask(token, [f.child for f in stack])
+
+            out.append(token)
+            size += len(token)
+            if size >= _FLUSH_CHARS:
+                yield "".join(out)
+                out.clear()
+                size = 0
+
+        if stack or not top_done:
+            raise JSONStreamError("Unexpected end of JSON document")
+        if out:
+            yield "".join(out)
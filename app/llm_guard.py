@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import settings
+from app.detectors import llm_detector
+from app.schemas import Span
+
+log = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    closed -> open after ``threshold`` consecutive failures; open -> half-open
+    once ``cooldown_sec`` has elapsed, letting a single probe call through.
+    A successful probe closes the breaker, a failed one re-opens it.
+    """
+
+    def __init__(self, threshold: int, cooldown_sec: float) -> None:
+        self.threshold = threshold
+        self.cooldown_sec = cooldown_sec
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_sec:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, size: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[idx]
+
+
+breaker = CircuitBreaker(settings.LLM_BREAKER_THRESHOLD, settings.LLM_BREAKER_COOLDOWN_SEC)
+latencies = LatencyTracker()
+
+# LLM calls get their own threads: an abandoned attempt (timed out, or a losing
+# hedge) keeps its thread until the HTTP timeout fires, and must not starve the
+# default executor the NER batcher runs in.
+_workers = settings.LLM_WORKERS
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="llm")
+    return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+
+class PartialSpans(list):
+    """Spans an LLM call had streamed in before its budget ran out."""
+
+
+def _hedge_delay() -> float | None:
+    if not settings.LLM_HEDGE or len(latencies) < settings.LLM_HEDGE_MIN_SAMPLES:
+        return None
+    return latencies.percentile(0.95)
+
+
+async def _call_with_hedge(
+    text: str, pre_masked_spans: list[Span] | None, received: list[list[Span]]
+) -> list[Span]:
+    """Run the detector, firing one hedged duplicate after the p95 delay.
+
+    Each attempt streams its spans into a list appended to ``received``.
+    """
+    loop = asyncio.get_running_loop()
+
+    def attempt() -> asyncio.Future:
+        received.append([])
+        # Cancelling the future drops an attempt that is still queued for a thread
+        return loop.run_in_executor(_get_executor(), llm_detector.detect, text, pre_masked_spans, received[-1])
+
+    pending = {attempt()}
+    hedge_delay = _hedge_delay()
+    if hedge_delay is not None:
+        done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+        if not done:
+            log.info("LLM detection exceeded p95 (%.2fs), sending hedged request", hedge_delay)
+            pending.add(attempt())
+
+    error: BaseException | None = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+    finally:
+        # Running threads cannot be interrupted; they end at the client's HTTP timeout.
+        for task in pending:
+            task.cancel()
+    assert error is not None
+    raise error
+
+
+async def detect(text: str, pre_masked_spans: list[Span] | None = None) -> list[Span] | None:
+    """Run LLM detection within the latency budget.
+
+    Returns None when the call was skipped (breaker open) or failed, so
+    the caller can degrade to regex and NER only. A call that runs out of
+    budget returns the spans already streamed in as PartialSpans (None if
+    there were none yet).
+    """
+    if not breaker.allow():
+        log.warning("LLM circuit breaker open, skipping LLM detection")
+        return None
+
+    started = time.monotonic()
+    received: list[list[Span]] = []
+    try:
+        spans = await asyncio.wait_for(
+            _call_with_hedge(text, pre_masked_spans, received), timeout=settings.LLM_TIMEOUT_SEC
+        )
+    except asyncio.CancelledError:
+        # The caller gave up (deadline, job cancel, client disconnect); count
+        # it as a failure so a half-open probe cannot stay in flight forever.
+        breaker.record_failure()
+        raise
+    except asyncio.TimeoutError:
+        breaker.record_failure()
+        # The attempt threads may still be appending; keep a snapshot of the furthest one
+        partial = max((list(spans) for spans in received), key=len, default=[])
+        log.warning(
+            "LLM detection exceeded %.1fs budget; keeping %d spans received so far",
+            settings.LLM_TIMEOUT_SEC, len(partial),
+        )
+        return PartialSpans(partial) if partial else None
+    except Exception:
+        log.exception("LLM detection failed")
+        breaker.record_failure()
+        return None
+
+    elapsed = time.monotonic() - started
+    latencies.record(elapsed)
+    if elapsed > settings.LLM_SLOW_CALL_SEC:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return spans
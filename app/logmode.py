@@ -0,0 +1,243 @@
+"""Line-oriented log redaction with Drain-style template mining.
+
+Log lines are split into whitespace-separated tokens and grouped into
+templates the way Drain does: lines with the same token count and first
+token are compared position by position, a line joins the most similar
+template above ``sim_threshold``, and positions where members disagree
+become variable slots (``<*>``). Tokens containing digits are slots from
+the start.
+
+Regex detection then runs only on slot values, each with the preceding
+token as context so keyword patterns such as ``token: <value>`` still
+match. Per (template, slot, value shape) the miner remembers whether the
+regex PATTERNS ever matched, even before checksum validation. After
+``slot_warmup`` clean observations of a shape, that slot shape is
+trusted and skipped. A line whose slots are all trusted is not scanned
+at all. Shapes that ever matched are always scanned. The first line of a
+new template is scanned in full, and constant tokens containing PII are
+turned into slots.
+
+Slot windows that do need scanning are memoized (dates, hosts and user
+ids repeat far more often than the lines around them), and lines whose
+token signature has been seen before skip the similarity search.
+
+The trust step is a heuristic. A value whose shape has only ever been
+clean is assumed to be clean. Set ``slot_warmup=0`` to scan every slot.
+
+Run ``python -m app.logmode [FILE]`` to redact a file or stdin to stdout.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from app.detectors import regex_detector
+from app.masker import mask_matches
+
+WILDCARD = "<*>"
+
+_TOKEN_RE = re.compile(r"\S+")
+_DIGIT_RE = re.compile(r"\d")
+_CACHE_LIMIT = 16_384
+
+# Digits keep their exact positions (every PATTERN depends on digit run
+# lengths), Hangul syllables become 가, ASCII letters are dropped.
+_SHAPE_TABLE: dict[int, str | None] = {ord(c): "9" for c in "0123456789"}
+_SHAPE_TABLE.update({ord(c): None for c in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"})
+_SHAPE_TABLE.update({cp: "가" for cp in range(ord("가"), ord("힣") + 1)})
+
+
+def _shape(value: str) -> str:
+    """Coarse shape of a slot value: ``2024-01-05`` -> ``9999-99-99``, ``id=3fa9c0`` -> ``=999``."""
+    return value.translate(_SHAPE_TABLE)
+
+
+@dataclass
+class Template:
+    id: int
+    tokens: list[str]
+    size: int = 0
+    # (slot position, value shape) -> clean observations so far; -1 = shape has matched a pattern
+    slot_shapes: dict[tuple[int, str], int] = field(default_factory=dict)
+
+    @property
+    def slots(self) -> list[int]:
+        return [i for i, t in enumerate(self.tokens) if t == WILDCARD]
+
+    def render(self) -> str:
+        return " ".join(self.tokens)
+
+
+class LogRedactor:
+    def __init__(self, sim_threshold: float = 0.6, max_children: int = 100, slot_warmup: int = 32) -> None:
+        self.sim_threshold = sim_threshold
+        self.max_children = max_children
+        self.slot_warmup = slot_warmup
+        self._groups: dict[tuple[int, str], list[Template]] = {}
+        self._by_signature: dict[tuple[str, ...], tuple[Template, list[int]]] = {}
+        self._windows: dict[str, list[tuple[int, int, str]] | None] = {}
+        self.templates: list[Template] = []
+        self.lines = 0
+        self.lines_skipped = 0  # lines with every slot trusted clean
+        self.slots_scanned = 0
+        self.slots_skipped = 0
+
+    # ---------- template mining ----------
+
+    def _match(self, key: tuple[int, str], masked: tuple[str, ...]) -> Template | None:
+        best, best_sim = None, -1.0
+        for template in self._groups.get(key, ()):
+            # Share of the template's constant tokens that the line repeats
+            constants = [(a, b) for a, b in zip(template.tokens, masked) if a != WILDCARD]
+            sim = sum(1 for a, b in constants if a == b) / len(constants) if constants else 1.0
+            if sim > best_sim:
+                best, best_sim = template, sim
+        return best if best_sim >= self.sim_threshold else None
+
+    @staticmethod
+    def _group_key(masked: tuple[str, ...]) -> tuple[int, str]:
+        # Token count plus the first constant token (leading timestamps are all slots)
+        first = next((t for t in masked if t != WILDCARD), WILDCARD)
+        return len(masked), first
+
+    def _add(self, key: tuple[int, str], masked: tuple[str, ...]) -> Template:
+        template = Template(id=len(self.templates), tokens=list(masked))
+        group = self._groups.setdefault(key, [])
+        if len(group) >= self.max_children:
+            group.pop(0)
+        group.append(template)
+        self.templates.append(template)
+        return template
+
+    def _remember(self, masked: tuple[str, ...], template: Template) -> None:
+        if len(self._by_signature) >= _CACHE_LIMIT:
+            self._by_signature.clear()
+        self._by_signature[masked] = (template, template.slots)
+
+    # ---------- detection ----------
+
+    def _scan_window(self, window: str, value_from: int) -> list[tuple[int, int, str]] | None:
+        """Matches ending inside the slot value, or None if no PATTERN can match it."""
+        key = f"{value_from}\x00{window}"
+        if key in self._windows:
+            return self._windows[key]
+        if regex_detector.could_match(window, end_after=value_from):
+            result = [m for m in regex_detector.find(window) if m[1] > value_from]
+        else:
+            result = None
+        if len(self._windows) >= _CACHE_LIMIT:
+            self._windows.clear()
+        self._windows[key] = result
+        return result
+
+    def _new_template(self, line: str, key: tuple[int, str], masked: tuple[str, ...],
+                      tokens: list[tuple[str, int]]) -> str:
+        template = self._add(key, masked)
+        template.size = 1
+        matches = regex_detector.find(line)
+        # PII in a constant token: make that position a slot so every line is checked
+        for start, end, _ in matches:
+            for i, (tok, tok_start) in enumerate(tokens):
+                if tok_start < end and start < tok_start + len(tok):
+                    template.tokens[i] = WILDCARD
+                    template.slot_shapes[(i, _shape(tok))] = -1
+        self._remember(masked, template)
+        return mask_matches(line, matches) if matches else line
+
+    def redact_line(self, line: str) -> str:
+        self.lines += 1
+        tokens = [(m.group(), m.start()) for m in _TOKEN_RE.finditer(line)]
+        if not tokens:
+            return line
+        # Drain preprocessing: tokens with digits are variables before any matching
+        masked = tuple(WILDCARD if _DIGIT_RE.search(t) else t for t, _ in tokens)
+
+        hit = self._by_signature.get(masked)
+        if hit is not None:
+            # Slots added to the template since are constants of this signature, already known clean
+            template, slots = hit
+        else:
+            key = self._group_key(masked)
+            template = self._match(key, masked)
+            if template is None:
+                return self._new_template(line, key, masked, tokens)
+            for i, (tmpl_tok, word) in enumerate(zip(template.tokens, masked)):
+                if tmpl_tok != word:
+                    template.tokens[i] = WILDCARD
+            self._remember(masked, template)
+            slots = template.slots
+        template.size += 1
+
+        matches: list[tuple[int, int, str]] = []
+        shapes = template.slot_shapes
+        warmup = self.slot_warmup
+        scanned = 0
+        for i in slots:
+            tok, tok_start = tokens[i]
+            slot_key = (i, _shape(tok))
+            seen = shapes.get(slot_key, 0)
+            if warmup and seen >= warmup:
+                continue
+            scanned += 1
+            # Include the previous token so "token: <value>" style keys still match
+            ctx_start = tokens[i - 1][1] if i else tok_start
+            found = self._scan_window(line[ctx_start : tok_start + len(tok)], tok_start - ctx_start)
+            if found is None:
+                if seen >= 0:
+                    shapes[slot_key] = seen + 1
+                continue
+            shapes[slot_key] = -1
+            matches.extend((s + ctx_start, e + ctx_start, t) for s, e, t in found)
+
+        self.slots_scanned += scanned
+        self.slots_skipped += len(slots) - scanned
+        if not scanned:
+            self.lines_skipped += 1
+        if not matches:
+            return line
+        return mask_matches(line, sorted(set(matches)))
+
+    def redact_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            body = line.rstrip("\r\n")
+            yield self.redact_line(body) + line[len(body):]
+
+    def stats(self) -> dict:
+        slots = self.slots_scanned + self.slots_skipped
+        return {
+            "lines": self.lines,
+            "templates": len(self.templates),
+            "lines_skipped": self.lines_skipped,
+            "slots_scanned": self.slots_scanned,
+            "slots_skipped": self.slots_skipped,
+            "slot_skip_ratio": round(self.slots_skipped / slots, 4) if slots else 0.0,
+        }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Redact PII from log lines (stdin or FILE) to stdout.")
+    parser.add_argument("file", nargs="?", help="log file to read (default: stdin)")
+    parser.add_argument("--sim-threshold", type=float, default=0.6)
+    parser.add_argument("--slot-warmup", type=int, default=32, help="clean observations before a slot shape is trusted; 0 = never")
+    parser.add_argument("--templates", action="store_true", help="print mined templates and stats to stderr")
+    args = parser.parse_args(argv)
+
+    redactor = LogRedactor(sim_threshold=args.sim_threshold, slot_warmup=args.slot_warmup)
+    source = open(args.file, encoding="utf-8", errors="replace") if args.file else sys.stdin
+    try:
+        sys.stdout.writelines(redactor.redact_lines(source))
+    finally:
+        if args.file:
+            source.close()
+    if args.templates:
+        for template in redactor.templates:
+            print(f"{template.size:>8}  {template.render()}", file=sys.stderr)
+        print(redactor.stats(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
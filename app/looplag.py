@@ -0,0 +1,69 @@
+"""Event-loop lag monitor.
+
+A task sleeps for ``interval`` seconds at a time and records how much
+later than asked it woke up. Anything holding the loop (a CPU-bound stage
+run inline, a blocking call) shows up directly as lag, so ``/metrics``
+tells whether the offload executor is keeping the loop free.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+
+from app.config import settings
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float, window: int = 600) -> None:
+        self.interval = interval
+        self._samples: deque[float] = deque(maxlen=window)
+        self._max = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def record(self, lag: float) -> None:
+        lag = max(lag, 0.0)
+        self._samples.append(lag)
+        self._max = max(self._max, lag)
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(time.monotonic() - expected)
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._max = 0.0
+
+    def stats(self) -> dict:
+        ordered = sorted(self._samples)
+
+        def pct(q: float) -> float:
+            return round(1000 * ordered[int(q * (len(ordered) - 1))], 3) if ordered else 0.0
+
+        return {
+            "interval_ms": round(1000 * self.interval, 3),
+            "samples": len(ordered),
+            "p50_lag_ms": pct(0.5),
+            "p99_lag_ms": pct(0.99),
+            "max_lag_ms": round(1000 * self._max, 3),
+        }
+
+
+monitor = LoopLagMonitor(settings.LOOP_LAG_INTERVAL_MS / 1000)
@@ -5,37 +5,82 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
-from app.routes import chat, download, redaction, restore
-from app.storage import cleanup
+from app.config import settings
+from app import ingest, jobs, llm_guard, masker
+from app.looplag import monitor as loop_monitor
+from app.offload import offloader
+from app.cache import result_cache
+from app.detectors import ner_detector
+from app.routes import (
+    batch_redaction,
+    chat,
+    csv_redaction,
+    download,
+    json_redaction,
+    redaction,
+    restore,
+    stream_redaction,
+)
+from app.routes import jobs as job_routes
+from app import storage
+from app.storage import cleanup_async, next_expiry
 
 import asyncio
+import time
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Expiries due within this window of each other are removed in one pass
+_CLEANUP_MIN_SLEEP_SEC = 1.0
+
+
+def _cleanup_delay() -> float:
+    deadline = next_expiry()
+    if deadline is None:
+        # Nothing stored: anything stored from now on expires a full TTL later
+        return float(settings.DOC_TTL_SEC)
+    return max(deadline - time.time(), _CLEANUP_MIN_SLEEP_SEC)
+
 
 async def _periodic_cleanup():
     while True:
-        await asyncio.sleep(300)
-        cleanup()
+        await asyncio.sleep(_cleanup_delay())
+        await cleanup_async()
+        result_cache.purge_expired()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    storage.check_shared_state(masker.key_fingerprint())
+    if settings.NER_WARMUP:
+        await asyncio.to_thread(ner_detector.warmup)
     task = asyncio.create_task(_periodic_cleanup())
+    loop_monitor.start()
     yield
     task.cancel()
     try:
         await task
     except asyncio.CancelledError:
         pass
+    await loop_monitor.stop()
+    await jobs.queue.stop()
+    await ner_detector.batcher.stop()
+    ingest.shutdown_pool()
+    offloader.shutdown()
+    llm_guard.shutdown()
 
 
 app = FastAPI(title="LLM Redaction API", version="0.1.0", lifespan=lifespan)
 
+app.include_router(batch_redaction.router)
+app.include_router(stream_redaction.router)
+app.include_router(csv_redaction.router)
+app.include_router(json_redaction.router)
 app.include_router(redaction.router)
 app.include_router(download.router)
 app.include_router(restore.router)
 app.include_router(chat.router)
+app.include_router(job_routes.router)
 
 
 @app.get("/health")
@@ -43,6 +88,18 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "ner_batcher": ner_detector.batcher.stats(),
+        "result_cache": result_cache.stats(),
+        "storage": storage.stats(),
+        "jobs": jobs.queue.stats(),
+        "offload": offloader.stats(),
+        "event_loop": loop_monitor.stats(),
+    }
+
+
 @app.get("/")
 async def serve_spa():
     return FileResponse(BASE_DIR / "frontend" / "index.html")
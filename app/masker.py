@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import hashlib
+import os
 import re
 import uuid
 
 from cryptography.fernet import Fernet
 
 from app.config import settings
+from app.merger import TYPE_SENSITIVITY
 from app.schemas import Envelope, Span
 
 # Auto-generate a Fernet key if not configured
@@ -20,6 +23,11 @@ def _get_fernet() -> Fernet:
     return Fernet(_fernet_key)
 
 
+def key_fingerprint() -> str:
+    """Short, non-reversible identifier of the envelope key for cross-worker checks."""
+    return hashlib.sha256(_fernet_key).hexdigest()[:16]
+
+
 def mask_text(text: str, spans: list[Span]) -> tuple[str, dict[str, str]]:
     """Replace detected spans with tokens, returning masked text and token_map.
 
@@ -37,12 +45,37 @@ def mask_text(text: str, spans: list[Span]) -> tuple[str, dict[str, str]]:
     return text, token_map
 
 
+def mask_matches(text: str, matches: list[tuple[int, int, str]]) -> str:
+    """Mask-only variant of ``mask_text`` for raw (start, end, type) regex matches.
+
+    Overlaps are resolved the way ``merge_spans`` ranks regex spans (most
+    sensitive type, then longest). No token map is kept and no Span models
+    are built, which matters for per-cell / per-line streaming modes.
+    """
+    if len(matches) > 1:
+        kept: list[tuple[int, int, str]] = []
+        for m in sorted(matches, key=lambda m: (TYPE_SENSITIVITY.get(m[2], 99), m[0] - m[1])):
+            if all(m[0] >= k[1] or m[1] <= k[0] for k in kept):
+                kept.append(m)
+        matches = sorted(kept)
+    parts: list[str] = []
+    pos = 0
+    for start, end, pii_type in matches:
+        parts.append(text[pos:start])
+        # os.urandom avoids building a UUID per token
+        parts.append(f"[[PII:{pii_type}:{os.urandom(4).hex()}]]")
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
 def restore_text(masked_text: str, token_map: dict[str, str]) -> str:
     """Restore original text by replacing tokens with their original values."""
     result = masked_text
     for token_id, original in token_map.items():
         pattern = rf"\[\[PII:[A-Z_]+:{re.escape(token_id)}\]\]"
-        result = re.sub(pattern, original, result)
+        # A function replacement keeps backslashes in the original literal
+        result = re.sub(pattern, lambda _, original=original: original, result)
     return result
 
 
@@ -0,0 +1,139 @@
+"""Run CPU-bound pipeline stages off the event loop.
+
+PDF parsing, text decoding, regex scanning, span merging, masking and
+envelope encryption all hold the CPU for as long as the document is big.
+Run inline they stall every other request on the worker, ``/health``
+included. Stages are handed to ``offloader.run`` instead, which runs them
+in an executor chosen by ``OFFLOAD_EXECUTOR``:
+
+- ``thread`` (default): a thread pool. The GIL still serializes Python
+  code, but the loop gets a turn every switch interval instead of waiting
+  for the whole stage.
+- ``process``: a spawn process pool for stages whose arguments can be
+  pickled, so stages of different requests really run in parallel. Stages
+  that work on in-process objects (the upload spool, job progress) pass
+  ``portable=False`` and use the thread pool.
+- ``inline``: run on the loop as before; for benchmarks and debugging.
+
+Backpressure: at most ``workers`` stages are submitted to the executor at
+once; the rest wait on the loop, where they stay cancellable. Once
+``max_pending`` stages are waiting, new ones fail fast with 503.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+
+from app.config import settings
+
+T = TypeVar("T")
+
+KINDS = ("inline", "thread", "process")
+
+
+def _init_process(fernet_key: bytes) -> None:
+    # Spawned workers must seal envelopes with the parent's key, generated or not
+    from app import masker
+
+    masker._fernet_key = fernet_key
+
+
+class Offloader:
+    def __init__(self, kind: str, workers: int, max_pending: int) -> None:
+        if kind not in KINDS:
+            raise ValueError(f"OFFLOAD_EXECUTOR must be one of {KINDS}, not {kind!r}")
+        self.kind = kind
+        self.workers = workers or max(1, (os.cpu_count() or 1) // settings.WEB_CONCURRENCY)
+        self.max_pending = max_pending
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._running = 0
+        self._waiting = 0
+        self._calls = 0
+        self._rejected = 0
+        self._waits: deque[float] = deque(maxlen=1000)
+
+    def _executor(self, portable: bool) -> Executor:
+        if self.kind == "process" and portable:
+            if self._processes is None:
+                from app import masker
+
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_process,
+                    initargs=(masker._fernet_key,),
+                )
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="offload")
+        return self._threads
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._slots is None:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.workers)
+            self._running = self._waiting = 0
+        return self._slots
+
+    async def run(self, fn: Callable[..., T], *args: Any, portable: bool = True) -> T:
+        """Run ``fn(*args)`` in the executor; ``portable=False`` keeps it in this process."""
+        self._calls += 1
+        if self.kind == "inline":
+            return fn(*args)
+
+        slots = self._get_slots()
+        if slots.locked() and self._waiting >= self.max_pending:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail=f"Server busy ({self._waiting} stages waiting for a worker); retry later",
+                headers={"Retry-After": "1"},
+            )
+        queued_at = time.monotonic()
+        self._waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self._waiting -= 1
+        self._waits.append(time.monotonic() - queued_at)
+        self._running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor(portable), fn, *args)
+        finally:
+            self._running -= 1
+            slots.release()
+
+    def shutdown(self) -> None:
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._threads = self._processes = None
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "running": self._running,
+            "waiting": self._waiting,
+            "calls": self._calls,
+            "rejected": self._rejected,
+            "p95_wait_ms": round(1000 * waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+        }
+
+
+offloader = Offloader(settings.OFFLOAD_EXECUTOR, settings.OFFLOAD_WORKERS, settings.OFFLOAD_MAX_PENDING)
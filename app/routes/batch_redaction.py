@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import zipfile
+from collections.abc import AsyncIterator, Awaitable, Callable
+from functools import partial
+from tempfile import SpooledTemporaryFile
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.ingest import spool_stream, spool_upload
+from app.routes.redaction import check_model, redact_spooled
+from app.schemas import BatchRedactionItem
+
+log = logging.getLogger(__name__)
+
+router = APIRouter()
+
+_ZIP_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+Spooler = Callable[[], Awaitable[tuple[SpooledTemporaryFile, int, str]]]
+
+
+async def _spool_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> tuple[SpooledTemporaryFile, int, str]:
+    # The declared size is checked first; spool_stream enforces the limit on the actual bytes
+    if info.file_size > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.MAX_UPLOAD_BYTES} bytes")
+
+    def read() -> tuple[SpooledTemporaryFile, int, str]:
+        with archive.open(info) as member:
+            return spool_stream(member)
+
+    return await run_in_threadpool(read)
+
+
+def _expand(files: list[UploadFile]) -> tuple[list[tuple[str | None, Spooler]], list[zipfile.ZipFile]]:
+    """Flatten uploads and zip members into (filename, spooler) jobs."""
+    jobs: list[tuple[str | None, Spooler]] = []
+    archives: list[zipfile.ZipFile] = []
+    for file in files:
+        if (file.filename or "").lower().endswith(".zip") or file.content_type in _ZIP_TYPES:
+            try:
+                archive = zipfile.ZipFile(file.file)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"{file.filename} is not a valid zip archive")
+            archives.append(archive)
+            jobs.extend(
+                (info.filename, partial(_spool_member, archive, info))
+                for info in archive.infolist()
+                if not info.is_dir()
+            )
+        else:
+            jobs.append((file.filename, partial(spool_upload, file)))
+        if len(jobs) > settings.BATCH_MAX_FILES:
+            raise HTTPException(
+                status_code=400, detail=f"Batch exceeds {settings.BATCH_MAX_FILES} files (including zip members)"
+            )
+    return jobs, archives
+
+
+@router.post("/redaction/batch/{model}")
+async def redact_batch(
+    model: str,
+    files: list[UploadFile] = File(..., description="Documents to redact; .zip uploads are expanded"),
+    store_envelope: bool = Query(True, description="Store envelopes for later restore"),
+    include_envelope: bool = Query(False, description="Include envelopes in the results"),
+):
+    """Redact many files in one request, streaming one NDJSON line per file as it finishes.
+
+    Each line is a BatchRedactionItem whose ``result`` has the same shape as
+    the single-file RedactionResponse. Lines arrive in completion order;
+    ``index`` gives the file's position in the request.
+    """
+    check_model(model)
+    jobs, archives = _expand(files)
+
+    async def run(index: int, filename: str | None, spooler: Spooler) -> BatchRedactionItem:
+        try:
+            spool, size, digest = await spooler()
+            result = await redact_spooled(model, spool, size, digest, filename, store_envelope, include_envelope)
+        except HTTPException as exc:
+            return BatchRedactionItem(index=index, filename=filename, status=exc.status_code, error=str(exc.detail))
+        except Exception:
+            log.exception("Batch item %d (%s) failed", index, filename)
+            return BatchRedactionItem(index=index, filename=filename, status=500, error="Internal error")
+        return BatchRedactionItem(index=index, filename=filename, status=200, result=result)
+
+    async def results() -> AsyncIterator[bytes]:
+        pending = iter(enumerate(jobs))
+        done: asyncio.Queue[BatchRedactionItem] = asyncio.Queue()
+
+        async def worker() -> None:
+            # Workers share one iterator, so at most BATCH_CONCURRENCY files are in flight
+            for index, (filename, spooler) in pending:
+                await done.put(await run(index, filename, spooler))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(settings.BATCH_CONCURRENCY, len(jobs)))]
+        try:
+            for _ in range(len(jobs)):
+                item = await done.get()
+                yield (item.model_dump_json() + "\n").encode("utf-8")
+        finally:
+            for task in workers:
+                task.cancel()
+            for archive in archives:
+                archive.close()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
@@ -8,7 +8,7 @@ from google.genai import types
 from app.config import settings
 from app.masker import decrypt_envelope, restore_text
 from app.schemas import ChatRequest, ChatResponse
-from app.storage import get as get_doc
+from app.storage import get_async as get_doc, is_evicted
 
 router = APIRouter()
 
@@ -23,7 +23,9 @@ async def chat(req: ChatRequest):
     # Build system instruction from masked document if doc_id is provided
     config = None
     if req.doc_id:
-        doc = get_doc(req.doc_id)
+        doc = await get_doc(req.doc_id, "masked_text")
+        if doc is None and is_evicted(req.doc_id):
+            raise HTTPException(status_code=410, detail="Document evicted to free memory; upload it again")
         if doc:
             system_instruction = (
                 "아래는 PII가 마스킹된 문서입니다. "
@@ -51,7 +53,7 @@ async def chat(req: ChatRequest):
 
     # Restore masked tokens in LLM response using the encrypted token map
     if req.doc_id:
-        doc = get_doc(req.doc_id)
+        doc = await get_doc(req.doc_id)
         if doc and doc.get("envelope_encrypted"):
             envelope = decrypt_envelope(doc["envelope_encrypted"])
             reply_masked = reply
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import csv
+from pathlib import PurePath
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.csv_redact import CsvRedactor, iter_lines, parse_rules
+from app.ingest import iter_decoded
+
+router = APIRouter()
+
+
+# Registered ahead of /redaction/{model} in app.main so "csv" is not taken as a model name
+@router.post("/redaction/csv")
+async def redact_csv(
+    file: UploadFile = File(...),
+    rules: str | None = Query(
+        None,
+        description='JSON object: column name or index -> "mask" | "skip" | "detect" | [pattern types]',
+    ),
+    has_header: bool = Query(True, description="Treat the first row as column names"),
+):
+    if file.size is not None and file.size > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.MAX_UPLOAD_BYTES} bytes")
+
+    try:
+        parsed = parse_rules(rules)
+        redactor = CsvRedactor(iter_lines(iter_decoded(file.file)), parsed, has_header=has_header)
+    except (ValueError, csv.Error) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    stem = PurePath(file.filename or "upload").stem
+    # A sync iterator: Starlette drives it from the threadpool, row by row
+    return StreamingResponse(
+        iter(redactor),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{stem}_masked.csv"'},
+    )
@@ -1,31 +1,198 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import PlainTextResponse, JSONResponse
+import hashlib
+import re
+import zlib
+from collections.abc import Callable, Iterable, Iterator
 
-from app.storage import get
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.config import settings
+from app.storage import get_async, is_evicted, iter_masked_bytes
+
+try:  # optional: br is only offered when the brotli package is installed
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
 
 router = APIRouter()
 
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def _encoders() -> dict[str, Callable[[Iterable[bytes]], Iterator[bytes]]]:
+    encoders = {"gzip": _gzip_chunks}
+    if brotli is not None:
+        encoders["br"] = _brotli_chunks
+    return encoders
+
+
+def _gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    deflater = zlib.compressobj(settings.DOWNLOAD_COMPRESS_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        if out := deflater.compress(chunk):
+            yield out
+    yield deflater.flush()
+
+
+def _brotli_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = brotli.Compressor(quality=min(settings.DOWNLOAD_COMPRESS_LEVEL, 11))
+    for chunk in chunks:
+        if out := compressor.process(chunk):
+            yield out
+    yield compressor.finish()
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick br or gzip from an Accept-Encoding header (q-values honoured), or None for identity."""
+    offered = _encoders()
+    best, best_q = None, 0.0
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                continue
+        candidates = list(offered) if name == "*" else [name] if name in offered else []
+        for candidate in candidates:
+            # Prefer br over gzip at equal q
+            if q > best_q or (q == best_q and q > 0 and candidate == "br"):
+                best, best_q = candidate, q
+    return best
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in tags
+
+
+def parse_range(header: str, length: int) -> tuple[int, int] | None:
+    """Parse a single ``bytes=`` range into [start, end); None means serve the whole body.
+
+    Raises 416 for a valid range that lies past the end of the body.
+    """
+    m = _RANGE_RE.fullmatch(header.strip())
+    if m is None or (not m.group(1) and not m.group(2)):
+        return None  # multiple or malformed ranges: ignore, as RFC 9110 allows
+    if not m.group(1):
+        start, end = max(length - int(m.group(2)), 0), length
+    else:
+        start = int(m.group(1))
+        if m.group(2) and int(m.group(2)) < start:
+            return None  # last position before first: an invalid range spec, also ignored
+        end = min(int(m.group(2)) + 1, length) if m.group(2) else length
+    if start >= length or start >= end:
+        raise HTTPException(
+            status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{length}"}
+        )
+    return start, end
+
+
+def _slice(chunks: Iterable[bytes], start: int, end: int) -> Iterator[bytes]:
+    pos = 0
+    for chunk in chunks:
+        lo, hi = max(start - pos, 0), min(end - pos, len(chunk))
+        pos += len(chunk)
+        if lo < hi:
+            yield chunk[lo:hi]
+        if pos >= end:
+            return
+
+
+def _send(
+    request: Request,
+    chunks: Callable[[], Iterable[bytes]],
+    length: int,
+    digest: str | None,
+    media_type: str,
+    filename: str,
+) -> Response:
+    """Serve a stored body with conditional GET, byte ranges and compression.
+
+    ``chunks`` is only called when a body is actually sent. Ranges are
+    served uncompressed so offsets refer to the stored bytes; each
+    encoding gets its own strong ETag, as RFC 9110 requires.
+    """
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    byte_range = None
+    unsatisfiable = None
+    if "range" in request.headers:
+        if_range = request.headers.get("if-range")
+        if if_range is None or (digest is not None and if_range == f'"{digest}"'):
+            try:
+                byte_range = parse_range(request.headers["range"], length)
+            except HTTPException as exc:
+                unsatisfiable = exc  # raised only after If-None-Match, which takes precedence
+
+    encoding = None
+    if byte_range is None and unsatisfiable is None and length >= settings.DOWNLOAD_COMPRESS_MIN_BYTES:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+
+    if digest is not None:
+        headers["ETag"] = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    if unsatisfiable is not None:
+        raise unsatisfiable
+
+    if byte_range is not None:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{length}"
+        headers["Content-Length"] = str(end - start)
+        return StreamingResponse(_slice(chunks(), start, end), status_code=206, media_type=media_type, headers=headers)
+    if encoding is not None:
+        # Compressed length is unknown up front: sent chunked
+        headers["Content-Encoding"] = encoding
+        return StreamingResponse(_encoders()[encoding](chunks()), media_type=media_type, headers=headers)
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(chunks(), media_type=media_type, headers=headers)
+
 
 @router.get("/download/{doc_id}")
 async def download(
+    request: Request,
     doc_id: str,
     format: str = Query("masked", description="'masked' or 'audit'"),
 ):
-    entry = get(doc_id)
+    entry = await get_async(doc_id)
     if entry is None:
+        if is_evicted(doc_id):
+            raise HTTPException(status_code=410, detail="Document evicted to free memory; upload it again")
         raise HTTPException(status_code=404, detail="Document not found or expired")
 
     if format == "masked":
-        return PlainTextResponse(
-            content=entry["masked_text"],
-            headers={"Content-Disposition": f'attachment; filename="{doc_id}_masked.txt"'},
+        # Inflate the stored blob chunk by chunk instead of building the whole string
+        return _send(
+            request,
+            lambda: iter_masked_bytes(doc_id),
+            entry["masked_bytes"],
+            entry["masked_sha256"],
+            "text/plain; charset=utf-8",
+            f"{doc_id}_masked.txt",
         )
     elif format == "audit":
-        return JSONResponse(
-            content=entry["audit"].model_dump(),
-            headers={"Content-Disposition": f'attachment; filename="{doc_id}_audit.json"'},
+        # Send the audit as serialized at store time; no Span models are built
+        audit_json = entry["audit_json"]
+        return _send(
+            request,
+            lambda: [audit_json],
+            len(audit_json),
+            hashlib.sha256(audit_json).hexdigest(),
+            "application/json",
+            f"{doc_id}_audit.json",
         )
     else:
         raise HTTPException(status_code=400, detail="format must be 'masked' or 'audit'")
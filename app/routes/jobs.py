@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import JSONResponse
+
+from app import jobs
+from app.ingest import spool_upload
+from app.masker import decrypt_envelope
+from app.routes.redaction import check_model, redact_spooled
+from app.schemas import JobProgress, JobStatus, RedactionResponse
+from app.storage import get_async, is_evicted
+
+router = APIRouter()
+
+
+def _job_or_404(job_id: str) -> jobs.Job:
+    job = jobs.queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+@router.post("/jobs/{model}", status_code=202, response_model=JobStatus)
+async def submit_job(
+    model: str,
+    file: UploadFile = File(...),
+    store_envelope: bool = Query(True, description="Store envelope for later restore"),
+    include_envelope: bool = Query(False, description="Include envelope in the result"),
+):
+    """Queue a redaction and return its job ID at once; poll GET /jobs/{job_id} for progress."""
+    check_model(model)
+    if include_envelope and not store_envelope:
+        # The job keeps no plaintext token map; the result reads the stored, encrypted copy
+        raise HTTPException(status_code=400, detail="include_envelope requires store_envelope for jobs")
+
+    # The upload is gone once this request ends, so spool it now
+    spool, size, digest = await spool_upload(file)
+    filename = file.filename
+
+    async def work(progress: JobProgress) -> dict:
+        result = await redact_spooled(model, spool, size, digest, filename, store_envelope, False, progress)
+        # Masked text, audit and envelope are in storage (the envelope encrypted,
+        # under its TTL); keep only what storage does not have
+        return {"doc_id": result.doc_id, "include_envelope": include_envelope, "cache_hit": result.cache_hit}
+
+    job = jobs.queue.submit(jobs.Job(model=model, filename=filename, work=work, on_discard=spool.close))
+    return JSONResponse(
+        status_code=202,
+        content=job.status().model_dump(),
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str):
+    return _job_or_404(job_id).status()
+
+
+@router.get("/jobs/{job_id}/result", response_model=RedactionResponse)
+async def job_result(job_id: str):
+    """The RedactionResponse of a finished job, or the error it failed with."""
+    job = _job_or_404(job_id)
+    if job.state == "failed":
+        raise HTTPException(status_code=job.error_status or 500, detail=job.error)
+    if job.state != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.state}")
+
+    doc_id = job.result["doc_id"]
+    entry = await get_async(doc_id, "masked_text", "audit")
+    if entry is None:
+        if is_evicted(doc_id):
+            raise HTTPException(status_code=410, detail="Document evicted to free memory; upload it again")
+        raise HTTPException(status_code=404, detail="Document not found or expired")
+    envelope = None
+    if job.result["include_envelope"] and entry.get("envelope_encrypted"):
+        envelope = decrypt_envelope(entry["envelope_encrypted"])
+    return RedactionResponse(
+        doc_id=doc_id,
+        masked_text=entry["masked_text"],
+        audit=entry["audit"],
+        envelope=envelope,
+        cache_hit=job.result["cache_hit"],
+    )
+
+
+@router.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; 409 if it has already finished."""
+    job = _job_or_404(job_id)
+    if not jobs.queue.cancel(job):
+        raise HTTPException(status_code=409, detail=f"Job already {job.state}")
+    return job.status()
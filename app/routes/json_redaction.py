@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+from pathlib import PurePath
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.detectors import korean_name_detector, ner_detector, regex_detector
+from app.ingest import iter_decoded
+from app.json_redact import JSONStreamError, JsonRedactor
+from app.masker import encrypt_envelope
+from app.schemas import Envelope, Span
+
+router = APIRouter()
+
+_JSON_MODELS = {"regex", "ner", "hybrid"}
+
+
+def _leaf_detector(model: str):
+    def detect(value: str) -> list[Span]:
+        spans: list[Span] = []
+        if model in ("regex", "hybrid"):
+            spans.extend(regex_detector.detect(value))
+        if model in ("ner", "hybrid"):
+            spans.extend(ner_detector.detect(value))
+            spans.extend(korean_name_detector.detect(value))
+        return spans
+
+    return detect
+
+
+# Registered ahead of /redaction/{model} in app.main so "json" is not taken as a model name
+@router.post("/redaction/json")
+async def redact_json(
+    file: UploadFile = File(...),
+    model: str = Query("regex", description="Detectors for string leaves: regex, ner or hybrid (no LLM)"),
+    include: list[str] | None = Query(None, description="JSONPath rules selecting leaves to scan (default: $)"),
+    exclude: list[str] | None = Query(None, description="JSONPath rules for leaves to leave untouched"),
+    include_envelope: bool = Query(
+        False, description='Wrap output as {"doc": ..., "envelope_encrypted": ...} for later restore'
+    ),
+):
+    if model not in _JSON_MODELS:
+        raise HTTPException(status_code=400, detail=f"Invalid model. Choose from: {_JSON_MODELS}")
+    if file.size is not None and file.size > settings.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.MAX_UPLOAD_BYTES} bytes")
+
+    try:
+        redactor = JsonRedactor(
+            iter_decoded(file.file), _leaf_detector(model), include=include or ("$",), exclude=exclude or ()
+        )
+        chunks = iter(redactor)
+        # Pull the first chunk up front so malformed documents still get a 400
+        first = await run_in_threadpool(next, chunks, "")
+    except JSONStreamError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    def body() -> Iterator[bytes]:
+        if include_envelope:
+            yield b'{"doc": '
+        yield first.encode("utf-8")
+        for chunk in chunks:
+            yield chunk.encode("utf-8")
+        if include_envelope:
+            envelope = encrypt_envelope(Envelope(token_map=redactor.token_map))
+            yield f', "envelope_encrypted": {json.dumps(envelope)}}}'.encode("utf-8")
+
+    stem = PurePath(file.filename or "upload").stem
+    return StreamingResponse(
+        body(),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{stem}_masked.json"'},
+    )
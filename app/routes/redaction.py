@@ -1,75 +1,133 @@
 from __future__ import annotations
 
+from tempfile import SpooledTemporaryFile
+
 from fastapi import APIRouter, File, HTTPException, Query, UploadFile
 
+from app import detection
 from app.config import settings
-from app.detectors import ner_detector, regex_detector, llm_detector
-from app.ingest import extract_text
+from app.cache import CachedResult, result_cache
+from app.ingest import Document, document_kind, read_document, spool_upload
 from app.masker import encrypt_envelope, mask_text
 from app.merger import merge_spans
-from app.schemas import Audit, Envelope, RedactionResponse
-from app.storage import store
+from app.offload import offloader
+from app.schemas import Audit, Envelope, JobProgress, RedactionResponse, Span
+from app.storage import store_async
 
 router = APIRouter()
 
 
-@router.post("/redaction/{model}", response_model=RedactionResponse)
-async def redact(
-    model: str,
-    file: UploadFile = File(...),
-    policy: str = Query("mask", description="Redaction policy"),
-    store_envelope: bool = Query(True, description="Store envelope for later restore"),
-    include_envelope: bool = Query(False, description="Include envelope in response"),
-):
-    # Validate model
-    valid_models = {"regex", "ner", "gemini", "hybrid"}
-    if model not in valid_models:
-        raise HTTPException(status_code=400, detail=f"Invalid model. Choose from: {valid_models}")
+async def _detect(model: str, doc: Document, progress: JobProgress | None = None) -> tuple[list[Span], list[str]]:
+    """Run the detectors for ``model`` and return (merged spans, sources used)."""
+    all_spans, sources_used = await detection.detect(model, doc.text, progress)
+    merged = await offloader.run(_merge, all_spans, doc)
+    return merged, sources_used
 
-    if model == "gemini" and not settings.ALLOW_REMOTE_LLM:
-        raise HTTPException(status_code=403, detail="Remote LLM calls disabled (ALLOW_REMOTE_LLM=false)")
 
-    # Extract text
-    text, kind = await extract_text(file)
+def _merge(spans: list[Span], doc: Document) -> list[Span]:
+    """Offload worker: merge overlapping spans and attach page numbers."""
+    merged = merge_spans(spans)
+    for span in merged:
+        span.page = doc.page_of(span.start)
+    return merged
 
-    # Detect spans
-    all_spans = []
-    sources_used = []
 
-    if model in ("regex", "hybrid"):
-        all_spans.extend(regex_detector.detect(text))
-        sources_used.append("regex")
+def _seal(
+    text: str, merged: list[Span], sources_used: list[str], store_envelope: bool
+) -> tuple[str, Audit, Envelope, str | None]:
+    """Offload worker: mask with fresh tokens, build the audit and encrypt the envelope."""
+    masked_text, token_map = mask_text(text, merged)
+    audit = Audit(spans=merged, total_found=len(merged), sources_used=sources_used)
+    envelope = Envelope(token_map=token_map)
+    envelope_encrypted = encrypt_envelope(envelope) if store_envelope else None
+    return masked_text, audit, envelope, envelope_encrypted
 
-    if model in ("ner", "hybrid"):
-        all_spans.extend(ner_detector.detect(text))
-        sources_used.append("ner")
 
-    if model in ("gemini", "hybrid"):
-        if not settings.ALLOW_REMOTE_LLM:
-            raise HTTPException(status_code=403, detail="Remote LLM calls disabled (ALLOW_REMOTE_LLM=false)")
-        llm_spans = llm_detector.detect(text, pre_masked_spans=all_spans)
-        all_spans.extend(llm_spans)
-        sources_used.append("llm")
+VALID_MODELS = {"regex", "ner", "gemini", "hybrid"}
 
-    # Merge overlapping spans
-    merged = merge_spans(all_spans)
 
-    # Mask
-    masked_text, token_map = mask_text(text, merged)
+def check_model(model: str) -> None:
+    """Raise 400 for an unknown model and 403 for LLM models while remote calls are disabled."""
+    if model not in VALID_MODELS:
+        raise HTTPException(status_code=400, detail=f"Invalid model. Choose from: {VALID_MODELS}")
 
-    # Build audit
-    audit = Audit(spans=merged, total_found=len(merged), sources_used=sources_used)
+    # Checked before the cache lookup so cached LLM results obey the switch too
+    if model in ("gemini", "hybrid") and not settings.ALLOW_REMOTE_LLM:
+        raise HTTPException(status_code=403, detail="Remote LLM calls disabled (ALLOW_REMOTE_LLM=false)")
 
-    # Build envelope
-    envelope = Envelope(token_map=token_map)
-    envelope_encrypted = encrypt_envelope(envelope) if store_envelope else None
+
+async def redact_spooled(
+    model: str,
+    spool: SpooledTemporaryFile,
+    size: int,
+    digest: str,
+    filename: str | None,
+    store_envelope: bool = True,
+    include_envelope: bool = False,
+    progress: JobProgress | None = None,
+) -> RedactionResponse:
+    """Redact one spooled upload: cache lookup, extraction, detection, masking, storage.
+
+    Closes ``spool``. Shared by the single-file, batch and job endpoints;
+    jobs pass ``progress`` to have it updated as the stages complete.
+    """
+    cache_key = result_cache.make_key(digest, model, document_kind(filename))
+    cached = result_cache.get(cache_key)
+
+    if cached is not None:
+        spool.close()
+        text = cached.text
+        merged = [span.model_copy() for span in cached.spans]
+        sources_used = list(cached.sources_used)
+    else:
+        if progress is not None:
+            progress.stage = "extracting"
+        with spool:
+            doc = await read_document(spool, size, filename, progress)
+        text = doc.text
+        if progress is not None:
+            progress.stage = "detecting"
+        merged, sources_used = await _detect(model, doc, progress)
+        # A degraded run (LLM skipped or cut short, deadline missed) must not be replayed once it would succeed
+        if not any(source.endswith(("_skipped", "_partial")) for source in sources_used):
+            result_cache.put(
+                cache_key,
+                CachedResult(
+                    text=text,
+                    spans=tuple(span.model_copy() for span in merged),
+                    sources_used=tuple(sources_used),
+                ),
+            )
+
+    # Mask with fresh tokens, even on a cache hit
+    if progress is not None:
+        progress.stage = "masking"
+    masked_text, audit, envelope, envelope_encrypted = await offloader.run(
+        _seal, text, merged, sources_used, store_envelope
+    )
 
     # Store
-    doc_id = store(masked_text, audit, envelope_encrypted)
+    doc_id = await store_async(masked_text, audit, envelope_encrypted)
 
     return RedactionResponse(
         doc_id=doc_id,
         masked_text=masked_text,
         audit=audit,
         envelope=envelope if include_envelope else None,
+        cache_hit=cached is not None,
     )
+
+
+@router.post("/redaction/{model}", response_model=RedactionResponse)
+async def redact(
+    model: str,
+    file: UploadFile = File(...),
+    policy: str = Query("mask", description="Redaction policy"),
+    store_envelope: bool = Query(True, description="Store envelope for later restore"),
+    include_envelope: bool = Query(False, description="Include envelope in response"),
+):
+    check_model(model)
+
+    # Spool the upload (hashing it on the way), then run the pipeline
+    spool, size, digest = await spool_upload(file)
+    return await redact_spooled(model, spool, size, digest, file.filename, store_envelope, include_envelope)
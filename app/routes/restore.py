@@ -5,7 +5,7 @@ from fastapi import APIRouter, Header, HTTPException
 from app.config import settings
 from app.masker import decrypt_envelope, restore_text
 from app.schemas import RestoreResponse
-from app.storage import get
+from app.storage import get_async, is_evicted
 
 router = APIRouter()
 
@@ -18,8 +18,10 @@ async def restore(
     if x_admin_key != settings.ADMIN_KEY:
         raise HTTPException(status_code=403, detail="Invalid admin key")
 
-    entry = get(doc_id)
+    entry = await get_async(doc_id, "masked_text")
     if entry is None:
+        if is_evicted(doc_id):
+            raise HTTPException(status_code=410, detail="Document evicted to free memory; upload it again")
         raise HTTPException(status_code=404, detail="Document not found or expired")
 
     if not entry.get("envelope_encrypted"):
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Iterator
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.ingest import spool_upload
+from app.routes.redaction import check_model, redact_spooled
+from app.schemas import JobProgress, RedactionStreamEvent
+
+log = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def iter_text_pieces(text: str, size: int) -> Iterator[str]:
+    """Split masked text into pieces of about ``size`` characters.
+
+    Pieces end after a newline where there is one, and never inside a
+    ``[[PII:...]]`` token, so each piece can be rendered on its own.
+    """
+    pos = 0
+    while pos < len(text):
+        end = min(pos + size, len(text))
+        if end < len(text):
+            newline = text.rfind("\n", pos, end)
+            if newline >= pos:
+                end = newline + 1
+            else:
+                # A token crossing the cut: end before it, or after it if it starts the piece
+                opened = text.rfind("[[", pos, end + 1)
+                if opened != -1 and opened < end and text.find("]]", opened, end) == -1:
+                    closed = text.find("]]", opened)
+                    end = opened if opened > pos else (closed + 2 if closed != -1 else end)
+        yield text[pos:end]
+        pos = end
+
+
+def _line(event: RedactionStreamEvent) -> bytes:
+    # Only top-level fields are dropped; span fields such as page stay even when None
+    fields = {k: v for k, v in event.model_dump(mode="json").items() if v is not None}
+    return (json.dumps(fields, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+@router.post("/redaction/stream/{model}")
+async def redact_stream(
+    model: str,
+    file: UploadFile = File(...),
+    store_envelope: bool = Query(True, description="Store envelope for later restore"),
+    include_envelope: bool = Query(False, description="Include envelope in the result event"),
+):
+    """Redact one file, streaming NDJSON events while it is processed.
+
+    ``progress`` events report the stage, pages extracted and detectors
+    finished whenever they change. Once masking is done the masked text
+    follows as ``text`` events (concatenate them in order), then one
+    ``result`` event carries the doc_id, audit and optional envelope.
+    Failures after the stream has started arrive as an ``error`` event
+    with the status the plain endpoint would have returned.
+    """
+    check_model(model)
+    spool, size, digest = await spool_upload(file)
+    filename = file.filename
+
+    # Started here rather than in events(): a body that is never iterated (client
+    # gone before it starts) would otherwise leave the spool open.
+    progress = JobProgress()
+    task = asyncio.ensure_future(
+        redact_spooled(model, spool, size, digest, filename, store_envelope, include_envelope, progress)
+    )
+    # redact_spooled closes the spool, except when cancelled before its first step
+    task.add_done_callback(lambda _: spool.close())
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            last = None
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=settings.STREAM_PROGRESS_INTERVAL_MS / 1000)
+                snapshot = progress.model_dump()
+                if snapshot != last and not (done and progress.stage == "queued"):
+                    last = snapshot
+                    yield _line(RedactionStreamEvent(event="progress", progress=progress))
+                if done:
+                    break
+            try:
+                result = task.result()
+            except HTTPException as exc:
+                yield _line(RedactionStreamEvent(event="error", status=exc.status_code, error=str(exc.detail)))
+                return
+            except Exception:
+                log.exception("Streaming redaction of %s failed", filename)
+                yield _line(RedactionStreamEvent(event="error", status=500, error="Internal error"))
+                return
+
+            for piece in iter_text_pieces(result.masked_text, settings.STREAM_CHUNK_CHARS):
+                yield _line(RedactionStreamEvent(event="text", text=piece))
+            yield _line(
+                RedactionStreamEvent(
+                    event="result",
+                    doc_id=result.doc_id,
+                    audit=result.audit,
+                    envelope=result.envelope,
+                    cache_hit=result.cache_hit,
+                )
+            )
+        finally:
+            # Client went away: stop the pipeline instead of finishing unseen work
+            task.cancel()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -10,6 +10,7 @@ class Span(BaseModel):
     text: str
     source: str  # "regex" | "ner" | "llm"
     confidence: float = 1.0
+    page: int | None = None  # 1-based PDF page, set when the source is paged
 
 
 class Audit(BaseModel):
@@ -27,6 +28,49 @@ class RedactionResponse(BaseModel):
     masked_text: str
     audit: Audit
     envelope: Envelope | None = None
+    cache_hit: bool = False
+
+
+class BatchRedactionItem(BaseModel):
+    index: int  # position of the file (or zip member) in the request
+    filename: str | None
+    status: int  # HTTP status the single-file endpoint would have returned
+    result: RedactionResponse | None = None
+    error: str | None = None
+
+
+class JobProgress(BaseModel):
+    stage: str = "queued"  # queued | extracting | detecting | masking | done
+    pages_total: int | None = None  # set once a PDF has been opened
+    pages_extracted: int = 0
+    detectors_done: list[str] = []
+
+
+class RedactionStreamEvent(BaseModel):
+    """One NDJSON line of POST /redaction/stream/{model}; unused top-level fields are omitted."""
+
+    event: str  # progress | text | result | error
+    progress: JobProgress | None = None  # progress
+    text: str | None = None  # text: the next piece of masked text
+    doc_id: str | None = None  # result
+    audit: Audit | None = None  # result
+    envelope: Envelope | None = None  # result, with include_envelope
+    cache_hit: bool | None = None  # result
+    status: int | None = None  # error
+    error: str | None = None  # error
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    model: str
+    filename: str | None
+    state: str  # queued | running | done | failed | cancelled
+    progress: JobProgress
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    doc_id: str | None = None  # set once the job is done; fetch the result or use /download
+    error: str | None = None
 
 
 class RestoreRequest(BaseModel):
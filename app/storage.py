@@ -1,39 +1,659 @@
+"""Document storage for masked text, audits and encrypted envelopes.
+
+Two backends implement the same ``store`` / ``get`` / ``cleanup`` methods,
+selected with ``STORAGE_BACKEND``:
+
+- ``memory``: entries live in the process-local ``_store`` dict and are
+  lost on restart. ``STORAGE_MAX_BYTES`` caps their total size; least
+  recently used documents are evicted past it.
+- ``sqlite``: entries live in a SQLite database in WAL mode at
+  ``STORAGE_SQLITE_PATH``.
+
+Both backends keep masked text and the serialized audit zlib-compressed
+(``STORAGE_COMPRESS_LEVEL``). ``get`` returns a read-only mapping that
+decompresses ``masked_text`` and hydrates ``audit`` only when those keys
+are accessed, so looking up an envelope does not inflate the document.
+``iter_masked_bytes`` streams the text without materializing it, and
+recently decompressed texts are kept in ``text_cache`` for callers such
+as /chat that need the whole string repeatedly.
+
+The SQLite file can be shared by several uvicorn workers on one host;
+``check_shared_state`` guards against workers that would disagree on the
+store or the envelope key. A write may then wait for another worker's
+lock, so request handlers use ``store_async`` / ``get_async`` /
+``cleanup_async``, which run SQLite calls on the backend's own thread.
+
+Both backends expire entries ``DOC_TTL_SEC`` after they were stored, and
+both can report the next expiry deadline so the cleanup task can sleep
+until it instead of polling.
+"""
+
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import heapq
+import sqlite3
+import sys
+import threading
 import time
 import uuid
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
 
 from app.config import settings
 from app.schemas import Audit
 
 
-_store: dict[str, dict] = {}
+T = TypeVar("T")
 
+_store: OrderedDict[str, dict] = OrderedDict()
 
-def store(masked_text: str, audit: Audit, envelope_encrypted: str | None = None) -> str:
-    doc_id = uuid.uuid4().hex[:12]
-    _store[doc_id] = {
-        "masked_text": masked_text,
-        "audit": audit,
-        "envelope_encrypted": envelope_encrypted,
-        "created_at": time.time(),
+_INFLATE_CHUNK = 64 * 1024
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def _expired(created_at: float, now: float) -> bool:
+    return now - created_at > settings.DOC_TTL_SEC
+
+
+def _pack(masked_text: str, audit: Audit) -> tuple[bytes, int, bytes, int, str]:
+    """Compress a document.
+
+    Returns (masked blob, masked UTF-8 size, audit blob, uncompressed
+    total, SHA-256 of the masked UTF-8 text). The digest lets downloads
+    send a content-derived ETag without decompressing anything.
+    """
+    level = settings.STORAGE_COMPRESS_LEVEL
+    raw_text = masked_text.encode("utf-8")
+    raw_audit = audit.model_dump_json().encode("utf-8")
+    return (
+        zlib.compress(raw_text, level),
+        len(raw_text),
+        zlib.compress(raw_audit, level),
+        len(raw_text) + len(raw_audit),
+        hashlib.sha256(raw_text).hexdigest(),
+    )
+
+
+def _inflate_chunks(blob: bytes) -> Iterator[bytes]:
+    """Decompress ``blob`` in bounded pieces of at most _INFLATE_CHUNK bytes."""
+    inflater = zlib.decompressobj()
+    data = blob
+    while data:
+        chunk = inflater.decompress(data, _INFLATE_CHUNK)
+        data = inflater.unconsumed_tail
+        if chunk:
+            yield chunk
+    tail = inflater.flush()
+    if tail:
+        yield tail
+
+
+class TextCache:
+    """LRU of decompressed masked texts bounded by an approximate byte budget.
+
+    Also times every decompression it performs, so the cost of keeping
+    documents compressed shows up in /metrics.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._inflated_bytes = 0
+        self._inflate_sec = 0.0
+
+    def load(self, doc_id: str, fetch: Callable[[], bytes]) -> str:
+        text = self._entries.get(doc_id)
+        if text is not None:
+            self._entries.move_to_end(doc_id)
+            self._hits += 1
+            return text
+        self._misses += 1
+        started = time.perf_counter()
+        raw = zlib.decompress(fetch())
+        text = raw.decode("utf-8")
+        self._inflate_sec += time.perf_counter() - started
+        self._inflated_bytes += len(raw)
+
+        size = sys.getsizeof(text)
+        if 0 < size <= self.max_bytes:
+            self._entries[doc_id] = text
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= sys.getsizeof(evicted)
+        return text
+
+    def discard(self, doc_id: str) -> None:
+        text = self._entries.pop(doc_id, None)
+        if text is not None:
+            self._bytes -= sys.getsizeof(text)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            "inflate_ms_total": round(self._inflate_sec * 1000, 3),
+            "inflate_mb_per_s": round(self._inflated_bytes / self._inflate_sec / 1e6, 1) if self._inflate_sec else 0.0,
+        }
+
+
+text_cache = TextCache(settings.STORAGE_TEXT_CACHE_BYTES)
+
+
+def _compression_stats(entries: int, nbytes: int, raw_bytes: int) -> dict:
+    return {
+        "entries": entries,
+        "bytes": nbytes,
+        "raw_bytes": raw_bytes,
+        "compression_ratio": round(raw_bytes / nbytes, 2) if nbytes else 0.0,
+        "bytes_per_doc": nbytes // entries if entries else 0,
     }
-    return doc_id
 
 
-def get(doc_id: str) -> dict | None:
-    entry = _store.get(doc_id)
-    if entry is None:
-        return None
-    if time.time() - entry["created_at"] > settings.DOC_TTL_SEC:
-        _store.pop(doc_id, None)
-        return None
-    return entry
+class _Entry(Mapping):
+    """Read-only view of a stored document.
+
+    ``masked_text`` is decompressed (through ``text_cache``) and ``audit``
+    hydrated on first access. ``audit_json`` is the serialized audit as
+    stored, for callers that only pass it on and never need Span objects.
+    """
+
+    _KEYS = (
+        "masked_text", "masked_bytes", "masked_sha256", "audit", "audit_json", "envelope_encrypted", "created_at",
+    )
+
+    def __init__(self, backend: MemoryBackend | SqliteBackend, doc_id: str, audit_blob: bytes,
+                 envelope_encrypted: str | None, created_at: float, masked_bytes: int,
+                 masked_sha256: str | None) -> None:
+        self._backend = backend
+        self._doc_id = doc_id
+        self._audit_blob = audit_blob
+        self._values: dict = {
+            "envelope_encrypted": envelope_encrypted,
+            "created_at": created_at,
+            "masked_bytes": masked_bytes,
+            "masked_sha256": masked_sha256,  # None for rows stored before the column existed
+        }
+
+    def __getitem__(self, key: str):
+        if key not in self._values:
+            if key == "masked_text":
+                self._values[key] = self._backend.read_masked_text(self._doc_id)
+            elif key == "audit_json":
+                self._values[key] = zlib.decompress(self._audit_blob)
+            elif key == "audit":
+                self._values[key] = Audit.model_validate_json(self["audit_json"])
+            else:
+                raise KeyError(key)
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+
+# Rough per-entry overhead of the entry dict, heap item and bookkeeping
+_ENTRY_OVERHEAD = 400
+
+
+def entry_nbytes(masked_blob: bytes, audit_blob: bytes, envelope_encrypted: str | None) -> int:
+    """Approximate memory held by one stored (compressed) document."""
+    return (
+        _ENTRY_OVERHEAD
+        + len(masked_blob)
+        + len(audit_blob)
+        + (len(envelope_encrypted) if envelope_encrypted else 0)
+    )
+
+
+class MemoryBackend:
+    """Process-local LRU of compressed entries bounded by a byte budget.
+
+    Expiries are tracked in a min-heap: ``cleanup`` pops only the heap
+    entries whose deadline has passed, so its cost depends on the number
+    of expired documents, not on the number of live ones. Entries dropped
+    early by ``get`` or by eviction leave a stale heap item behind, which
+    is discarded when its deadline comes up.
+
+    When ``max_bytes`` is set, storing a document evicts least recently
+    used ones until the total fits again; the newest document itself is
+    never evicted. Evicted ids are remembered until their TTL would have
+    run out so callers can tell them apart from unknown ids.
+    """
+
+    def __init__(self, entries: OrderedDict[str, dict], max_bytes: int = 0) -> None:
+        self._entries = entries
+        self.max_bytes = max_bytes
+        self._expiries: list[tuple[float, str]] = []  # (created_at, doc_id)
+        self._evicted: set[str] = set()
+        self._bytes = 0
+        self._raw_bytes = 0
+        self._evictions = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        # Plain dict work that never waits on a lock; not thread-safe, so it stays on the loop
+        return fn(*args)
+
+    def store(self, masked_text: str, audit: Audit, envelope_encrypted: str | None = None) -> str:
+        doc_id = _new_id()
+        created_at = time.time()
+        masked_blob, masked_bytes, audit_blob, raw_bytes, masked_sha256 = _pack(masked_text, audit)
+        nbytes = entry_nbytes(masked_blob, audit_blob, envelope_encrypted)
+        self._entries[doc_id] = {
+            "masked_blob": masked_blob,
+            "masked_bytes": masked_bytes,
+            "masked_sha256": masked_sha256,
+            "audit_blob": audit_blob,
+            "envelope_encrypted": envelope_encrypted,
+            "created_at": created_at,
+            "nbytes": nbytes,
+            "raw_bytes": raw_bytes,
+        }
+        self._bytes += nbytes
+        self._raw_bytes += raw_bytes
+        heapq.heappush(self._expiries, (created_at, doc_id))
+        if self.max_bytes > 0:
+            self._evict()
+        return doc_id
+
+    def _forget(self, doc_id: str, entry: dict) -> None:
+        self._bytes -= entry["nbytes"]
+        self._raw_bytes -= entry["raw_bytes"]
+        text_cache.discard(doc_id)
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            doc_id, entry = self._entries.popitem(last=False)
+            self._forget(doc_id, entry)
+            self._evicted.add(doc_id)
+            self._evictions += 1
+
+    def _drop(self, doc_id: str) -> bool:
+        entry = self._entries.pop(doc_id, None)
+        if entry is None:
+            return False
+        self._forget(doc_id, entry)
+        return True
+
+    def get(self, doc_id: str) -> Mapping | None:
+        entry = self._entries.get(doc_id)
+        if entry is None:
+            return None
+        if _expired(entry["created_at"], time.time()):
+            self._drop(doc_id)
+            return None
+        self._entries.move_to_end(doc_id)
+        return _Entry(self, doc_id, entry["audit_blob"], entry["envelope_encrypted"],
+                      entry["created_at"], entry["masked_bytes"], entry["masked_sha256"])
+
+    def masked_blob(self, doc_id: str) -> bytes:
+        return self._entries[doc_id]["masked_blob"]
+
+    def read_masked_text(self, doc_id: str) -> str:
+        return text_cache.load(doc_id, lambda: self.masked_blob(doc_id))
+
+    def is_evicted(self, doc_id: str) -> bool:
+        return doc_id in self._evicted
+
+    def cleanup(self) -> int:
+        cutoff = time.time() - settings.DOC_TTL_SEC
+        heap = self._expiries
+        removed = 0
+        while heap and heap[0][0] < cutoff:
+            _, doc_id = heapq.heappop(heap)
+            self._evicted.discard(doc_id)
+            if self._drop(doc_id):
+                removed += 1
+        return removed
+
+    def next_expiry(self) -> float | None:
+        # The heap head may be stale; an early wake-up just finds nothing to remove
+        return self._expiries[0][0] + settings.DOC_TTL_SEC if self._expiries else None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._expiries.clear()
+        self._evicted.clear()
+        self._bytes = 0
+        self._raw_bytes = 0
+        text_cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            **_compression_stats(len(self._entries), self._bytes, self._raw_bytes),
+            "max_bytes": self.max_bytes,
+            "evictions": self._evictions,
+            "evicted_ids_tracked": len(self._evicted),
+            "text_cache": text_cache.stats(),
+        }
+
+
+_BUSY_TIMEOUT_MS = 5000  # wait for another worker's write instead of failing with "database is locked"
+_SQLITE_THREADS = 1  # the connection is serialized by its lock, so more threads would only queue
+
+
+class SqliteBackend:
+    _DOCUMENTS = """
+        CREATE TABLE IF NOT EXISTS documents (
+            doc_id TEXT PRIMARY KEY,
+            created_at REAL NOT NULL,
+            audit BLOB NOT NULL,
+            envelope_encrypted TEXT,
+            masked_text BLOB NOT NULL,
+            masked_bytes INTEGER NOT NULL,
+            raw_bytes INTEGER NOT NULL,
+            masked_sha256 TEXT
+        );
+        CREATE INDEX IF NOT EXISTS documents_created_at ON documents (created_at);
+    """
+    _SCHEMA = _DOCUMENTS + """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path: str) -> None:
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; one connection per process, shared by the event loop and worker threads.
+        # Other uvicorn workers open their own connection to the same file.
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Calls from the event loop run here: a write can wait up to busy_timeout
+        # for another worker's lock, which must not freeze this worker's loop.
+        self._executor = ThreadPoolExecutor(max_workers=_SQLITE_THREADS, thread_name_prefix="sqlite")
+        with self._lock:
+            self._conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            if "masked_bytes" not in self._columns():
+                self._migrate_uncompressed()
+            self._conn.executescript(self._SCHEMA)
+            if "masked_sha256" not in self._columns():
+                # Store created before downloads had ETags; old rows keep NULL
+                self._conn.execute("ALTER TABLE documents ADD COLUMN masked_sha256 TEXT")
+
+    def _columns(self) -> set[str]:
+        return {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+
+    def _migrate_uncompressed(self) -> None:
+        """Rewrite a store created before audits were compressed.
+
+        Such files keep ``audit`` as JSON text and lack the size columns, so
+        the table is rebuilt with every unexpired row repacked. A fresh file
+        has no documents table at all and is left to ``_SCHEMA``.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have migrated while we waited for the lock.
+            columns = self._columns()
+            if columns and "masked_bytes" not in columns:
+                self._conn.execute("ALTER TABLE documents RENAME TO documents_legacy")
+                self._conn.execute("DROP INDEX IF EXISTS documents_created_at")
+                for statement in self._DOCUMENTS.split(";"):
+                    if statement.strip():
+                        self._conn.execute(statement)
+                rows = self._conn.execute(
+                    "SELECT doc_id, created_at, audit, envelope_encrypted, masked_text"
+                    " FROM documents_legacy WHERE created_at >= ?",
+                    (time.time() - settings.DOC_TTL_SEC,),
+                ).fetchall()
+                level = settings.STORAGE_COMPRESS_LEVEL
+                for doc_id, created_at, audit_json, envelope_encrypted, masked_blob in rows:
+                    raw_text = zlib.decompress(masked_blob)
+                    raw_audit = audit_json.encode("utf-8")
+                    self._conn.execute(
+                        "INSERT INTO documents (doc_id, created_at, audit, envelope_encrypted, masked_text,"
+                        " masked_bytes, raw_bytes, masked_sha256) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (doc_id, created_at, zlib.compress(raw_audit, level), envelope_encrypted, masked_blob,
+                         len(raw_text), len(raw_text) + len(raw_audit), hashlib.sha256(raw_text).hexdigest()),
+                    )
+                self._conn.execute("DROP TABLE documents_legacy")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def store(self, masked_text: str, audit: Audit, envelope_encrypted: str | None = None) -> str:
+        doc_id = _new_id()
+        masked_blob, masked_bytes, audit_blob, raw_bytes, masked_sha256 = _pack(masked_text, audit)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO documents (doc_id, created_at, audit, envelope_encrypted, masked_text,"
+                " masked_bytes, raw_bytes, masked_sha256) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (doc_id, time.time(), audit_blob, envelope_encrypted, masked_blob, masked_bytes, raw_bytes,
+                 masked_sha256),
+            )
+        return doc_id
+
+    def get(self, doc_id: str) -> Mapping | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT audit, envelope_encrypted, created_at, masked_bytes, masked_sha256"
+                " FROM documents WHERE doc_id = ?",
+                (doc_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            if _expired(row[2], time.time()):
+                self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+                return None
+        return _Entry(self, doc_id, *row)
+
+    def masked_blob(self, doc_id: str) -> bytes:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT masked_text FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(doc_id)
+        return row[0]
+
+    def read_masked_text(self, doc_id: str) -> str:
+        return text_cache.load(doc_id, lambda: self.masked_blob(doc_id))
+
+    def cleanup(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM documents WHERE created_at < ?", (time.time() - settings.DOC_TTL_SEC,)
+            )
+        return cur.rowcount
+
+    def next_expiry(self) -> float | None:
+        with self._lock:
+            (oldest,) = self._conn.execute("SELECT MIN(created_at) FROM documents").fetchone()
+        return oldest + settings.DOC_TTL_SEC if oldest is not None else None
+
+    def is_evicted(self, doc_id: str) -> bool:
+        return False
+
+    def claim_key_fingerprint(self, fingerprint: str) -> str:
+        """Record ``fingerprint`` if the store has none yet; return the one on record."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('fernet_key_fingerprint', ?)",
+                (fingerprint,),
+            )
+            (stored,) = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'fernet_key_fingerprint'"
+            ).fetchone()
+        return stored
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM documents")
+        text_cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, nbytes, raw_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(masked_text) + LENGTH(audit)"
+                " + COALESCE(LENGTH(envelope_encrypted), 0)), 0), COALESCE(SUM(raw_bytes), 0) FROM documents"
+            ).fetchone()
+        return {
+            "backend": "sqlite",
+            **_compression_stats(entries, nbytes, raw_bytes),
+            "max_bytes": 0,
+            "evictions": 0,
+            "text_cache": text_cache.stats(),
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+
+def _make_backend() -> MemoryBackend | SqliteBackend:
+    if settings.STORAGE_BACKEND == "memory":
+        return MemoryBackend(_store, settings.STORAGE_MAX_BYTES)
+    if settings.STORAGE_BACKEND == "sqlite":
+        return SqliteBackend(settings.STORAGE_SQLITE_PATH)
+    raise ValueError(f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r}; use 'memory' or 'sqlite'")
+
+
+backend = _make_backend()
+
+
+def store(masked_text: str, audit: Audit, envelope_encrypted: str | None = None) -> str:
+    return backend.store(masked_text, audit, envelope_encrypted)
+
+
+def get(doc_id: str) -> Mapping | None:
+    return backend.get(doc_id)
+
+
+def iter_masked_bytes(doc_id: str) -> Iterator[bytes]:
+    """Stream a stored document's masked text as UTF-8 chunks.
+
+    The compressed blob is fetched now, so the stream still completes if
+    the document expires or is evicted while it is being sent.
+    """
+    return _inflate_chunks(backend.masked_blob(doc_id))
 
 
 def cleanup() -> int:
-    now = time.time()
-    expired = [k for k, v in _store.items() if now - v["created_at"] > settings.DOC_TTL_SEC]
-    for k in expired:
-        del _store[k]
-    return len(expired)
+    return backend.cleanup()
+
+
+# The async variants are for the event loop: with the SQLite backend they run
+# on the backend's threads, with the memory backend inline.
+
+
+async def store_async(masked_text: str, audit: Audit, envelope_encrypted: str | None = None) -> str:
+    return await backend.run(store, masked_text, audit, envelope_encrypted)
+
+
+async def get_async(doc_id: str, *preload: str) -> Mapping | None:
+    """``get`` from the event loop; ``preload`` keys (e.g. "masked_text") are read in the same call."""
+
+    def load() -> Mapping | None:
+        entry = get(doc_id)
+        if entry is not None:
+            for key in preload:
+                entry[key]
+        return entry
+
+    return await backend.run(load)
+
+
+async def cleanup_async() -> int:
+    return await backend.run(cleanup)
+
+
+class SharedStateError(RuntimeError):
+    """Configuration under which workers would not see the same documents or keys."""
+
+
+def worker_count() -> int:
+    """Number of server worker processes this process belongs to.
+
+    ``--workers N`` (uvicorn, gunicorn) or ``-w N`` (gunicorn) on the
+    command line does not set WEB_CONCURRENCY, so it is read from argv:
+    uvicorn's spawned workers and gunicorn's forked ones both carry the
+    supervisor's arguments. WEB_CONCURRENCY, the default both servers fall
+    back to, covers everything else.
+    """
+    args = sys.argv[1:]
+    for i, arg in enumerate(args):
+        value = None
+        if arg in ("--workers", "-w") and i + 1 < len(args):
+            value = args[i + 1]
+        elif arg.startswith("--workers="):
+            value = arg.partition("=")[2]
+        if value is not None and value.isdigit():
+            return int(value)
+    return settings.WEB_CONCURRENCY
+
+
+def check_shared_state(key_fingerprint: str) -> None:
+    """Fail fast on a deployment where workers would diverge.
+
+    Called once per worker at startup. With the memory backend every
+    process has its own store, so more than one worker (see
+    ``worker_count``) is rejected. The SQLite store is shared by all
+    workers and outlives them, so it needs a configured FERNET_KEY, and
+    every worker must present the fingerprint of the key the store was
+    first opened with.
+    """
+    if settings.STORAGE_BACKEND == "memory":
+        workers = worker_count()
+        if workers > 1:
+            raise SharedStateError(
+                f"{workers} workers with STORAGE_BACKEND=memory: each worker would only see its own "
+                "documents. Use STORAGE_BACKEND=sqlite for multiple workers."
+            )
+        return
+    if not settings.FERNET_KEY:
+        raise SharedStateError(
+            f"STORAGE_BACKEND={settings.STORAGE_BACKEND} requires FERNET_KEY: a per-process random key "
+            "cannot decrypt envelopes stored by other workers or earlier runs."
+        )
+    stored = backend.claim_key_fingerprint(key_fingerprint)
+    if stored != key_fingerprint:
+        raise SharedStateError(
+            f"FERNET_KEY fingerprint {key_fingerprint} does not match {stored} recorded in "
+            f"{settings.STORAGE_SQLITE_PATH}; every worker must use the key the store was created with."
+        )
+
+
+def is_evicted(doc_id: str) -> bool:
+    """True if ``doc_id`` was dropped to stay within STORAGE_MAX_BYTES before its TTL ran out."""
+    return backend.is_evicted(doc_id)
+
+
+def stats() -> dict:
+    return backend.stats()
+
+
+def next_expiry() -> float | None:
+    """Wall-clock time at which the oldest stored document expires, if any."""
+    return backend.next_expiry()
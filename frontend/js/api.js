@@ -30,6 +30,57 @@ export async function redact(file, model = 'hybrid') {
   return res.json();
 }
 
+/**
+ * Redact a file through the streaming endpoint
+ * @param {File} file - uploaded file
+ * @param {string} model - backend detector (hybrid|regex|ner|gemini)
+ * @param {(event: object) => void} onEvent - called for every progress/text/result event
+ * @returns {Promise<{doc_id, masked_text, audit, envelope, cache_hit}>} the assembled result
+ */
+export async function redactStream(file, model = 'hybrid', onEvent = () => {}) {
+  const form = new FormData();
+  form.append('file', file);
+  const res = await fetch(
+    `${BASE}/redaction/stream/${model}?store_envelope=true&include_envelope=false`,
+    { method: 'POST', body: form }
+  );
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({ detail: res.statusText }));
+    throw new Error(err.detail || `Redaction failed (${res.status})`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  const pieces = [];
+  let buffer = '';
+  let result = null;
+
+  const handle = (line) => {
+    if (!line) return;
+    const event = JSON.parse(line);
+    if (event.event === 'error') {
+      throw new Error(event.error || `Redaction failed (${event.status})`);
+    }
+    if (event.event === 'text') pieces.push(event.text);
+    if (event.event === 'result') result = event;
+    onEvent(event);
+  };
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    lines.forEach(handle);
+  }
+  handle(buffer + decoder.decode());
+
+  if (!result) throw new Error('Redaction stream ended early');
+  const { doc_id, audit, envelope = null, cache_hit } = result;
+  return { doc_id, masked_text: pieces.join(''), audit, envelope, cache_hit };
+}
+
 /**
  * Download masked text or audit JSON
  * @param {string} docId
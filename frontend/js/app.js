@@ -4,7 +4,8 @@
 import { $ } from './utils.js';
 import { initSidebar, setCurrentConvId, getCurrentConvId, renderList } from './sidebar.js';
 import { initInput, setInputText } from './input.js';
-import { renderMessages, appendMessage, showTyping, removeTyping } from './chat.js';
+import { renderMessages, appendMessage, appendLiveMessage, showTyping, removeTyping } from './chat.js';
+import { buildStreamingBlock } from './redaction.js';
 import { getConversation, createConversation, addMessage, getChatHistory, getLastDocId, getConversations } from './storage.js';
 import * as api from './api.js';
 
@@ -67,22 +68,23 @@ async function handleRedaction(convId, file) {
   appendMessage({ role: 'user', content: userContent, meta: { fileName: file.name } });
   renderList();
 
-  // Show typing
-  showTyping();
+  // Render progress and masked text as they stream in
+  const live = buildStreamingBlock();
+  const liveMessage = appendLiveMessage(live.element);
 
   try {
-    const result = await api.redact(file, 'hybrid');
+    const result = await api.redactStream(file, 'hybrid', live.onEvent);
 
     // Store as assistant message with redaction metadata
     addMessage(convId, 'model', `Redaction complete (${result.audit.total_found} PII found)`, { redaction: result });
-    removeTyping();
+    liveMessage.remove();
     appendMessage({
       role: 'model',
       content: '',
       meta: { redaction: result },
     });
   } catch (err) {
-    removeTyping();
+    liveMessage.remove();
     const errorMsg = `Error: ${err.message}`;
     addMessage(convId, 'model', errorMsg);
     appendMessage({ role: 'model', content: errorMsg, meta: {} });
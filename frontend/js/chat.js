@@ -107,6 +107,27 @@ function appendMessageEl(msg, container) {
   container.appendChild(wrapper);
 }
 
+/**
+ * Append an assistant message whose content is a live DOM node.
+ * The caller removes it (e.g. once the final message is appended).
+ */
+export function appendLiveMessage(node) {
+  const welcome = $('.welcome');
+  const messagesContainer = getOrCreateMessages();
+
+  welcome.style.display = 'none';
+  messagesContainer.style.display = 'flex';
+
+  const wrapper = el('div', { class: 'message message--assistant' });
+  wrapper.appendChild(el('div', { class: 'message__avatar' }, 'AI'));
+  const contentDiv = el('div', { class: 'message__content' });
+  contentDiv.appendChild(node);
+  wrapper.appendChild(contentDiv);
+  messagesContainer.appendChild(wrapper);
+  scrollToBottom();
+  return wrapper;
+}
+
 /**
  * Show typing indicator
  */
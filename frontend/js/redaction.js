@@ -50,6 +50,45 @@ export function buildRedactionBlock(data) {
   return container;
 }
 
+const STAGE_LABELS = {
+  queued: 'Waiting',
+  extracting: 'Extracting text',
+  detecting: 'Detecting PII',
+  masking: 'Masking',
+};
+
+/**
+ * Build a placeholder block that fills in while the redaction streams.
+ * Returns the element and an onEvent handler for api.redactStream.
+ */
+export function buildStreamingBlock() {
+  const container = el('div', { class: 'redaction-result redaction-result--streaming' });
+
+  const status = el('div', { class: 'redaction-progress' }, STAGE_LABELS.queued);
+  container.appendChild(status);
+
+  const textBlock = el('div', { class: 'message__redacted-text' });
+  textBlock.style.whiteSpace = 'pre-wrap';
+  textBlock.style.lineHeight = '1.8';
+  container.appendChild(textBlock);
+
+  const onEvent = (event) => {
+    if (event.event === 'progress') {
+      const { stage, pages_total, pages_extracted, detectors_done } = event.progress;
+      const parts = [STAGE_LABELS[stage] || stage];
+      if (pages_total) parts.push(`${pages_extracted}/${pages_total} pages`);
+      if (detectors_done.length) parts.push(`done: ${detectors_done.join(', ')}`);
+      status.textContent = parts.join(' · ');
+    } else if (event.event === 'text') {
+      status.textContent = 'Rendering';
+      // Pieces never split a token, so each can be highlighted on its own
+      textBlock.insertAdjacentHTML('beforeend', highlightPiiTokens(event.text));
+    }
+  };
+
+  return { element: container, onEvent };
+}
+
 function buildAuditSummary(audit) {
   const panel = el('div', { class: 'audit-summary' });
 
@@ -0,0 +1,88 @@
+"""Throughput of the batch endpoint versus one request per file.
+
+Posts N small synthetic documents to the in-process app (starlette's
+TestClient, so no network cost is included) first one by one through
+``/redaction/{model}`` and then in a single ``/redaction/batch/{model}``
+request, both as separate multipart parts and as one zip archive.
+
+Usage:
+    python scripts/bench_batch.py [--files 500] [--model regex] [--concurrency 1 4 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import time
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from app.cache import result_cache  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def make_docs(n: int) -> list[tuple[str, bytes]]:
+    return [
+        (
+            f"doc{i}.txt",
+            (f"고객 {i}번 연락처 010-{1000 + i % 9000}-{i % 10000:04d}, 이메일 user{i}@example.com. " * 20).encode(),
+        )
+        for i in range(n)
+    ]
+
+
+def report(label: str, n: int, elapsed: float) -> None:
+    print(f"  {label:<28} {elapsed:>6.2f}s  {n / elapsed:>8.1f} files/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--model", default="regex")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+    docs = make_docs(args.files)
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name, data in docs:
+            zf.writestr(name, data)
+
+    with TestClient(app) as client:
+        print(f"{args.files} files, model={args.model}")
+        result_cache.clear()
+        started = time.perf_counter()
+        for name, data in docs:
+            client.post(f"/redaction/{args.model}", files={"file": (name, data, "text/plain")}).raise_for_status()
+        report("one request per file", args.files, time.perf_counter() - started)
+
+        for concurrency in args.concurrency:
+            with patch("app.routes.batch_redaction.settings.BATCH_CONCURRENCY", concurrency):
+                result_cache.clear()
+                started = time.perf_counter()
+                resp = client.post(
+                    f"/redaction/batch/{args.model}",
+                    files=[("files", (name, data, "text/plain")) for name, data in docs],
+                )
+                assert len(resp.text.splitlines()) == args.files
+                report(f"batch, concurrency {concurrency}", args.files, time.perf_counter() - started)
+
+                result_cache.clear()
+                started = time.perf_counter()
+                resp = client.post(
+                    f"/redaction/batch/{args.model}",
+                    files=[("files", ("docs.zip", archive.getvalue(), "application/zip"))],
+                )
+                assert len(resp.text.splitlines()) == args.files
+                report(f"batch zip, concurrency {concurrency}", args.files, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Throughput and memory benchmark for streaming CSV redaction.
+
+Writes a synthetic customer export with the requested number of rows to
+a temp file, then streams it through ``CsvRedactor`` with a typical rule
+set and reports rows/s and peak Python heap (tracemalloc), which should
+stay flat as the row count grows.
+
+Usage:
+    python scripts/bench_csv.py [--rows 10000 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.csv_redact import CsvRedactor, iter_lines, parse_rules  # noqa: E402
+from app.ingest import iter_decoded  # noqa: E402
+
+RULES = json.dumps({"id": "skip", "name": "mask", "email": ["EMAIL"], "phone": ["PHONE_KR"], "memo": "detect"})
+
+
+def write_export(fh, rows: int) -> None:
+    fh.write("id,name,email,phone,memo\n".encode())
+    for i in range(rows):
+        fh.write(
+            f'{i},홍길동{i % 97},user{i}@example.com,010-{i % 9000 + 1000}-{i % 10000:04d},'
+            f'"계좌 110-234-{i % 1000000:06d}, 차량 12가{i % 10000:04d}"\n'.encode()
+        )
+    fh.seek(0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    rules = parse_rules(RULES)
+
+    for rows in args.rows:
+        with tempfile.TemporaryFile() as fh:
+            write_export(fh, rows)
+            size = fh.seek(0, 2)
+            fh.seek(0)
+            tracemalloc.start()
+            started = time.perf_counter()
+            redactor = CsvRedactor(iter_lines(iter_decoded(fh)), rules)
+            out_bytes = sum(len(chunk) for chunk in redactor)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        print(
+            f"{rows:>9,} rows  {size / 1e6:>7.1f} MB in  {out_bytes / 1e6:>7.1f} MB out  "
+            f"{elapsed:>6.2f}s  {redactor.rows / elapsed:>9,.0f} rows/s  peak heap {peak / 1e6:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Hybrid detection latency: detectors one after another versus concurrently.
+
+The Gemini call is replaced by a fixed sleep (``--llm-ms``) so the run
+needs no API key; regex and NER run for real on a synthetic Korean
+document. The sequential baseline awaits the same detector coroutines
+one at a time, as the route did before detection was made concurrent.
+
+Usage:
+    python scripts/bench_detect.py [--llm-ms 300] [--repeat 5] [--size 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app import detection  # noqa: E402
+
+
+def make_text(n: int) -> str:
+    return " ".join(
+        f"고객 홍길동({i})의 연락처는 010-{1000 + i % 9000}-{i % 10000:04d}, 이메일 user{i}@example.com 입니다."
+        for i in range(n)
+    )
+
+
+async def sequential(text: str) -> None:
+    for source in detection.SOURCES["hybrid"]:
+        await detection._RUNNERS[source](text)
+
+
+async def measure(fn, text: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn(text)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def run(args: argparse.Namespace) -> None:
+    text = make_text(args.size)
+
+    async def fake_llm(text: str, pre_masked_spans=None) -> list:
+        await asyncio.sleep(args.llm_ms / 1000)
+        return []
+
+    with patch("app.detection.llm_guard.detect", side_effect=fake_llm):
+        await detection.detect("hybrid", text)  # load the NER model outside the timings
+        parts = {
+            source: await measure(detection._RUNNERS[source], text, args.repeat)
+            for source in detection.SOURCES["hybrid"]
+        }
+        seq = await measure(sequential, text, args.repeat)
+        conc = await measure(lambda t: detection.detect("hybrid", t), text, args.repeat)
+
+    print(f"{len(text):,} chars, simulated LLM {args.llm_ms} ms, median of {args.repeat}")
+    for source, elapsed in parts.items():
+        print(f"  {source:<12} {elapsed * 1000:>8.1f} ms")
+    print(f"  {'sequential':<12} {seq * 1000:>8.1f} ms  (sum {sum(parts.values()) * 1000:.1f})")
+    print(f"  {'concurrent':<12} {conc * 1000:>8.1f} ms  (max {max(parts.values()) * 1000:.1f})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-ms", type=float, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--size", type=int, default=200, help="sentences in the synthetic document")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
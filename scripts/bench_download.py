@@ -0,0 +1,71 @@
+"""Download bandwidth and latency on the sample contracts.
+
+Redacts each PDF in samples/ once (regex model), then fetches the masked
+text repeatedly through the in-process app (starlette's TestClient, so
+no network time is included) as:
+
+- identity: the plain stream
+- gzip: Accept-Encoding: gzip, bytes counted as sent on the wire
+- 304: a revalidation with the ETag from the first response
+- range: the last 4 KiB, as a resumed download would ask for
+
+Usage:
+    python scripts/bench_download.py [--repeat 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+def fetch(client: TestClient, url: str, headers: dict[str, str], repeat: int) -> tuple[int, float]:
+    """Return (wire bytes per response, median latency in ms)."""
+    samples = []
+    wire = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with client.stream("GET", url, headers=headers) as resp:
+            wire = sum(len(chunk) for chunk in resp.iter_raw())
+        samples.append(time.perf_counter() - started)
+    return wire, statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        for pdf in sorted((ROOT / "samples").glob("*.pdf")):
+            resp = client.post("/redaction/regex", files={"file": (pdf.name, pdf.read_bytes(), "application/pdf")})
+            resp.raise_for_status()
+            url = f"/download/{resp.json()['doc_id']}"
+            plain = client.get(url, headers={"Accept-Encoding": "identity"})
+            etag = client.get(url, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+            size = len(plain.content)
+
+            print(f"{pdf.name}: {size:,} bytes of masked text")
+            cases = {
+                "identity": {"Accept-Encoding": "identity"},
+                "gzip": {"Accept-Encoding": "gzip"},
+                "304": {"Accept-Encoding": "gzip", "If-None-Match": etag},
+                "range (4 KiB)": {"Accept-Encoding": "identity", "Range": "bytes=-4096"},
+            }
+            for label, headers in cases.items():
+                wire, ms = fetch(client, url, headers, args.repeat)
+                print(f"  {label:<14} {wire:>9,} B  {wire / size:>6.1%}  {ms:>7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
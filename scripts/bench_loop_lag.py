@@ -0,0 +1,96 @@
+"""Event-loop responsiveness under mixed load, per offload executor.
+
+Runs the app in-process on one event loop (httpx's ASGI transport, no
+network) and, for each executor, fires ``--docs`` large text redactions
+concurrently while a second task pings ``/health`` every 10 ms. Reports
+the redaction wall time, how many pings were answered meanwhile and the
+loop-lag monitor's view. With ``inline`` every CPU stage blocks the loop,
+so pings stall for whole stages; ``thread`` and ``process`` keep the loop
+answering.
+
+Usage:
+    python scripts/bench_loop_lag.py [--docs 4] [--size 1000] [--executors inline thread process]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+
+from app.cache import result_cache  # noqa: E402
+from app.looplag import LoopLagMonitor  # noqa: E402
+from app.main import app  # noqa: E402
+from app.offload import offloader  # noqa: E402
+
+
+def make_doc(i: int, n: int) -> bytes:
+    return " ".join(
+        f"고객 {i}-{j}번 연락처 010-{1000 + j % 9000}-{j % 10000:04d}, 이메일 user{j}@example.com 입니다."
+        for j in range(n)
+    ).encode()
+
+
+async def run(executor: str, docs: list[bytes]) -> None:
+    offloader.shutdown()
+    offloader.kind = executor
+    result_cache.clear()
+    monitor = LoopLagMonitor(0.01)
+    health: list[float] = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def ping() -> None:
+            while not done.is_set():
+                started = time.perf_counter()
+                (await client.get("/health")).raise_for_status()
+                health.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        async def redact(i: int, data: bytes) -> None:
+            resp = await client.post("/redaction/regex", files={"file": (f"doc{i}.txt", data, "text/plain")})
+            resp.raise_for_status()
+
+        monitor.start()
+        pinger = asyncio.create_task(ping())
+        started = time.perf_counter()
+        await asyncio.gather(*(redact(i, data) for i, data in enumerate(docs)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await pinger
+        await monitor.stop()
+
+    lag = monitor.stats()
+    print(
+        f"  {executor:<8} {elapsed:>6.2f}s  {len(health):>5} /health answered"
+        f" (p50 {statistics.median(health) * 1000:.1f} ms)"
+        f"  loop lag p99 {lag['p99_lag_ms']:>8.1f} ms  max {lag['max_lag_ms']:>8.1f} ms"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    docs = [make_doc(i, args.size) for i in range(args.docs)]
+    print(f"{args.docs} concurrent docs of {len(docs[0]) / 1e6:.1f} MB, workers={offloader.workers}")
+    for executor in args.executors:
+        await run(executor, docs)
+    offloader.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=4)
+    parser.add_argument("--size", type=int, default=1000, help="sentences per document")
+    parser.add_argument("--executors", nargs="+", default=["inline", "thread", "process"])
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Throughput benchmark for the offline NER tagger.
+
+Extracts the pages of every PDF in ``samples/`` and times
+``ner_detector.detect`` page by page on a single core, plus one
+``detect_batch`` call over all pages.
+
+Usage:
+    python scripts/bench_ner.py [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pypdf import PdfReader  # noqa: E402
+
+from app.detectors import ner_detector  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if ner_detector.get_tagger() is None:
+        sys.exit("No NER model found; run `make train-ner` first.")
+    print(f"model load: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    all_pages: list[str] = []
+    for pdf in sorted((ROOT / "samples").glob("*.pdf")):
+        pages = [p.extract_text() or "" for p in PdfReader(pdf).pages]
+        all_pages.extend(pages)
+        ner_detector.detect(pages[0])  # warm the feature cache
+
+        timings = []
+        for _ in range(args.repeat):
+            for page in pages:
+                t0 = time.perf_counter()
+                ner_detector.detect(page)
+                timings.append((time.perf_counter() - t0) * 1000)
+        chars = sum(map(len, pages)) / len(pages)
+        print(
+            f"{pdf.name:<18} {len(pages):>3} pages  ~{chars:.0f} chars/page  "
+            f"mean {statistics.mean(timings):.2f} ms/page  "
+            f"p95 {statistics.quantiles(timings, n=20)[-1]:.2f} ms/page"
+        )
+
+    sentences = sum(len(ner_detector.split_sentences(p)) for p in all_pages)
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        ner_detector.detect_batch(all_pages)
+    elapsed = (time.perf_counter() - t0) / args.repeat
+    print(
+        f"batch: {len(all_pages)} pages / {sentences} sentences in {elapsed * 1000:.1f} ms "
+        f"({sentences / elapsed:,.0f} sentences/s, {len(all_pages) / elapsed:,.0f} pages/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
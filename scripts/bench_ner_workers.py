@@ -0,0 +1,108 @@
+"""Per-worker memory and cold-start cost of the NER model.
+
+Starts N fresh Python processes (like ``uvicorn --workers N``), each of
+which imports the app's NER detector, loads the model and tags one page.
+Reports cold-start time (import + load + first page), model load time
+and per-process memory from /proc:
+RSS (counts shared pages in full) and PSS (shared pages split between
+the processes mapping them), with and without memory-mapped weights.
+
+Usage:
+    python scripts/bench_ner_workers.py [--workers 1 4 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+_PAGE = (
+    "성명: 박영희\n주소: 서울특별시 서초구 반포대로 58\n"
+    "Name: Robert Chen\nTitle: Chief Executive Officer\n"
+    "ФИО: Петрова Мария Сергеевна\n"
+) * 10
+
+
+def _memory_kib() -> dict[str, int]:
+    values: dict[str, int] = {}
+    with open("/proc/self/smaps_rollup") as fh:
+        for line in fh:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def _worker(use_mmap: bool, ready, go, results) -> None:
+    os.environ["NER_MODEL_MMAP"] = "true" if use_mmap else "false"
+    started = time.perf_counter()
+    from app.detectors import ner_detector
+
+    before = _memory_kib()
+    load_started = time.perf_counter()
+    ner_detector.get_tagger()
+    load_ms = (time.perf_counter() - load_started) * 1000
+    ner_detector.detect(_PAGE)
+    cold_ms = (time.perf_counter() - started) * 1000
+    # Wait until every worker holds the model, so PSS reflects sharing
+    ready.wait()
+    go.wait()
+    after = _memory_kib()
+    results.put({
+        "cold_ms": cold_ms,
+        "load_ms": load_ms,
+        "rss": after["rss"],
+        "pss": after["pss"],
+        "model_rss": after["rss"] - before["rss"],
+    })
+
+
+def run(workers: int, use_mmap: bool) -> dict[str, float]:
+    ctx = mp.get_context("spawn")
+    ready = ctx.Barrier(workers + 1)
+    go = ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(use_mmap, ready, go, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    ready.wait()
+    go.wait()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return {key: statistics.mean(r[key] for r in rows) for key in rows[0]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    from app.detectors import ner_detector
+
+    if ner_detector.get_tagger() is None:
+        sys.exit("No NER model found; run `make train-ner` first.")
+
+    print(
+        f"{'mode':<6} {'workers':>7} {'cold start':>11} {'model load':>11} "
+        f"{'RSS/worker':>11} {'PSS/worker':>11} {'model RSS':>10}"
+    )
+    for use_mmap in (False, True):
+        for n in args.workers:
+            r = run(n, use_mmap)
+            print(
+                f"{'mmap' if use_mmap else 'copy':<6} {n:>7} {r['cold_ms']:>9.1f}ms {r['load_ms']:>9.2f}ms "
+                f"{r['rss'] / 1024:>9.1f}MB {r['pss'] / 1024:>9.1f}MB {r['model_rss'] / 1024:>8.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Scaling benchmark for parallel PDF page extraction.
+
+Concatenates the sample contracts in ``samples/`` until the document has
+the requested number of pages, then times ``ingest.extract_document``
+sequentially and with process pools of increasing size.
+
+Usage:
+    python scripts/bench_pdf_extract.py [--pages 1000] [--workers 1 2 4 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fastapi import UploadFile  # noqa: E402
+from pypdf import PdfReader, PdfWriter  # noqa: E402
+
+from app import ingest  # noqa: E402
+
+
+def build_pdf(pages: int) -> bytes:
+    sources = [PdfReader(p) for p in sorted((ROOT / "samples").glob("*.pdf"))]
+    writer = PdfWriter()
+    while len(writer.pages) < pages:
+        for reader in sources:
+            for page in reader.pages:
+                if len(writer.pages) >= pages:
+                    break
+                writer.add_page(page)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+async def timed_extract(content: bytes, workers: int | None) -> tuple[float, int]:
+    overrides = {"PDF_PARALLEL_MIN_PAGES": 10**9} if workers is None else {
+        "PDF_PARALLEL_MIN_PAGES": 1,
+        "PDF_EXTRACT_WORKERS": workers,
+    }
+    with patch.multiple(ingest.settings, **overrides):
+        if workers is not None:
+            # Start the pool outside the timed region
+            await asyncio.get_running_loop().run_in_executor(ingest._get_pool(), int, 0)
+        started = time.perf_counter()
+        doc = await ingest.extract_document(UploadFile(file=io.BytesIO(content), filename="big.pdf"))
+        elapsed = time.perf_counter() - started
+        ingest.shutdown_pool()
+    return elapsed, len(doc.page_offsets)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    content = build_pdf(args.pages)
+    print(f"document: {args.pages} pages, {len(content) / 1e6:.1f} MB")
+
+    baseline, n = await timed_extract(content, None)
+    print(f"{'sequential':<12} {baseline:>7.2f}s  {n / baseline:>7.1f} pages/s")
+    for workers in args.workers:
+        elapsed, n = await timed_extract(content, workers)
+        print(
+            f"{workers:>2} workers   {elapsed:>7.2f}s  {n / elapsed:>7.1f} pages/s  "
+            f"speedup {baseline / elapsed:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""Cleanup cost versus store size.
+
+Fills a memory backend with N documents, a fixed number of which are past
+their TTL, and times one ``cleanup()`` pass against the full scan it
+replaced. The heap-based pass depends only on the expired count and should
+stay roughly flat as N grows; the scan grows linearly.
+
+Usage:
+    python scripts/bench_storage_cleanup.py [--sizes 10000 100000 500000] [--expired 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import gc
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app import storage  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.schemas import Audit  # noqa: E402
+
+AUDIT = Audit(spans=[], total_found=0, sources_used=["regex"])
+
+
+def fill(size: int, expired: int) -> tuple[storage.MemoryBackend, float]:
+    """Store ``size`` documents; return a clock time at which only the first ``expired`` are past TTL."""
+    backend = storage.MemoryBackend(storage.OrderedDict())
+    ids = [backend.store("masked", AUDIT) for _ in range(size)]
+    last_expired = backend._entries[ids[expired - 1]]["created_at"]
+    first_live = backend._entries[ids[expired]]["created_at"]
+    return backend, (last_expired + first_live) / 2 + settings.DOC_TTL_SEC
+
+
+def full_scan(entries: dict[str, dict], now: float) -> int:
+    expired = [k for k, v in entries.items() if now - v["created_at"] > settings.DOC_TTL_SEC]
+    for k in expired:
+        del entries[k]
+    return len(expired)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--expired", type=int, default=1000)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        expired = min(args.expired, size - 1)
+        # Keep collector pauses over the freshly filled store out of the timings
+        gc.disable()
+        backend, now = fill(size, expired)
+        with patch("app.storage.time.time", return_value=now):
+            started = time.perf_counter()
+            removed = backend.cleanup()
+            heap_ms = (time.perf_counter() - started) * 1000
+
+        backend, now = fill(size, expired)
+        started = time.perf_counter()
+        scanned = full_scan(backend._entries, now)
+        scan_ms = (time.perf_counter() - started) * 1000
+        del backend
+        gc.enable()
+        gc.collect()
+
+        assert removed == scanned == expired
+        print(
+            f"{size:>9,} docs  {expired:>6,} expired  heap {heap_ms:>8.2f} ms  "
+            f"full scan {scan_ms:>8.2f} ms  ({scan_ms / heap_ms:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
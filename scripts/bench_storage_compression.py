@@ -0,0 +1,105 @@
+"""Memory per document and decompression cost of compressed storage.
+
+Redacts the sample contracts in ``samples/`` with the regex detector,
+stores each one N times, and compares the Python heap held per document
+(tracemalloc) by the previous raw layout (``str`` + live ``Audit``)
+with the compressed memory backend at several zlib levels. It then times
+the read paths: full decompression (a text cache miss), a text cache hit,
+and streaming the text in chunks as /download does.
+
+Usage:
+    python scripts/bench_storage_compression.py [--copies 200] [--levels 1 6 9]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pypdf import PdfReader  # noqa: E402
+
+from app import storage  # noqa: E402
+from app.detectors import regex_detector  # noqa: E402
+from app.masker import mask_text  # noqa: E402
+from app.merger import merge_spans  # noqa: E402
+from app.schemas import Audit  # noqa: E402
+
+
+def load_samples() -> list[tuple[str, str, Audit]]:
+    docs = []
+    for path in sorted((ROOT / "samples").glob("*.pdf")):
+        text = "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+        spans = merge_spans(regex_detector.detect(text))
+        masked, _ = mask_text(text, spans)
+        docs.append((path.name, masked, Audit(spans=spans, total_found=len(spans), sources_used=["regex"])))
+    return docs
+
+
+def heap_per_doc(store, masked: str, audit: Audit, copies: int) -> float:
+    audit_json = audit.model_dump_json()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(copies):
+        # Fresh objects per copy, as a request would build them; whatever the
+        # store does not keep is freed again before the measurement
+        store(masked[:-1] + masked[-1], Audit.model_validate_json(audit_json))
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / copies
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=200)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    args = parser.parse_args()
+
+    for name, masked, audit in load_samples():
+        raw = len(masked.encode()) + len(audit.model_dump_json())
+        print(f"{name}: {len(masked):,} chars, {len(audit.spans)} spans, {raw / 1024:.1f} KiB serialized")
+
+        raw_entries: dict[int, dict] = {}
+        raw_kib = heap_per_doc(
+            lambda t, a: raw_entries.__setitem__(len(raw_entries), {"masked_text": t, "audit": a}),
+            masked, audit, args.copies,
+        ) / 1024
+        print(f"  raw str + Audit        {raw_kib:>8.1f} KiB/doc")
+
+        for level in args.levels:
+            with patch.object(storage.settings, "STORAGE_COMPRESS_LEVEL", level):
+                backend = storage.MemoryBackend(OrderedDict())
+                store_ms = timed(lambda: storage._pack(masked, audit), 20)
+                kib = heap_per_doc(backend.store, masked, audit, args.copies) / 1024
+            doc_id = next(iter(backend._entries))
+            blob = backend.masked_blob(doc_id)
+
+            cold = storage.TextCache(max_bytes=0)
+            inflate_ms = timed(lambda: cold.load(doc_id, lambda: blob), 50)
+            warm = storage.TextCache(max_bytes=64 * 1024 * 1024)
+            warm.load(doc_id, lambda: blob)
+            hit_ms = timed(lambda: warm.load(doc_id, lambda: blob), 50)
+            stream_ms = timed(lambda: sum(len(c) for c in storage._inflate_chunks(blob)), 50)
+            print(
+                f"  zlib level {level}           {kib:>8.1f} KiB/doc ({raw_kib / kib:.1f}x less)  "
+                f"compress {store_ms:.2f} ms  inflate {inflate_ms:.2f} ms  "
+                f"stream {stream_ms:.2f} ms  cache hit {hit_ms * 1000:.1f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
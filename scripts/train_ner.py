@@ -0,0 +1,374 @@
+"""Train the offline NER perceptron from the sample contract generator.
+
+The text of every contract produced by ``generate_sample_contracts.py`` is
+captured (no fonts or PDFs needed), the known parties, organisations and
+addresses are labelled, and each labelled line is re-emitted many times
+with random surrogate entities of the same type and language so the model
+learns the surrounding context rather than the specific names.
+
+Usage:
+    python scripts/train_ner.py [--out models/ner.bin] [--variants 40] [--epochs 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import generate_sample_contracts as contracts  # noqa: E402
+
+from app.detectors.perceptron import PerceptronTagger, spans_from_tags, tokenize  # noqa: E402
+
+# ── Capture contract text ──────────────────────────────────────────────────
+
+
+class _TextRecorder:
+    """Stand-in for FPDF that records the text instead of rendering it."""
+
+    def __init__(self) -> None:
+        self.blocks: list[str] = []
+
+    def cell(self, w=0, h=0, text="", **kwargs) -> None:
+        self.blocks.append(text)
+
+    def multi_cell(self, w=0, h=0, text="", **kwargs) -> None:
+        self.blocks.append(text)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def capture_contract_lines() -> dict[str, list[str]]:
+    """Return the non-empty lines of each generated contract, keyed by language."""
+    generators = {
+        "ko": contracts.generate_korean_contract,
+        "en": contracts.generate_english_contract,
+        "ru": contracts.generate_russian_contract,
+    }
+    original = contracts._make_pdf
+    lines: dict[str, list[str]] = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for lang, generate in generators.items():
+                recorder = _TextRecorder()
+                contracts._make_pdf = lambda: recorder
+                generate(Path(tmp))
+                lines[lang] = [
+                    line.strip()
+                    for block in recorder.blocks
+                    for line in block.split("\n")
+                    if line.strip()
+                ]
+    finally:
+        contracts._make_pdf = original
+    return lines
+
+
+# ── Entities appearing in the contracts ────────────────────────────────────
+
+SEEDS: dict[str, list[tuple[str, str]]] = {
+    "ko": [
+        ("박영희", "PER"), ("김철수", "PER"), ("이준혁", "PER"), ("최민지", "PER"),
+        ("정서연", "PER"), ("박준서", "PER"), ("한소라", "PER"),
+        ("주식회사 넥스트이노베이션", "ORG"), ("신한은행", "ORG"), ("국민은행", "ORG"),
+        ("서울중앙지방법원", "ORG"),
+        ("서울특별시 강남구 테헤란로 152, 강남파이낸스센터 22층", "LOC"),
+        ("서울특별시 서초구 반포대로 58, 래미안퍼스티지 301동 1204호", "LOC"),
+    ],
+    "en": [
+        ("Robert Chen", "PER"), ("John Smith", "PER"), ("Katherine Liu", "PER"),
+        ("James O'Brien", "PER"), ("Sarah Williams", "PER"), ("Lisa Park", "PER"),
+        ("Michael Torres", "PER"), ("David Park", "PER"),
+        ("Vertex Analytics, Inc.", "ORG"), ("Horizon Ventures Fund III, L.P.", "ORG"),
+        ("Horizon Ventures GP III, LLC", "ORG"), ("Eastbridge Capital Partners, LLC", "ORG"),
+        ("Eastbridge Capital Partners", "ORG"), ("Morrison & Blake LLP", "ORG"),
+        ("Fenwick & West LLP", "ORG"), ("Silicon Valley Bank", "ORG"),
+        ("First Citizens Bank", "ORG"), ("JPMorgan Chase", "ORG"),
+        ("1290 Avenue of the Americas, 35th Floor, New York, NY 10104", "LOC"),
+        ("350 Fifth Avenue, Suite 4800, New York, NY 10118", "LOC"),
+        ("88 Greenwich Street, Apt 3901, New York, NY 10006", "LOC"),
+        ("415 East 54th Street, Apt 12F, New York, NY 10022", "LOC"),
+        ("230 West 79th Street, Apt 8A, New York, NY 10024", "LOC"),
+        ("2000 Sand Hill Road, Suite 220, Menlo Park, CA 94025", "LOC"),
+        ("100 Federal Street, 29th Floor, Boston, MA 02110", "LOC"),
+        ("742 Evergreen Terrace, Apt 5C, San Francisco, CA 94102", "LOC"),
+        ("801 California Street, Mountain View, CA 94041", "LOC"),
+        ("2000 Sand Hill Road, Suite 220", "LOC"), ("100 Federal Street, 29th Floor", "LOC"),
+        ("Menlo Park, CA 94025", "LOC"), ("Boston, MA 02110", "LOC"),
+        ("New York, New York", "LOC"), ("Delaware", "LOC"),
+    ],
+    "ru": [
+        ("Петрова Мария Сергеевна", "PER"), ("Иванов Иван Иванович", "PER"),
+        ("Иванова Ивана Ивановича", "PER"), ("Сидоров Алексей Петрович", "PER"),
+        ("Козлов Дмитрий Андреевич", "PER"), ("Волкова Елена Николаевна", "PER"),
+        ("Новикова Татьяна Владимировна", "PER"), ("Петров Сергей Анатольевич", "PER"),
+        ("Петрова М.С.", "PER"),
+        ("ООО «Цифровые Горизонты»", "ORG"), ("«Цифровые Горизонты»", "ORG"),
+        ("ПАО «Сбербанк»", "ORG"), ("АО «Тинькофф Банк»", "ORG"),
+        ("125009, г. Москва, ул. Тверская, д. 15, стр. 2", "LOC"),
+        ("119435, г. Москва, Ленинский проспект, д. 28, кв. 105", "LOC"),
+        ("г. Москва", "LOC"),
+    ],
+}
+
+# ── Surrogate pools ────────────────────────────────────────────────────────
+
+_KO_SURNAMES = list("김이박최정강조윤장임한오서신권황안송류홍전고문양손배백허유남심노하곽성차주우구민진지엄채원천방공현함변염여추도소석선설마길연위표명기반왕금옥육인맹제모") + [
+    "남궁", "황보", "제갈", "선우", "독고",
+]
+_KO_GIVEN = (
+    "민준 서연 지호 서윤 도윤 하은 예준 지우 시우 수아 주원 지민 하준 지유 준서 채원 건우 서현 "
+    "현우 민서 우진 하윤 선우 윤서 연우 지아 유준 다은 정우 은서 승현 예은 준혁 수빈 영희 철수 "
+    "영수 미경 정숙 상철 성민 혜진 동현 은지 재원 수진 진호 경민 소라 서준 태윤 민지 가은 나연 "
+    "보람 슬기 한결 재석 승우 혁 준 민 훈 진"
+).split()
+_KO_ORG_STEMS = (
+    "한빛소프트 대성테크 미래로지스 그린에너지 블루오션랩스 스마트팩토리 하이브리드솔루션 "
+    "코리아데이터 누리시스템 다온바이오 새봄건설 한결물산 에이플러스 온누리통신 제이앤씨파트너스"
+).split()
+_KO_BANKS = "신한은행 국민은행 우리은행 하나은행 농협은행 기업은행 카카오뱅크 부산은행".split()
+_KO_COURTS = "서울중앙지방법원 수원지방법원 부산지방법원 대전지방법원 서울남부지방법원".split()
+_KO_CITIES = [
+    ("서울특별시", "강남구 서초구 종로구 마포구 송파구 영등포구".split()),
+    ("부산광역시", "해운대구 수영구 동래구".split()),
+    ("경기도 성남시", "분당구 수정구".split()),
+    ("인천광역시", "연수구 남동구".split()),
+]
+_KO_ROADS = "테헤란로 반포대로 세종대로 올림픽로 판교역로 해운대로 도산대로 강남대로".split()
+_KO_BUILDINGS = "파이낸스센터 타워 빌딩 오피스텔 아파트".split()
+
+_EN_FIRST = (
+    "Robert John Katherine James Sarah Lisa Michael David Emily Jennifer William Olivia "
+    "Daniel Sophia Thomas Emma Christopher Grace Andrew Hannah Brian Rachel Kevin Laura"
+).split()
+_EN_LAST = (
+    "Chen Smith Liu O'Brien Williams Park Torres Johnson Brown Garcia Miller Davis Wilson "
+    "Anderson Taylor Moore Martin Lee Nguyen Kim Patel Rodriguez Clark Lewis Walker Young"
+).split()
+_EN_ORG_WORDS = (
+    "Vertex Horizon Eastbridge Summit Pinnacle Northwind Bluestone Redwood Silverline "
+    "Granite Cobalt Meridian Apex Harbor Keystone Evergreen"
+).split()
+_EN_ORG_KINDS = "Analytics Ventures Capital Partners Holdings Labs Systems Technologies Group".split()
+_EN_ORG_SUFFIX = ["Inc.", "LLC", "L.P.", "LLP", "Corp."]
+_EN_STREETS = "Fifth Avenue,Greenwich Street,Federal Street,Sand Hill Road,Market Street,Main Street,Park Avenue,California Street".split(",")
+_EN_CITIES = [
+    ("New York", "NY"), ("Boston", "MA"), ("San Francisco", "CA"), ("Menlo Park", "CA"),
+    ("Seattle", "WA"), ("Austin", "TX"), ("Chicago", "IL"), ("Mountain View", "CA"),
+]
+
+_RU_MALE = [
+    ("Иванов", "Иван", "Иванович"), ("Сидоров", "Алексей", "Петрович"),
+    ("Козлов", "Дмитрий", "Андреевич"), ("Петров", "Сергей", "Анатольевич"),
+    ("Смирнов", "Николай", "Викторович"), ("Кузнецов", "Михаил", "Олегович"),
+    ("Попов", "Андрей", "Юрьевич"), ("Соколов", "Павел", "Игоревич"),
+    ("Лебедев", "Артём", "Сергеевич"), ("Морозов", "Егор", "Дмитриевич"),
+]
+_RU_FEMALE = [
+    ("Петрова", "Мария", "Сергеевна"), ("Волкова", "Елена", "Николаевна"),
+    ("Новикова", "Татьяна", "Владимировна"), ("Смирнова", "Ольга", "Петровна"),
+    ("Кузнецова", "Анна", "Игоревна"), ("Попова", "Наталья", "Андреевна"),
+    ("Соколова", "Ирина", "Викторовна"), ("Федорова", "Светлана", "Юрьевна"),
+]
+_RU_ORG_NAMES = "Цифровые Горизонты,Северный Ветер,Альфа Проект,Технопарк,Вектор Плюс,Гранит,Новые Решения".split(",")
+_RU_ORG_FORMS = ["ООО", "АО", "ПАО", "ЗАО"]
+_RU_BANKS = ["«Сбербанк»", "«Тинькофф Банк»", "«Альфа-Банк»", "«ВТБ»", "«Райффайзенбанк»"]
+_RU_CITIES = ["Москва", "Санкт-Петербург", "Казань", "Новосибирск", "Екатеринбург"]
+_RU_STREETS = ["ул. Тверская", "Ленинский проспект", "ул. Арбат", "Невский проспект", "ул. Ленина", "ул. Садовая"]
+
+
+def _ko_person(rng: random.Random) -> str:
+    return rng.choice(_KO_SURNAMES) + rng.choice(_KO_GIVEN)
+
+
+def _ko_org(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.4:
+        return "주식회사 " + rng.choice(_KO_ORG_STEMS)
+    if roll < 0.55:
+        return "(주)" + rng.choice(_KO_ORG_STEMS)
+    if roll < 0.85:
+        return rng.choice(_KO_BANKS)
+    return rng.choice(_KO_COURTS)
+
+
+def _ko_location(rng: random.Random) -> str:
+    city, districts = rng.choice(_KO_CITIES)
+    addr = f"{city} {rng.choice(districts)} {rng.choice(_KO_ROADS)} {rng.randint(1, 400)}"
+    if rng.random() < 0.7:
+        addr += f", {rng.choice(_KO_ORG_STEMS)[:3]}{rng.choice(_KO_BUILDINGS)} {rng.randint(2, 30)}층"
+    return addr
+
+
+def _en_person(rng: random.Random) -> str:
+    return f"{rng.choice(_EN_FIRST)} {rng.choice(_EN_LAST)}"
+
+
+def _en_org(rng: random.Random) -> str:
+    name = f"{rng.choice(_EN_ORG_WORDS)} {rng.choice(_EN_ORG_KINDS)}"
+    if rng.random() < 0.3:
+        return f"{rng.choice(_EN_LAST)} & {rng.choice(_EN_LAST)} LLP"
+    if rng.random() < 0.2:
+        return f"{rng.choice(_EN_ORG_WORDS)} Bank"
+    return f"{name}, {rng.choice(_EN_ORG_SUFFIX)}" if rng.random() < 0.8 else name
+
+
+def _en_location(rng: random.Random) -> str:
+    city, state = rng.choice(_EN_CITIES)
+    roll = rng.random()
+    if roll < 0.2:
+        return city
+    if roll < 0.35:
+        return f"{city}, {state} {rng.randint(10000, 99999)}"
+    unit = rng.choice([f"Suite {rng.randint(100, 4999)}", f"Apt {rng.randint(1, 40)}{rng.choice('ABCDF')}", f"{rng.randint(2, 60)}th Floor"])
+    return f"{rng.randint(1, 2999)} {rng.choice(_EN_STREETS)}, {unit}, {city}, {state} {rng.randint(10000, 99999)}"
+
+
+def _ru_genitive(name: str) -> str:
+    return name[:-1] + "я" if name.endswith("й") else name + "а"
+
+
+def _ru_person(rng: random.Random, original: str) -> str:
+    if original.endswith("ича"):  # genitive, as in "в лице ... Иванова Ивана Ивановича"
+        surname, name, patronymic = rng.choice(_RU_MALE)
+        return f"{surname}а {_ru_genitive(name)} {patronymic}а"
+    female = original.split()[0].endswith("а")
+    surname, name, patronymic = rng.choice(_RU_FEMALE if female else _RU_MALE)
+    if "." in original:
+        return f"{surname} {name[0]}.{patronymic[0]}."
+    return f"{surname} {name} {patronymic}"
+
+
+def _ru_org(rng: random.Random, original: str) -> str:
+    if rng.random() < 0.3:
+        return f"ПАО {rng.choice(_RU_BANKS)}"
+    name = f"«{rng.choice(_RU_ORG_NAMES)}»"
+    return name if original.startswith("«") else f"{rng.choice(_RU_ORG_FORMS)} {name}"
+
+
+def _ru_location(rng: random.Random, original: str) -> str:
+    city = rng.choice(_RU_CITIES)
+    if not original[0].isdigit():
+        return f"г. {city}"
+    return f"{rng.randint(100000, 199999)}, г. {city}, {rng.choice(_RU_STREETS)}, д. {rng.randint(1, 99)}, кв. {rng.randint(1, 300)}"
+
+
+def surrogate(lang: str, label: str, original: str, rng: random.Random) -> str:
+    if lang == "ko":
+        return {"PER": _ko_person, "ORG": _ko_org, "LOC": _ko_location}[label](rng)
+    if lang == "en":
+        return {"PER": _en_person, "ORG": _en_org, "LOC": _en_location}[label](rng)
+    return {"PER": _ru_person, "ORG": _ru_org, "LOC": _ru_location}[label](rng, original)
+
+
+# ── Labelling ──────────────────────────────────────────────────────────────
+
+
+def find_entities(line: str, seeds: list[tuple[str, str]]) -> list[tuple[int, int, str]]:
+    """Longest-first, non-overlapping seed matches in a line."""
+    found: list[tuple[int, int, str]] = []
+    for text, label in sorted(seeds, key=lambda s: -len(s[0])):
+        start = line.find(text)
+        while start >= 0:
+            end = start + len(text)
+            if all(end <= s or start >= e for s, e, _ in found):
+                found.append((start, end, label))
+            start = line.find(text, end)
+    return sorted(found)
+
+
+def to_example(line: str, entities: list[tuple[int, int, str]]) -> tuple[list[str], list[str]]:
+    tokens = tokenize(line)
+    tags = []
+    for _, start, end in tokens:
+        tag = "O"
+        for s, e, label in entities:
+            if start >= s and end <= e:
+                tag = ("B-" if start == s or not tags or tags[-1] == "O" else "I-") + label
+                break
+        tags.append(tag)
+    return [w for w, _, _ in tokens], tags
+
+
+def substitute(line: str, entities: list[tuple[int, int, str]], lang: str, rng: random.Random):
+    """Replace every entity with a surrogate, returning the new line and spans."""
+    out: list[str] = []
+    spans: list[tuple[int, int, str]] = []
+    pos = 0
+    length = 0
+    for s, e, label in entities:
+        out.append(line[pos:s])
+        length += s - pos
+        replacement = surrogate(lang, label, line[s:e], rng)
+        spans.append((length, length + len(replacement), label))
+        out.append(replacement)
+        length += len(replacement)
+        pos = e
+    out.append(line[pos:])
+    return "".join(out), spans
+
+
+def build_dataset(variants: int, seed: int = 0):
+    rng = random.Random(seed)
+    train: list[tuple[list[str], list[str]]] = []
+    held_out: list[tuple[list[str], list[str]]] = []
+    for lang, lines in capture_contract_lines().items():
+        for line in lines:
+            entities = find_entities(line, SEEDS[lang])
+            if not entities:
+                train.append(to_example(line, []))
+                continue
+            train.append(to_example(line, entities))
+            for i in range(variants):
+                new_line, spans = substitute(line, entities, lang, rng)
+                (held_out if i % 10 == 0 else train).append(to_example(new_line, spans))
+    return train, held_out
+
+
+def evaluate(tagger: PerceptronTagger, examples) -> tuple[float, float, float]:
+    tp = fp = fn = 0
+    for words, gold in examples:
+        tokens = [(w, i, i + 1) for i, w in enumerate(words)]
+        predicted = set(spans_from_tags(tokens, tagger.tag(words)))
+        expected = set(spans_from_tags(tokens, gold))
+        tp += len(predicted & expected)
+        fp += len(predicted - expected)
+        fn += len(expected - predicted)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=ROOT / "models" / "ner.bin")
+    parser.add_argument("--variants", type=int, default=40)
+    parser.add_argument("--epochs", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    train, held_out = build_dataset(args.variants, args.seed)
+    print(f"Training on {len(train)} sentences ({len(held_out)} held out)...")
+    started = time.perf_counter()
+    tagger = PerceptronTagger.train(train, epochs=args.epochs, seed=args.seed)
+    print(f"  trained in {time.perf_counter() - started:.1f}s")
+
+    precision, recall, f1 = evaluate(tagger, held_out)
+    print(f"  held-out entity P={precision:.3f} R={recall:.3f} F1={f1:.3f}")
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    tagger.save(args.out)
+    print(f"  saved {args.out} ({args.out.stat().st_size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
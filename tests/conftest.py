@@ -22,9 +22,29 @@ def clear_storage():
     """Clear the in-memory store before every test."""
     import app.storage as _st
 
-    _st._store.clear()
+    _st.backend.clear()
     yield
-    _st._store.clear()
+    _st.backend.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    """Start every test with an empty redaction result cache."""
+    from app.cache import result_cache
+
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_jobs():
+    """Forget jobs left over from earlier tests."""
+    from app.jobs import queue
+
+    queue.clear()
+    yield
+    queue.clear()
 
 
 @pytest.fixture()
@@ -0,0 +1,82 @@
+"""Tests for app.batching."""
+
+import asyncio
+
+import pytest
+
+from app.batching import MicroBatcher
+
+
+@pytest.mark.asyncio
+class TestMicroBatcher:
+    async def test_results_scattered_in_order(self):
+        batcher = MicroBatcher(lambda items: [x * 2 for x in items], max_batch_size=8, max_wait_ms=5)
+        assert await batcher.submit_many([1, 2, 3]) == [2, 4, 6]
+        await batcher.stop()
+
+    async def test_concurrent_callers_share_a_batch(self):
+        calls = []
+
+        def fn(items):
+            calls.append(list(items))
+            return items
+
+        batcher = MicroBatcher(fn, max_batch_size=16, max_wait_ms=20)
+        results = await asyncio.gather(
+            batcher.submit_many(["a", "b"]),
+            batcher.submit("c"),
+            batcher.submit_many(["d"]),
+        )
+        assert results == [["a", "b"], "c", ["d"]]
+        assert len(calls) == 1
+        assert sorted(calls[0]) == ["a", "b", "c", "d"]
+        await batcher.stop()
+
+    async def test_max_batch_size_splits(self):
+        sizes = []
+
+        def fn(items):
+            sizes.append(len(items))
+            return items
+
+        batcher = MicroBatcher(fn, max_batch_size=3, max_wait_ms=50)
+        assert await batcher.submit_many(list(range(7))) == list(range(7))
+        assert sizes == [3, 3, 1]
+        await batcher.stop()
+
+    async def test_exception_propagates(self):
+        def fn(items):
+            raise ValueError("bad batch")
+
+        batcher = MicroBatcher(fn, max_batch_size=4, max_wait_ms=1)
+        with pytest.raises(ValueError):
+            await batcher.submit(1)
+        # The worker survives a failing batch
+        batcher.fn = lambda items: items
+        assert await batcher.submit(2) == 2
+        await batcher.stop()
+
+    async def test_arrivals_at_the_deadline_never_lost(self):
+        batcher = MicroBatcher(lambda items: items, max_batch_size=64, max_wait_ms=1)
+
+        async def caller(i):
+            await asyncio.sleep((i % 7) / 5000)
+            return await batcher.submit(i)
+
+        results = await asyncio.wait_for(asyncio.gather(*(caller(i) for i in range(500))), 5)
+        assert results == list(range(500))
+        await batcher.stop()
+
+    async def test_empty_submit(self):
+        batcher = MicroBatcher(lambda items: items)
+        assert await batcher.submit_many([]) == []
+
+    async def test_stats(self):
+        batcher = MicroBatcher(lambda items: items, max_batch_size=4, max_wait_ms=1)
+        await batcher.submit_many([1, 2])
+        stats = batcher.stats()
+        assert stats["batches"] == 1
+        assert stats["items"] == 2
+        assert stats["mean_fill_ratio"] == 0.5
+        assert stats["mean_queue_delay_ms"] >= 0
+        await batcher.stop()
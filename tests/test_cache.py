@@ -0,0 +1,87 @@
+"""Tests for app.cache."""
+
+from unittest.mock import patch
+
+from app.cache import CachedResult, ResultCache
+from app.schemas import Span
+
+
+def _result(text: str, n_spans: int = 1) -> CachedResult:
+    spans = tuple(
+        Span(start=0, end=1, type="EMAIL", text=text[:1], source="regex") for _ in range(n_spans)
+    )
+    return CachedResult(text=text, spans=spans, sources_used=("regex",))
+
+
+class TestResultCache:
+    def test_miss_then_hit(self):
+        cache = ResultCache(ttl_sec=3600, max_bytes=1 << 20)
+        assert cache.get("k") is None
+        cache.put("k", _result("hello"))
+        assert cache.get("k").text == "hello"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_key_includes_model_and_version(self):
+        assert ResultCache.make_key("abc", "regex", "txt") != ResultCache.make_key("abc", "ner", "txt")
+        assert ResultCache.make_key("abc", "regex", "txt").startswith("1:")
+
+    def test_key_includes_document_kind(self):
+        assert ResultCache.make_key("abc", "regex", "txt") != ResultCache.make_key("abc", "regex", "pdf")
+
+    def test_evicts_least_recently_used_over_budget(self):
+        size = _result("a" * 1000).nbytes()
+        cache = ResultCache(ttl_sec=3600, max_bytes=2 * size)
+        cache.put("a", _result("a" * 1000))
+        cache.put("b", _result("b" * 1000))
+        cache.get("a")  # "b" becomes least recently used
+        cache.put("c", _result("c" * 1000))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= 2 * size
+
+    def test_oversized_entry_not_stored(self):
+        cache = ResultCache(ttl_sec=3600, max_bytes=100)
+        cache.put("k", _result("x" * 10_000))
+        assert cache.get("k") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_replacing_key_keeps_byte_count(self):
+        cache = ResultCache(ttl_sec=3600, max_bytes=1 << 20)
+        cache.put("k", _result("x" * 100))
+        cache.put("k", _result("x" * 100))
+        assert cache.stats()["entries"] == 1
+        assert cache.stats()["bytes"] == _result("x" * 100).nbytes()
+
+    def test_zero_budget_disables(self):
+        cache = ResultCache(ttl_sec=3600, max_bytes=0)
+        cache.put("k", _result("x"))
+        assert cache.get("k") is None
+
+
+class TestExpiry:
+    def test_expired_entry_is_a_miss(self):
+        cache = ResultCache(max_bytes=1 << 20, ttl_sec=60)
+        with patch("app.cache.time.monotonic", return_value=1000.0):
+            cache.put("k", _result("hello"))
+        with patch("app.cache.time.monotonic", return_value=1059.0):
+            assert cache.get("k") is not None
+        with patch("app.cache.time.monotonic", return_value=1061.0):
+            assert cache.get("k") is None
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["bytes"] == 0
+
+    def test_purge_expired(self):
+        cache = ResultCache(max_bytes=1 << 20, ttl_sec=60)
+        with patch("app.cache.time.monotonic", return_value=1000.0):
+            cache.put("old", _result("old"))
+        with patch("app.cache.time.monotonic", return_value=1050.0):
+            cache.put("new", _result("new"))
+        with patch("app.cache.time.monotonic", return_value=1070.0):
+            assert cache.purge_expired() == 1
+            assert cache.get("new") is not None
+        assert cache.stats()["entries"] == 1
@@ -0,0 +1,90 @@
+"""Tests for app.csv_redact."""
+
+import csv
+import io
+import re
+
+import pytest
+
+from app.csv_redact import ColumnRule, CsvRedactor, iter_lines, parse_rules, redact_cell
+
+_TOKEN = re.compile(r"\[\[PII:[A-Z_]+:[0-9a-f]{8}\]\]")
+
+
+def _run(text: str, rules: dict | None = None, has_header: bool = True) -> list[list[str]]:
+    redactor = CsvRedactor(iter_lines([text]), rules or {}, has_header=has_header)
+    out = b"".join(redactor).decode("utf-8")
+    return list(csv.reader(io.StringIO(out)))
+
+
+class TestParseRules:
+    def test_actions_and_subsets(self):
+        rules = parse_rules('{"name": "mask", "id": "skip", "memo": ["EMAIL"], "*": "detect"}')
+        assert rules["name"] == ColumnRule("mask")
+        assert rules["id"] == ColumnRule("skip")
+        assert rules["memo"] == ColumnRule("detect", frozenset({"EMAIL"}))
+        assert rules["*"] == ColumnRule("detect")
+
+    def test_empty(self):
+        assert parse_rules(None) == {}
+
+    @pytest.mark.parametrize("raw", ["not json", "[1, 2]", '{"a": "hide"}', '{"a": ["NOPE"]}'])
+    def test_invalid(self, raw):
+        with pytest.raises(ValueError):
+            parse_rules(raw)
+
+
+class TestIterLines:
+    def test_rejoins_lines_split_across_pieces(self):
+        assert list(iter_lines(["a,b\nc", ",d\r\n", "e,f"])) == ["a,b\n", "c,d\r\n", "e,f"]
+
+
+class TestRedactCell:
+    def test_subset_only_masks_listed_types(self):
+        cell = "a@b.com 010-1234-5678"
+        masked = redact_cell(cell, ColumnRule("detect", frozenset({"EMAIL"})))
+        assert "a@b.com" not in masked
+        assert "010-1234-5678" in masked
+
+    def test_empty_cell_not_tokenized(self):
+        assert redact_cell("", ColumnRule("mask")) == ""
+
+
+class TestCsvRedactor:
+    CSV = (
+        "id,name,email,memo\n"
+        "1,홍길동,hong@example.com,call 010-1234-5678\n"
+        '2,김철수,kim@example.com,"multi\nline user@test.com"\n'
+    )
+
+    def test_column_rules_applied(self):
+        rows = _run(self.CSV, {"id": ColumnRule("skip"), "name": ColumnRule("mask"),
+                               "memo": ColumnRule("detect", frozenset({"PHONE_KR"}))})
+        assert rows[0] == ["id", "name", "email", "memo"]
+        assert rows[1][0] == "1"
+        assert _TOKEN.fullmatch(rows[1][1])
+        assert "hong@example.com" not in rows[1][2]
+        assert rows[1][3].startswith("call [[PII:PHONE_KR:")
+        # Only PHONE_KR is scanned in memo, so the email survives (with its embedded newline)
+        assert rows[2][3] == "multi\nline user@test.com"
+
+    def test_default_rule_and_index_keys(self):
+        rows = _run("a@b.com,c@d.com\n", {"0": ColumnRule("skip"), "*": ColumnRule("skip")}, has_header=False)
+        assert rows == [["a@b.com", "c@d.com"]]
+
+    def test_unknown_column_rejected(self):
+        with pytest.raises(ValueError):
+            CsvRedactor(iter_lines([self.CSV]), {"phone": ColumnRule("mask")})
+
+    def test_rows_counted(self):
+        redactor = CsvRedactor(iter_lines([self.CSV]), {})
+        b"".join(redactor)
+        assert redactor.rows == 2
+
+    def test_output_flushed_incrementally(self):
+        body = "email\n" + "user@example.com\n" * 20_000
+        chunks = list(CsvRedactor(iter_lines([body]), {}))
+        assert len(chunks) > 1
+
+    def test_empty_input(self):
+        assert list(CsvRedactor(iter_lines([]), {})) == []
@@ -0,0 +1,143 @@
+"""Tests for concurrent detector orchestration."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app import detection
+from app.schemas import JobProgress, Span
+
+
+def _span(start: int, end: int, source: str) -> Span:
+    return Span(start=start, end=end, type="PERSON", text="x" * (end - start), source=source, confidence=1.0)
+
+
+class TestDetect:
+    @pytest.mark.asyncio
+    async def test_regex_model(self):
+        spans, sources = await detection.detect("regex", "email user@test.com")
+        assert sources == ["regex"]
+        assert [s.text for s in spans] == ["user@test.com"]
+
+    @pytest.mark.asyncio
+    async def test_hybrid_sources_in_fixed_order(self):
+        async def llm(text, pre_masked_spans=None):
+            return [_span(0, 2, "llm")]
+
+        with patch("app.detection.llm_guard.detect", side_effect=llm):
+            spans, sources = await detection.detect("hybrid", "ab user@test.com")
+        assert sources == ["regex", "ner", "llm"]
+        assert {s.source for s in spans} >= {"regex", "llm"}
+
+    @pytest.mark.asyncio
+    async def test_llm_skipped(self):
+        async def skipped(text, pre_masked_spans=None):
+            return None
+
+        with patch("app.detection.llm_guard.detect", side_effect=skipped):
+            _, sources = await detection.detect("gemini", "text")
+        assert sources == ["llm_skipped"]
+
+    @pytest.mark.asyncio
+    async def test_llm_partial(self):
+        async def partial(text, pre_masked_spans=None):
+            return detection.llm_guard.PartialSpans([_span(0, 2, "llm")])
+
+        progress = JobProgress()
+        with patch("app.detection.llm_guard.detect", side_effect=partial):
+            spans, sources = await detection.detect("gemini", "ab text", progress)
+        assert sources == ["llm_partial"]
+        assert progress.detectors_done == ["llm_partial"]
+        assert len(spans) == 1
+
+    @pytest.mark.asyncio
+    async def test_detectors_run_concurrently(self):
+        async def slow_llm(text, pre_masked_spans=None):
+            await asyncio.sleep(0.2)
+            return []
+
+        async def slow_ner(text):
+            await asyncio.sleep(0.2)
+            return []
+
+        with (
+            patch("app.detection.llm_guard.detect", side_effect=slow_llm),
+            patch("app.detection.ner_detector.detect_async", side_effect=slow_ner),
+        ):
+            started = time.perf_counter()
+            await detection.detect("hybrid", "text")
+            elapsed = time.perf_counter() - started
+        assert elapsed < 0.35
+
+    @pytest.mark.asyncio
+    async def test_detector_error_propagates(self):
+        with patch("app.detection.regex_detector.detect", side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                await detection.detect("regex", "text")
+
+    @pytest.mark.asyncio
+    async def test_progress_records_detectors(self):
+        progress = JobProgress()
+        await detection.detect("ner", "홍길동 씨", progress)
+        assert progress.detectors_done == ["ner"]
+
+    @pytest.mark.asyncio
+    async def test_progress_reports_open_breaker_as_skipped(self):
+        progress = JobProgress()
+        with patch.object(detection.llm_guard.breaker, "allow", return_value=False):
+            _, sources = await detection.detect("hybrid", "text", progress)
+        assert sources == ["regex", "ner", "llm_skipped"]
+        assert sorted(progress.detectors_done) == ["llm_skipped", "ner", "regex"]
+
+    @pytest.mark.asyncio
+    async def test_failed_detector_not_in_progress(self):
+        progress = JobProgress()
+        with patch("app.detection.llm_guard.detect", side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                await detection.detect("gemini", "text", progress)
+        assert progress.detectors_done == []
+
+
+class TestDeadline:
+    @pytest.mark.asyncio
+    async def test_late_llm_skipped(self):
+        async def hang(text, pre_masked_spans=None):
+            await asyncio.Event().wait()
+
+        with (
+            patch("app.detection.llm_guard.detect", side_effect=hang),
+            patch("app.detection.settings.DETECT_DEADLINE_SEC", 0.05),
+        ):
+            spans, sources = await detection.detect("hybrid", "email user@test.com")
+        assert sources == ["regex", "ner", "llm_skipped"]
+        assert [s.text for s in spans] == ["user@test.com"]
+
+    @pytest.mark.asyncio
+    async def test_regex_never_cut_off(self):
+        def slow_regex(text):
+            time.sleep(0.1)
+            return [_span(0, 1, "regex")]
+
+        with (
+            patch("app.detection.regex_detector.detect", side_effect=slow_regex),
+            patch("app.detection.settings.DETECT_DEADLINE_SEC", 0.01),
+        ):
+            spans, sources = await detection.detect("regex", "text")
+        assert sources == ["regex"]
+        assert len(spans) == 1
+
+    @pytest.mark.asyncio
+    async def test_skipped_detector_not_in_progress(self):
+        async def hang(text):
+            await asyncio.Event().wait()
+
+        progress = JobProgress()
+        with (
+            patch("app.detection.ner_detector.detect_async", side_effect=hang),
+            patch("app.detection.settings.DETECT_DEADLINE_SEC", 0.05),
+        ):
+            _, sources = await detection.detect("ner", "text", progress)
+        assert sources == ["ner_skipped"]
+        assert progress.detectors_done == []
@@ -0,0 +1,36 @@
+"""Tests for app.detectors.double_array_trie."""
+
+from app.detectors.double_array_trie import DoubleArrayTrie
+
+
+class TestDoubleArrayTrie:
+    def test_membership(self):
+        trie = DoubleArrayTrie(["김", "남궁", "박", "철수", "철"])
+        for key in ["김", "남궁", "박", "철수", "철"]:
+            assert key in trie
+        assert "남" not in trie
+        assert "철수씨" not in trie
+        assert len(trie) == 5
+
+    def test_prefix_ends(self):
+        trie = DoubleArrayTrie(["철", "철수", "철수야"])
+        assert list(trie.prefix_ends("김철수야", 1)) == [2, 3, 4]
+
+    def test_prefix_ends_max_len(self):
+        trie = DoubleArrayTrie(["철", "철수", "철수야"])
+        assert list(trie.prefix_ends("철수야", 0, max_len=2)) == [1, 2]
+
+    def test_unknown_character_stops(self):
+        trie = DoubleArrayTrie(["abc"])
+        assert list(trie.prefix_ends("abx", 0)) == []
+
+    def test_many_keys(self):
+        keys = [f"k{i}" for i in range(500)]
+        trie = DoubleArrayTrie(keys)
+        assert all(k in trie for k in keys)
+        assert "k500" not in trie
+        assert trie.nbytes() > 0
+
+    def test_empty(self):
+        trie = DoubleArrayTrie([])
+        assert "a" not in trie
@@ -1,5 +1,7 @@
 """Tests for GET /health."""
 
+from unittest.mock import patch
+
 
 class TestHealth:
     def test_health_200(self, client):
@@ -10,3 +12,55 @@ class TestHealth:
     def test_health_content_type(self, client):
         resp = client.get("/health")
         assert "application/json" in resp.headers["content-type"]
+
+
+class TestMetrics:
+    def test_metrics_reports_ner_batcher(self, client):
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        stats = resp.json()["ner_batcher"]
+        assert "mean_fill_ratio" in stats
+        assert "mean_queue_delay_ms" in stats
+
+    def test_metrics_reports_storage(self, client):
+        from app import storage
+        from app.schemas import Audit
+
+        storage.store("masked", Audit(spans=[], total_found=0, sources_used=["regex"]))
+        stats = client.get("/metrics").json()["storage"]
+        assert stats["entries"] == 1
+        assert stats["bytes"] > 0
+        assert "evictions" in stats
+
+    def test_metrics_report_offload_and_loop_lag(self, client):
+        client.post("/redaction/regex", files={"file": ("a.txt", b"user@test.com", "text/plain")})
+        metrics = client.get("/metrics").json()
+        assert metrics["offload"]["executor"] == "thread"
+        assert metrics["offload"]["calls"] > 0
+        assert {"p50_lag_ms", "p99_lag_ms", "max_lag_ms"} <= set(metrics["event_loop"])
+
+
+class TestCleanupSchedule:
+    def test_sleeps_until_next_deadline(self):
+        from app import main
+
+        with (
+            patch("app.main.next_expiry", return_value=1300.0),
+            patch("app.main.time.time", return_value=1000.0),
+        ):
+            assert main._cleanup_delay() == 300.0
+
+    def test_past_deadline_uses_minimum_sleep(self):
+        from app import main
+
+        with (
+            patch("app.main.next_expiry", return_value=900.0),
+            patch("app.main.time.time", return_value=1000.0),
+        ):
+            assert main._cleanup_delay() == main._CLEANUP_MIN_SLEEP_SEC
+
+    def test_empty_store_sleeps_one_ttl(self):
+        from app import main
+
+        with patch("app.main.next_expiry", return_value=None):
+            assert main._cleanup_delay() == main.settings.DOC_TTL_SEC
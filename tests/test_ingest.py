@@ -1,12 +1,16 @@
 """Tests for app.ingest."""
 
+import codecs
 import io
+import mmap
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
-from fastapi import UploadFile
+from fastapi import HTTPException, UploadFile
 
-from app.ingest import extract_text
+from app import ingest
+from app.ingest import Document, _join_pages, extract_document, extract_text, iter_decoded, sniff_encoding
 
 
 def _make_upload(content: bytes, filename: str) -> UploadFile:
@@ -36,6 +40,63 @@ class TestTXT:
         assert kind == "txt"
 
 
+class TestSniffEncoding:
+    def test_ascii_is_utf8(self):
+        assert sniff_encoding(b"plain ascii") == "utf-8"
+
+    def test_utf8(self):
+        assert sniff_encoding("홍길동 계약서".encode("utf-8")) == "utf-8"
+
+    def test_utf8_cut_mid_character(self):
+        assert sniff_encoding("홍길동".encode("utf-8")[:-1]) == "utf-8"
+
+    def test_boms(self):
+        assert sniff_encoding(codecs.BOM_UTF8 + b"x") == "utf-8-sig"
+        assert sniff_encoding("홍".encode("utf-16")) == "utf-16"
+
+    def test_cp949(self):
+        assert sniff_encoding("홍길동의 주민번호는 900101-1234568".encode("cp949")) == "cp949"
+
+    def test_non_korean_legacy_bytes_fall_back_to_utf8(self):
+        assert sniff_encoding("Ça coûte très cher".encode("latin-1")) == "utf-8"
+
+
+@pytest.mark.asyncio
+class TestEncodings:
+    async def test_cp949_upload_decoded(self):
+        content = "계약자 홍길동, 연락처 010-1234-5678".encode("cp949")
+        doc = await extract_document(_make_upload(content, "legacy.txt"))
+        assert doc.text == "계약자 홍길동, 연락처 010-1234-5678"
+        assert doc.encoding == "cp949"
+
+    async def test_euc_kr_upload_decoded(self):
+        content = "서울특별시 강남구 테헤란로".encode("euc-kr")
+        doc = await extract_document(_make_upload(content, "legacy.txt"))
+        assert doc.text == "서울특별시 강남구 테헤란로"
+
+    async def test_utf8_bom_stripped(self):
+        doc = await extract_document(_make_upload(codecs.BOM_UTF8 + "홍길동".encode(), "bom.txt"))
+        assert doc.text == "홍길동"
+
+    async def test_chunk_boundaries_inside_characters(self):
+        text = "가나다라마바사 " * 5000
+        content = text.encode("cp949")
+        with patch.object(ingest.settings, "INGEST_CHUNK_SIZE", 7):
+            doc = await extract_document(_make_upload(content, "a.txt"))
+        assert doc.text == text
+
+
+class TestIterDecoded:
+    def test_streams_bounded_pieces(self):
+        text = "".join(f"담당 user{i}@example.com 010-1234-{i:04d}\n" for i in range(2000))
+        spool = io.BytesIO(text.encode("cp949"))
+        with patch.object(ingest.settings, "INGEST_CHUNK_SIZE", 4096):
+            pieces = list(iter_decoded(spool))
+        assert len(pieces) > 1
+        assert max(len(p) for p in pieces) <= 4096
+        assert "".join(pieces) == text
+
+
 @pytest.mark.asyncio
 class TestPDF:
     async def test_valid_pdf(self):
@@ -88,3 +149,145 @@ class TestExtension:
         upload.filename = None
         text, kind = await extract_text(upload)
         assert kind == "txt"
+
+
+@pytest.mark.asyncio
+class TestSpooling:
+    async def test_upload_too_large_413(self):
+        upload = _make_upload(b"x" * 100, "big.txt")
+        with patch("app.ingest.settings") as mock_settings:
+            mock_settings.MAX_UPLOAD_BYTES = 10
+            mock_settings.INGEST_CHUNK_SIZE = 4
+            mock_settings.INGEST_SPOOL_MAX_MEMORY = 1024
+            with pytest.raises(HTTPException) as exc_info:
+                await extract_text(upload)
+        assert exc_info.value.status_code == 413
+
+    async def test_stream_and_upload_spool_alike(self):
+        content = b"email user@test.com\n" * 50
+        with patch.object(ingest.settings, "INGEST_CHUNK_SIZE", 7):
+            upload_spool, upload_size, upload_digest = await ingest.spool_upload(_make_upload(content, "a.txt"))
+            stream_spool, stream_size, stream_digest = ingest.spool_stream(io.BytesIO(content))
+        with upload_spool, stream_spool:
+            assert upload_spool.read() == stream_spool.read() == content
+        assert upload_size == stream_size == len(content)
+        assert upload_digest == stream_digest
+
+    async def test_stream_too_large_413(self):
+        with patch.object(ingest.settings, "MAX_UPLOAD_BYTES", 10):
+            with pytest.raises(HTTPException) as exc_info:
+                ingest.spool_stream(io.BytesIO(b"x" * 100))
+        assert exc_info.value.status_code == 413
+
+    async def test_multibyte_char_split_across_chunks(self):
+        content = "가나다라마바사".encode("utf-8")
+        upload = _make_upload(content, "ko.txt")
+        with patch("app.ingest.settings") as mock_settings:
+            mock_settings.MAX_UPLOAD_BYTES = 1024
+            mock_settings.INGEST_CHUNK_SIZE = 4  # never aligned with 3-byte Hangul
+            mock_settings.INGEST_SPOOL_MAX_MEMORY = 1024
+            text, kind = await extract_text(upload)
+        assert text == "가나다라마바사"
+
+    async def test_large_pdf_is_memory_mapped(self):
+        mock_page = MagicMock()
+        mock_page.extract_text.return_value = "mapped"
+        mock_reader = MagicMock()
+        mock_reader.pages = [mock_page]
+        upload = _make_upload(b"%PDF" + b"0" * 64, "doc.pdf")
+
+        with (
+            patch("app.ingest.PdfReader", return_value=mock_reader) as reader_cls,
+            patch("app.ingest.settings") as mock_settings,
+        ):
+            mock_settings.MAX_UPLOAD_BYTES = 1024
+            mock_settings.INGEST_CHUNK_SIZE = 16
+            mock_settings.INGEST_SPOOL_MAX_MEMORY = 8
+            mock_settings.PDF_PARALLEL_MIN_PAGES = 32
+            text, kind = await extract_text(upload)
+        stream = reader_cls.call_args.args[0]
+        assert isinstance(stream, mmap.mmap)
+        assert text == "mapped"
+
+    async def test_real_pdf(self):
+        pdf = Path(__file__).resolve().parent.parent / "samples" / "contract_en.pdf"
+        upload = _make_upload(pdf.read_bytes(), "contract_en.pdf")
+        text, kind = await extract_text(upload)
+        assert kind == "pdf"
+        assert "Vertex Analytics" in text
+
+
+class TestPageOffsets:
+    def test_join_pages_offsets(self):
+        text, offsets = _join_pages(["page one", "page two", "three"])
+        assert text == "page one\npage two\nthree"
+        assert [text[o : o + 4] for o in offsets] == ["page", "page", "thre"]
+
+    def test_leading_whitespace_stripped(self):
+        text, offsets = _join_pages(["  \n", "body", "end"])
+        assert text == "body\nend"
+        assert offsets == [0, 0, 5]
+
+    def test_page_of(self):
+        doc = Document(text="a" * 30, kind="pdf", page_offsets=[0, 10, 20])
+        assert doc.page_of(0) == 1
+        assert doc.page_of(9) == 1
+        assert doc.page_of(10) == 2
+        assert doc.page_of(29) == 3
+
+    def test_page_of_txt(self):
+        assert Document(text="abc", kind="txt").page_of(1) is None
+
+
+@pytest.mark.asyncio
+class TestParallelExtraction:
+    async def test_parallel_matches_sequential(self):
+        pdf = Path(__file__).resolve().parent.parent / "samples" / "contract_ko.pdf"
+        content = pdf.read_bytes()
+
+        sequential = await extract_document(_make_upload(content, "a.pdf"))
+        with patch("app.ingest.settings") as mock_settings:
+            mock_settings.MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+            mock_settings.INGEST_CHUNK_SIZE = 64 * 1024
+            mock_settings.INGEST_SPOOL_MAX_MEMORY = 1024 * 1024
+            mock_settings.PDF_PARALLEL_MIN_PAGES = 1
+            mock_settings.PDF_EXTRACT_WORKERS = 2
+            try:
+                parallel = await extract_document(_make_upload(content, "a.pdf"))
+            finally:
+                ingest.shutdown_pool()
+        assert parallel.text == sequential.text
+        assert parallel.page_offsets == sequential.page_offsets
+        assert len(parallel.page_offsets) > 1
+
+    async def test_copy_for_workers_runs_off_the_loop(self):
+        pdf = Path(__file__).resolve().parent.parent / "samples" / "contract_ko.pdf"
+        offloaded = []
+        real_run = ingest.offloader.run
+
+        async def run(fn, *args, **kwargs):
+            offloaded.append(fn.__name__)
+            return await real_run(fn, *args, **kwargs)
+
+        with patch("app.ingest.settings") as mock_settings, patch.object(ingest.offloader, "run", side_effect=run):
+            mock_settings.MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+            mock_settings.INGEST_CHUNK_SIZE = 64 * 1024
+            mock_settings.INGEST_SPOOL_MAX_MEMORY = 1024 * 1024
+            mock_settings.PDF_PARALLEL_MIN_PAGES = 1
+            mock_settings.PDF_EXTRACT_WORKERS = 1
+            try:
+                await extract_document(_make_upload(pdf.read_bytes(), "a.pdf"))
+            finally:
+                ingest.shutdown_pool()
+        assert "_copy_spool" in offloaded
+
+
+class TestPoolWorkers:
+    def test_ranges_sized_like_the_pool(self):
+        with (
+            patch("app.ingest.settings") as mock_settings,
+            patch("app.ingest.os.cpu_count", return_value=8),
+        ):
+            mock_settings.PDF_EXTRACT_WORKERS = 0
+            mock_settings.WEB_CONCURRENCY = 4
+            assert ingest._pool_workers() == 2
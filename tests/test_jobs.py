@@ -0,0 +1,202 @@
+"""Tests for the background job queue."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.jobs import Job, JobQueue
+
+
+async def _until(job: Job, *states: str) -> None:
+    for _ in range(200):
+        if job.state in states:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job stuck in {job.state}")
+
+
+def _job(work, **kwargs) -> Job:
+    return Job(model="regex", filename="a.txt", work=work, **kwargs)
+
+
+class TestJobQueue:
+    @pytest.mark.asyncio
+    async def test_runs_job_and_keeps_result(self):
+        queue = JobQueue(workers=1, max_queued=10, retain_sec=60)
+
+        async def work(progress):
+            progress.pages_extracted = 3
+            return {"doc_id": "abc"}
+
+        job = queue.submit(_job(work))
+        assert queue.get(job.id) is job
+        await _until(job, "done")
+        status = job.status()
+        assert status.doc_id == "abc"
+        assert status.progress.stage == "done"
+        assert status.progress.pages_extracted == 3
+        assert status.started_at is not None and status.finished_at >= status.started_at
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_http_error_recorded(self):
+        queue = JobQueue(workers=1, max_queued=10, retain_sec=60)
+
+        async def work(progress):
+            raise HTTPException(status_code=413, detail="too big")
+
+        job = queue.submit(_job(work))
+        await _until(job, "failed")
+        assert (job.error_status, job.error) == (413, "too big")
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_is_500(self):
+        queue = JobQueue(workers=1, max_queued=10, retain_sec=60)
+
+        async def work(progress):
+            raise RuntimeError("boom")
+
+        job = queue.submit(_job(work))
+        await _until(job, "failed")
+        assert (job.error_status, job.error) == (500, "Internal error")
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejected_with_503(self):
+        queue = JobQueue(workers=1, max_queued=1, retain_sec=60)
+        release = asyncio.Event()
+
+        async def work(progress):
+            await release.wait()
+
+        running = queue.submit(_job(work))
+        await _until(running, "running")
+        queue.submit(_job(work))
+        with pytest.raises(HTTPException) as exc:
+            queue.submit(_job(work))
+        assert exc.value.status_code == 503
+        assert "Retry-After" in exc.value.headers
+        release.set()
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_workers_bound_concurrency(self):
+        queue = JobQueue(workers=2, max_queued=10, retain_sec=60)
+        active = peak = 0
+
+        async def work(progress):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+        submitted = [queue.submit(_job(work)) for _ in range(6)]
+        for job in submitted:
+            await _until(job, "done")
+        assert peak == 2
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_prunes_old_finished_jobs(self):
+        queue = JobQueue(workers=1, max_queued=10, retain_sec=60)
+
+        async def work(progress):
+            return None
+
+        job = queue.submit(_job(work))
+        await _until(job, "done")
+        job.finished_at -= 120
+        queue.submit(_job(work))
+        assert queue.get(job.id) is None
+        await queue.stop()
+
+
+class TestCancel:
+    @pytest.mark.asyncio
+    async def test_cancel_queued_job_discards_inputs(self):
+        queue = JobQueue(workers=1, max_queued=10, retain_sec=60)
+        release = asyncio.Event()
+        discarded = []
+        ran = []
+
+        async def blocker(progress):
+            await release.wait()
+
+        async def work(progress):
+            ran.append(True)
+
+        first = queue.submit(_job(blocker))
+        await _until(first, "running")
+        second = queue.submit(_job(work, on_discard=lambda: discarded.append(True)))
+        assert queue.cancel(second)
+        assert second.state == "cancelled"
+        assert discarded == [True]
+        release.set()
+        await _until(first, "done")
+        await asyncio.sleep(0.02)
+        assert ran == []
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_job_frees_worker(self):
+        queue = JobQueue(workers=1, max_queued=10, retain_sec=60)
+
+        async def forever(progress):
+            await asyncio.Event().wait()
+
+        async def quick(progress):
+            return {"doc_id": "x"}
+
+        stuck = queue.submit(_job(forever))
+        await _until(stuck, "running")
+        assert queue.cancel(stuck)
+        await _until(stuck, "cancelled")
+        after = queue.submit(_job(quick))
+        await _until(after, "done")
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_cancel_finished_job_refused(self):
+        queue = JobQueue(workers=1, max_queued=10, retain_sec=60)
+
+        async def work(progress):
+            return None
+
+        job = queue.submit(_job(work))
+        await _until(job, "done")
+        assert not queue.cancel(job)
+        assert job.state == "done"
+        await queue.stop()
+
+
+class TestStats:
+    @pytest.mark.asyncio
+    async def test_counts_and_latency(self):
+        queue = JobQueue(workers=1, max_queued=10, retain_sec=60)
+
+        async def work(progress):
+            await asyncio.sleep(0.01)
+
+        async def fail(progress):
+            raise HTTPException(status_code=400, detail="bad")
+
+        ok = queue.submit(_job(work))
+        bad = queue.submit(_job(fail))
+        await _until(ok, "done")
+        await _until(bad, "failed")
+        stats = queue.stats()
+        assert stats["done"] == 1
+        assert stats["failed"] == 1
+        assert stats["queued"] == stats["running"] == 0
+        assert stats["p95_latency_ms"] >= 10
+        assert stats["p95_wait_ms"] >= stats["p50_wait_ms"] >= 0
+        await queue.stop()
+
+    def test_empty(self):
+        stats = JobQueue(workers=2, max_queued=5, retain_sec=60).stats()
+        assert stats["workers"] == 2
+        assert stats["max_queued"] == 5
+        assert stats["p50_latency_ms"] == 0.0
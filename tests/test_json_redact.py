@@ -0,0 +1,99 @@
+"""Tests for app.json_redact."""
+
+import json
+
+import pytest
+
+from app.detectors import regex_detector
+from app.json_redact import JSONStreamError, JsonRedactor, compile_path, iter_tokens, path_matches
+from app.masker import restore_text
+
+DOC = {
+    "customer": {"name": "홍길동", "email": "hong@example.com", "note": 'says "hi" \\ 010-1234-5678'},
+    "orders": [
+        {"id": 1, "contact": "kim@example.com", "total": 1.5e3},
+        {"id": 2, "contact": "lee@example.com", "paid": True, "coupon": None},
+    ],
+    "owner@example.com": "key is never masked",
+}
+
+
+def _pieces(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def _redact(text: str, size: int = 7, **kwargs) -> tuple[str, JsonRedactor]:
+    redactor = JsonRedactor(_pieces(text, size), regex_detector.detect, **kwargs)
+    return "".join(redactor), redactor
+
+
+class TestPaths:
+    @pytest.mark.parametrize(
+        "expr, path, expected",
+        [
+            ("$", ["a", 0], True),
+            ("$.orders[*].contact", ["orders", 3, "contact"], True),
+            ("$.orders[0]", ["orders", 1, "contact"], False),
+            ("$.orders[1]", ["orders", 1, "contact"], True),
+            ("$..contact", ["orders", 1, "contact"], True),
+            ("$..email", ["orders", 1, "contact"], False),
+            ("$['a b'].c", ["a b", "c"], True),
+            ("$.customer", ["customer", "name"], True),
+        ],
+    )
+    def test_matching(self, expr, path, expected):
+        assert path_matches(compile_path(expr), path) is expected
+
+    @pytest.mark.parametrize("expr", ["orders", "$orders", "$.a[", "$.a[x]"])
+    def test_invalid(self, expr):
+        with pytest.raises(JSONStreamError):
+            compile_path(expr)
+
+
+class TestTokenizer:
+    def test_numbers_split_across_pieces(self):
+        tokens = [t for k, t in iter_tokens(["[1", "2.5e", "+3, -", "4]"]) if k != "ws"]
+        assert tokens == ["[", "12.5e+3", ",", "-4", "]"]
+
+    def test_garbage_rejected_early(self):
+        with pytest.raises(JSONStreamError):
+            list(iter_tokens(["hello world"]))
+
+
+class TestJsonRedactor:
+    @pytest.mark.parametrize("size", [1, 5, 64, 100_000])
+    def test_output_is_valid_json_with_same_shape(self, size):
+        out, _ = _redact(json.dumps(DOC, ensure_ascii=False, indent=2), size=size)
+        data = json.loads(out)
+        assert data["customer"]["name"] == "홍길동"
+        assert data["customer"]["email"].startswith("[[PII:EMAIL:")
+        assert data["orders"][0]["contact"].startswith("[[PII:EMAIL:")
+        assert data["orders"][0]["total"] == 1500.0
+        assert data["orders"][1]["paid"] is True
+        assert data["owner@example.com"] == "key is never masked"
+
+    def test_restore_text_round_trip(self):
+        text = json.dumps(DOC, ensure_ascii=False)
+        out, redactor = _redact(text)
+        assert "010-1234-5678" not in out
+        assert json.loads(restore_text(out, redactor.token_map)) == DOC
+
+    def test_include_and_exclude(self):
+        out, redactor = _redact(
+            json.dumps(DOC), include=["$.orders"], exclude=["$.orders[1]"]
+        )
+        data = json.loads(out)
+        assert data["customer"]["email"] == "hong@example.com"
+        assert data["orders"][0]["contact"].startswith("[[PII:EMAIL:")
+        assert data["orders"][1]["contact"] == "lee@example.com"
+        assert redactor.scanned == 1
+        assert redactor.leaves == 6
+
+    def test_whitespace_preserved(self):
+        text = '{\n  "a": [ 1 ,2 ]\n}'
+        assert _redact(text)[0] == text
+
+    @pytest.mark.parametrize("text", ['{"a": 1', '{"a" 1}', "[1,]", '{"a": 1}}', "[1] [2]", ""])
+    def test_malformed(self, text):
+        with pytest.raises(JSONStreamError):
+            _redact(text)
@@ -0,0 +1,47 @@
+"""Tests for app.detectors.korean_name_detector."""
+
+from app.detectors.korean_name_detector import detect
+
+
+def _names(text):
+    return [s.text for s in detect(text)]
+
+
+class TestKoreanNameDetector:
+    def test_three_syllable_name(self):
+        spans = detect("프리랜서 개발자 박영희(이하 \"을\")")
+        assert [s.text for s in spans] == ["박영희"]
+        assert spans[0].type == "PERSON"
+        assert spans[0].source == "ner"
+
+    def test_name_with_particle(self):
+        assert _names("김철수의 주소") == ["김철수"]
+
+    def test_role_cue_raises_confidence(self):
+        with_cue = detect("대표이사: 김철수")[0]
+        without_cue = detect("김철수")[0]
+        assert with_cue.confidence > without_cue.confidence
+
+    def test_two_syllable_needs_context(self):
+        assert _names("김민 주소") == []
+        assert _names("성명: 김민") == ["김민"]
+        assert _names("김민 대리님") == ["김민"]
+
+    def test_honorific_suffix(self):
+        assert _names("박영희님께 전달") == ["박영희"]
+
+    def test_two_syllable_surname(self):
+        assert _names("담당: 남궁민수") == []  # 민수 not in the given-name list
+        assert _names("담당: 남궁민준") == ["남궁민준"]
+
+    def test_inside_word_ignored(self):
+        assert _names("이사회 결의") == []
+        assert _names("넥스트이노베이션") == []
+
+    def test_offsets(self):
+        text = "갑: 주식회사, 을: 이준혁 (개발팀장)"
+        for s in detect(text):
+            assert text[s.start : s.end] == s.text
+
+    def test_empty(self):
+        assert detect("") == []
@@ -3,15 +3,17 @@
 import json
 from unittest.mock import MagicMock, patch
 
-from app.detectors.llm_detector import detect
+from app.detectors.llm_detector import SpanObjectParser, detect, parse_stream
 
 
-def _mock_genai_response(text: str):
-    """Create a mock genai Client that returns the given text."""
+def _mock_genai_response(text: str | None, chunk_size: int | None = None):
+    """Create a mock genai Client that streams the given text."""
     mock_client = MagicMock()
-    mock_response = MagicMock()
-    mock_response.text = text
-    mock_client.models.generate_content.return_value = mock_response
+    if text is None or chunk_size is None:
+        chunks = [MagicMock(text=text)]
+    else:
+        chunks = [MagicMock(text=text[i : i + chunk_size]) for i in range(0, len(text), chunk_size)]
+    mock_client.models.generate_content_stream.return_value = iter(chunks)
     return mock_client
 
 
@@ -37,6 +39,33 @@ class TestLLMDetector:
         assert result[0].type == "PERSON"
         assert result[0].source == "llm"
 
+    def test_client_timeout_follows_budget(self):
+        with (
+            patch("app.detectors.llm_detector.settings") as mock_settings,
+            patch("app.detectors.llm_detector.genai.Client", return_value=_mock_genai_response("[]")) as client_cls,
+        ):
+            mock_settings.GEMINI_API_KEY = "test-key"
+            mock_settings.LLM_TIMEOUT_SEC = 2.5
+            detect("text")
+        assert client_cls.call_args.kwargs["http_options"].timeout == 2500
+
+    def test_consumes_response_stream(self):
+        items = [
+            {"start": 0, "end": 3, "type": "PERSON", "text": "홍길동", "confidence": 0.9},
+            {"start": 5, "end": 7, "type": "ORG", "text": "삼성", "confidence": 0.85},
+        ]
+        mock_client = _mock_genai_response(json.dumps(items, ensure_ascii=False), chunk_size=7)
+        received = []
+        with (
+            patch("app.detectors.llm_detector.settings") as mock_settings,
+            patch("app.detectors.llm_detector.genai.Client", return_value=mock_client),
+        ):
+            mock_settings.GEMINI_API_KEY = "test-key"
+            result = detect("홍길동은 삼성에 다닙니다", received=received)
+        assert [s.type for s in result] == ["PERSON", "ORG"]
+        assert received == result
+        mock_client.models.generate_content.assert_not_called()
+
     def test_markdown_fence_stripped(self):
         items = [{"start": 0, "end": 3, "type": "PERSON", "text": "홍길동", "confidence": 0.9}]
         raw = f"```json\n{json.dumps(items)}\n```"
@@ -108,11 +137,8 @@ class TestLLMDetector:
         assert result[0].confidence == 0.8
 
     def test_none_response_text(self):
+        # A chunk whose text is None is skipped
         mock_client = _mock_genai_response(None)
-        # response.text returns None → raw should become "[]"
-        mock_resp = MagicMock()
-        mock_resp.text = None
-        mock_client.models.generate_content.return_value = mock_resp
         with (
             patch("app.detectors.llm_detector.settings") as mock_settings,
             patch("app.detectors.llm_detector.genai.Client", return_value=mock_client),
@@ -136,3 +162,33 @@ class TestLLMDetector:
         assert len(result) == 2
         assert result[0].type == "PERSON"
         assert result[1].type == "ORG"
+
+
+class TestStreamingParser:
+    def test_objects_emitted_as_braces_close(self):
+        parser = SpanObjectParser()
+        assert parser.feed('```json\n[{"start": 0, "end": 3, "te') == []
+        items = parser.feed('xt": "홍길동"}, {"start"')
+        assert items == [{"start": 0, "end": 3, "text": "홍길동"}]
+        assert parser.feed(': 5}]\n```') == [{"start": 5}]
+
+    def test_braces_inside_strings_ignored(self):
+        parser = SpanObjectParser()
+        items = parser.feed('[{"text": "a}b{\\"c", "start": 0}]')
+        assert items == [{"text": 'a}b{"c', "start": 0}]
+
+    def test_malformed_tail_keeps_leading_items(self):
+        text = "홍길동은 삼성에 다닙니다"
+        chunks = [
+            '[{"start": 0, "end": 3, "type": "PERSON", "text": "홍길동"},',
+            ' {"start": 5, "end": 7, "type": "ORG", "te',
+        ]
+        spans = list(parse_stream(chunks, text))
+        assert len(spans) == 1
+        assert spans[0].text == "홍길동"
+
+    def test_invalid_object_skipped(self):
+        text = "홍길동은 삼성에 다닙니다"
+        raw = '[{"start": 0, oops}, {"start": 5, "end": 7, "type": "ORG", "text": "삼성"}]'
+        spans = list(parse_stream([raw], text))
+        assert [s.type for s in spans] == ["ORG"]
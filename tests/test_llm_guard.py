@@ -0,0 +1,200 @@
+"""Tests for app.llm_guard."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app import llm_guard
+from app.llm_guard import CircuitBreaker, LatencyTracker
+from app.schemas import Span
+
+
+def _span() -> Span:
+    return Span(start=0, end=3, type="PERSON", text="홍길동", source="llm", confidence=0.9)
+
+
+@pytest.fixture(autouse=True)
+def fresh_guard():
+    with (
+        patch.object(llm_guard, "breaker", CircuitBreaker(threshold=2, cooldown_sec=60)),
+        patch.object(llm_guard, "latencies", LatencyTracker()),
+    ):
+        yield
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        b = CircuitBreaker(threshold=2, cooldown_sec=60)
+        b.record_failure()
+        assert b.allow()
+        b.record_failure()
+        assert b.state == "open"
+        assert not b.allow()
+
+    def test_half_open_allows_single_probe(self):
+        b = CircuitBreaker(threshold=1, cooldown_sec=0)
+        b.record_failure()
+        assert b.state == "half_open"
+        assert b.allow()
+        assert not b.allow()
+        b.record_success()
+        assert b.state == "closed"
+
+    def test_failed_probe_reopens(self):
+        b = CircuitBreaker(threshold=1, cooldown_sec=0.05)
+        b.record_failure()
+        time.sleep(0.06)
+        assert b.allow()
+        b.record_failure()
+        assert b.state == "open"
+
+
+class TestLatencyTracker:
+    def test_percentile(self):
+        t = LatencyTracker()
+        for i in range(1, 101):
+            t.record(i / 100)
+        assert t.percentile(0.95) == pytest.approx(0.96)
+
+    def test_empty(self):
+        assert LatencyTracker().percentile(0.95) is None
+
+
+@pytest.mark.asyncio
+class TestDetect:
+    async def test_success(self):
+        with patch("app.llm_guard.llm_detector.detect", return_value=[_span()]):
+            result = await llm_guard.detect("홍길동")
+        assert len(result) == 1
+        assert llm_guard.breaker.state == "closed"
+
+    async def test_timeout_returns_none(self):
+        def slow(text, pre_masked_spans=None, received=None):
+            time.sleep(0.2)
+            return [_span()]
+
+        with (
+            patch("app.llm_guard.llm_detector.detect", side_effect=slow),
+            patch("app.llm_guard.settings") as mock_settings,
+        ):
+            mock_settings.LLM_TIMEOUT_SEC = 0.05
+            mock_settings.LLM_HEDGE = False
+            result = await llm_guard.detect("홍길동")
+        assert result is None
+        assert llm_guard.breaker.failures == 1
+
+    async def test_timeout_keeps_spans_already_received(self):
+        release = threading.Event()
+
+        def partial(text, pre_masked_spans=None, received=None):
+            received.append(_span())
+            release.wait(5)
+            return received
+
+        with (
+            patch("app.llm_guard.llm_detector.detect", side_effect=partial),
+            patch("app.llm_guard.settings") as mock_settings,
+        ):
+            mock_settings.LLM_TIMEOUT_SEC = 0.05
+            mock_settings.LLM_HEDGE = False
+            try:
+                result = await llm_guard.detect("홍길동")
+            finally:
+                release.set()
+        assert isinstance(result, llm_guard.PartialSpans)
+        assert [s.text for s in result] == ["홍길동"]
+        assert llm_guard.breaker.failures == 1
+
+    async def test_error_returns_none(self):
+        with patch("app.llm_guard.llm_detector.detect", side_effect=RuntimeError("boom")):
+            assert await llm_guard.detect("홍길동") is None
+
+    async def test_open_breaker_skips_call(self):
+        llm_guard.breaker.record_failure()
+        llm_guard.breaker.record_failure()
+        with patch("app.llm_guard.llm_detector.detect") as mock_detect:
+            assert await llm_guard.detect("홍길동") is None
+        mock_detect.assert_not_called()
+
+    async def test_cancelled_probe_releases_half_open(self):
+        llm_guard.breaker = CircuitBreaker(threshold=1, cooldown_sec=0.05)
+        llm_guard.breaker.record_failure()
+        await asyncio.sleep(0.06)
+
+        def slow(text, pre_masked_spans=None, received=None):
+            time.sleep(0.2)
+            return [_span()]
+
+        with (
+            patch("app.llm_guard.llm_detector.detect", side_effect=slow),
+            patch("app.llm_guard.settings") as mock_settings,
+        ):
+            mock_settings.LLM_TIMEOUT_SEC = 5
+            mock_settings.LLM_HEDGE = False
+            task = asyncio.create_task(llm_guard.detect("홍길동"))
+            await asyncio.sleep(0.02)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        assert llm_guard.breaker.state == "open"
+        await asyncio.sleep(0.06)
+        assert llm_guard.breaker.allow()
+
+    async def test_hung_calls_do_not_starve_default_executor(self):
+        release = threading.Event()
+
+        def hang(text, pre_masked_spans=None, received=None):
+            release.wait(5)
+            return []
+
+        with (
+            patch("app.llm_guard.llm_detector.detect", side_effect=hang),
+            patch("app.llm_guard.settings") as mock_settings,
+        ):
+            mock_settings.LLM_TIMEOUT_SEC = 0.05
+            mock_settings.LLM_HEDGE = False
+            try:
+                await asyncio.gather(*(llm_guard.detect("홍길동") for _ in range(10)))
+                loop = asyncio.get_running_loop()
+                result = await asyncio.wait_for(loop.run_in_executor(None, lambda: "ner"), 1)
+            finally:
+                release.set()
+        assert result == "ner"
+
+    async def test_slow_success_counts_as_failure(self):
+        with (
+            patch("app.llm_guard.llm_detector.detect", return_value=[]),
+            patch("app.llm_guard.settings") as mock_settings,
+        ):
+            mock_settings.LLM_TIMEOUT_SEC = 5
+            mock_settings.LLM_HEDGE = False
+            mock_settings.LLM_SLOW_CALL_SEC = 0
+            assert await llm_guard.detect("홍길동") == []
+        assert llm_guard.breaker.failures == 1
+
+    async def test_hedged_request_wins(self):
+        calls = []
+
+        def detect(text, pre_masked_spans=None, received=None):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                time.sleep(0.3)
+                return []
+            return [_span()]
+
+        for _ in range(5):
+            llm_guard.latencies.record(0.01)
+        with (
+            patch("app.llm_guard.llm_detector.detect", side_effect=detect),
+            patch("app.llm_guard.settings") as mock_settings,
+        ):
+            mock_settings.LLM_TIMEOUT_SEC = 5
+            mock_settings.LLM_HEDGE = True
+            mock_settings.LLM_HEDGE_MIN_SAMPLES = 5
+            mock_settings.LLM_SLOW_CALL_SEC = 5
+            result = await llm_guard.detect("홍길동")
+        assert len(calls) == 2
+        assert len(result) == 1
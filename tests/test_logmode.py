@@ -0,0 +1,118 @@
+"""Tests for app.logmode."""
+
+import io
+import re
+import sys
+from unittest.mock import patch
+
+from app.detectors import regex_detector
+from app.logmode import WILDCARD, LogRedactor, _shape, main
+from app.merger import merge_spans
+
+_TOKEN = re.compile(r"\[\[PII:([A-Z_]+):[0-9a-f]{8}\]\]")
+
+
+def _lines(n: int) -> list[str]:
+    return [f"INFO worker-{i % 4} request done in {i % 900}ms status=200" for i in range(n)]
+
+
+class TestTemplates:
+    def test_lines_grouped_into_one_template(self):
+        redactor = LogRedactor()
+        for line in _lines(10):
+            redactor.redact_line(line)
+        assert len(redactor.templates) == 1
+        assert redactor.templates[0].tokens == ["INFO", WILDCARD, "request", "done", "in", WILDCARD, WILDCARD]
+        assert redactor.templates[0].size == 10
+
+    def test_differing_constants_become_slots(self):
+        redactor = LogRedactor()
+        redactor.redact_line("user alice logged in")
+        redactor.redact_line("user bob logged in")
+        assert redactor.templates[0].render() == f"user {WILDCARD} logged in"
+
+    def test_dissimilar_lines_get_separate_templates(self):
+        redactor = LogRedactor()
+        redactor.redact_line("INFO cache hit key=a")
+        redactor.redact_line("INFO login failed for=b")
+        assert len(redactor.templates) == 2
+
+    def test_shape(self):
+        assert _shape("2024-01-05") == "9999-99-99"
+        assert _shape("id=3fa9c0") == "=999"
+        assert _shape("12가1234") == "99가9999"
+
+
+class TestRedaction:
+    def test_masks_pii_in_slots(self):
+        redactor = LogRedactor()
+        out = [redactor.redact_line(f"login ok user=u{i}@example.com phone=010-1234-{i:04d}") for i in range(50)]
+        for line in out:
+            assert sorted(_TOKEN.findall(line)) == ["EMAIL", "PHONE_KR"]
+            assert "@example.com" not in line
+
+    def test_keyword_context_from_previous_token(self):
+        redactor = LogRedactor()
+        for i in range(5):
+            out = redactor.redact_line(f"upstream failed token: {'a' * 10}{i:010d}{'b' * 10} retry")
+            assert _TOKEN.findall(out) == ["API_KEY"]
+
+    def test_pii_in_constant_token_always_masked(self):
+        redactor = LogRedactor()
+        for i in range(40):
+            out = redactor.redact_line(f"alerts go to ops@example.com attempt={i}")
+            assert "ops@example.com" not in out
+
+    def test_clean_slots_skipped_after_warmup(self):
+        redactor = LogRedactor(slot_warmup=8)
+        for line in _lines(100):
+            assert redactor.redact_line(line) == line
+        stats = redactor.stats()
+        assert stats["slots_skipped"] > 0
+        assert stats["lines_skipped"] > 0
+
+    def test_pattern_shapes_never_trusted(self):
+        redactor = LogRedactor(slot_warmup=2)
+        for i in range(20):
+            # Same shape as a valid RRN but a bad checksum: must still be scanned every time
+            redactor.redact_line(f"citizen id 900101-123456{(i + 9) % 10}")
+        assert redactor.slots_skipped == 0
+
+    def test_warmup_zero_scans_everything(self):
+        redactor = LogRedactor(slot_warmup=0)
+        for line in _lines(50):
+            redactor.redact_line(line)
+        assert redactor.slots_skipped == 0
+
+    def test_agrees_with_plain_detection(self):
+        redactor = LogRedactor()
+        lines = [
+            f"2024-05-0{i % 9 + 1} WARN retry phone=010-{1000 + i}-5678 account=110-234-{100000 + i} user=u{i}@x.com"
+            for i in range(100)
+        ]
+        for line in lines:
+            expected = sorted(s.type for s in merge_spans(regex_detector.detect(line)))
+            assert sorted(_TOKEN.findall(redactor.redact_line(line))) == expected
+
+    def test_line_endings_preserved(self):
+        redactor = LogRedactor()
+        assert list(redactor.redact_lines(["a b\n", "c d\r\n", "\n"])) == ["a b\n", "c d\r\n", "\n"]
+
+
+class TestCli:
+    def test_reads_stdin_writes_stdout(self):
+        stdin = io.StringIO("login ok user=a@example.com\nplain line\n")
+        stdout = io.StringIO()
+        with patch.object(sys, "stdin", stdin), patch.object(sys, "stdout", stdout):
+            main([])
+        out = stdout.getvalue().splitlines()
+        assert _TOKEN.findall(out[0]) == ["EMAIL"]
+        assert out[1] == "plain line"
+
+    def test_reads_file(self, tmp_path):
+        path = tmp_path / "app.log"
+        path.write_text("phone 010-1234-5678\n", encoding="utf-8")
+        stdout = io.StringIO()
+        with patch.object(sys, "stdout", stdout):
+            main([str(path)])
+        assert _TOKEN.findall(stdout.getvalue()) == ["PHONE_KR"]
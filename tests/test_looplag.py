@@ -0,0 +1,33 @@
+"""Tests for the event-loop lag monitor."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.looplag import LoopLagMonitor
+
+
+class TestLoopLagMonitor:
+    def test_empty_stats(self):
+        stats = LoopLagMonitor(0.1).stats()
+        assert stats["samples"] == 0
+        assert stats["p99_lag_ms"] == 0.0
+
+    def test_percentiles(self):
+        monitor = LoopLagMonitor(0.1)
+        for ms in range(100):
+            monitor.record(ms / 1000)
+        stats = monitor.stats()
+        assert stats["p50_lag_ms"] == pytest.approx(49, abs=1)
+        assert stats["max_lag_ms"] == pytest.approx(99)
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_shows_as_lag(self):
+        monitor = LoopLagMonitor(0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # hold the loop
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        assert monitor.stats()["max_lag_ms"] >= 150
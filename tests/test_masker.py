@@ -8,6 +8,7 @@ from cryptography.fernet import Fernet
 from app.masker import (
     decrypt_envelope,
     encrypt_envelope,
+    key_fingerprint,
     mask_text,
     restore_text,
 )
@@ -115,6 +116,12 @@ class TestRoundTrip:
         restored = restore_text(masked, token_map)
         assert restored == text
 
+    def test_backslashes_restored_literally(self):
+        text = r"key C:\Users\hong\u0041 end"
+        span = _span(4, 23, text=text[4:23], type_="API_KEY")
+        masked, token_map = mask_text(text, [span])
+        assert restore_text(masked, token_map) == text
+
 
 # ── encrypt/decrypt ─────────────────────────────────────────────
 
@@ -151,3 +158,14 @@ class TestEncryptDecrypt:
 
         with pytest.raises(Exception):
             decrypt_envelope("not-valid-fernet-token")
+
+
+class TestKeyFingerprint:
+    def test_stable_and_short(self):
+        assert key_fingerprint() == key_fingerprint()
+        assert len(key_fingerprint()) == 16
+
+    def test_differs_per_key(self):
+        first = key_fingerprint()
+        with patch("app.masker._fernet_key", Fernet.generate_key()):
+            assert key_fingerprint() != first
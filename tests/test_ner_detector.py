@@ -1,16 +1,100 @@
-"""Tests for app.detectors.ner_detector (stub)."""
+"""Tests for app.detectors.ner_detector."""
 
-from app.detectors.ner_detector import detect
+from unittest.mock import patch
 
+import pytest
 
-def test_returns_empty_list():
-    assert detect("홍길동은 서울에 살고 있습니다.") == []
+from app.detectors import ner_detector
+from app.detectors.ner_detector import detect, detect_batch
+from app.detectors.perceptron import PerceptronTagger
 
+_EXAMPLES = [
+    (["성명", ":", "박영희"], ["O", "O", "B-PER"]),
+    (["성명", ":", "김철수"], ["O", "O", "B-PER"]),
+    (["Name", ":", "Robert", "Chen"], ["O", "O", "B-PER", "I-PER"]),
+    (["주소", ":", "서울특별시", "강남구"], ["O", "O", "B-LOC", "I-LOC"]),
+    (["no", "entities", "here"], ["O", "O", "O"]),
+]
 
-def test_returns_empty_for_empty_string():
-    assert detect("") == []
 
+@pytest.fixture()
+def tagger():
+    trained = PerceptronTagger.train(_EXAMPLES * 5, epochs=5, n_buckets=1 << 10)
+    with (
+        patch.object(ner_detector, "_tagger", trained),
+        patch.object(ner_detector, "_load_attempted", True),
+    ):
+        yield trained
 
-def test_returns_list_type():
-    result = detect("some text")
-    assert isinstance(result, list)
+
+class TestWithoutModel:
+    def test_missing_model_returns_empty(self, tmp_path):
+        with (
+            patch.object(ner_detector, "_tagger", None),
+            patch.object(ner_detector, "_load_attempted", False),
+            patch("app.detectors.ner_detector.settings") as mock_settings,
+        ):
+            mock_settings.NER_MODEL_PATH = str(tmp_path / "missing.bin")
+            assert detect("홍길동은 서울에 살고 있습니다.") == []
+
+    def test_loads_model_from_path(self, tmp_path):
+        path = tmp_path / "ner.bin"
+        PerceptronTagger.train(_EXAMPLES, epochs=1, n_buckets=1 << 8).save(path)
+        with (
+            patch.object(ner_detector, "_tagger", None),
+            patch.object(ner_detector, "_load_attempted", False),
+            patch("app.detectors.ner_detector.settings") as mock_settings,
+        ):
+            mock_settings.NER_MODEL_PATH = str(path)
+            mock_settings.NER_MODEL_MMAP = True
+            tagger = ner_detector.get_tagger()
+            assert tagger is not None
+            assert isinstance(tagger.weights, memoryview)
+
+    def test_warmup_without_model(self):
+        with (
+            patch.object(ner_detector, "_tagger", None),
+            patch.object(ner_detector, "_load_attempted", True),
+        ):
+            ner_detector.warmup()
+
+
+class TestDetect:
+    def test_person_span(self, tagger):
+        text = "성명: 박영희"
+        spans = detect(text)
+        assert len(spans) == 1
+        assert spans[0].type == "PERSON"
+        assert spans[0].source == "ner"
+        assert text[spans[0].start : spans[0].end] == "박영희"
+
+    def test_offsets_across_lines(self, tagger):
+        text = "계약서\n성명: 김철수\nName: Robert Chen"
+        spans = detect(text)
+        assert [s.text for s in spans] == ["김철수", "Robert Chen"]
+        for s in spans:
+            assert text[s.start : s.end] == s.text
+
+    def test_empty_string(self, tagger):
+        assert detect("") == []
+
+    def test_batch(self, tagger):
+        results = detect_batch(["성명: 박영희", "no entities here", "주소: 서울특별시 강남구"])
+        assert [len(r) for r in results] == [1, 0, 1]
+        assert results[2][0].type == "LOCATION"
+
+
+@pytest.mark.asyncio
+class TestDetectAsync:
+    async def test_matches_sync(self, tagger):
+        text = "계약서\n성명: 김철수\nName: Robert Chen"
+        spans = await ner_detector.detect_async(text)
+        assert spans == detect(text)
+        await ner_detector.batcher.stop()
+
+    async def test_no_model(self):
+        with (
+            patch.object(ner_detector, "_tagger", None),
+            patch.object(ner_detector, "_load_attempted", True),
+        ):
+            assert await ner_detector.detect_async("성명: 박영희") == []
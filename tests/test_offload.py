@@ -0,0 +1,93 @@
+"""Tests for the CPU-stage offload executor."""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.offload import Offloader
+
+
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+class TestOffloader:
+    def test_unknown_kind(self):
+        with pytest.raises(ValueError):
+            Offloader("fiber", 1, 1)
+
+    def test_default_workers(self):
+        assert Offloader("thread", 0, 1).workers >= 1
+
+    @pytest.mark.asyncio
+    async def test_inline_runs_on_loop_thread(self):
+        offloader = Offloader("inline", 1, 1)
+        assert await offloader.run(_thread_name) == threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_thread_runs_off_loop(self):
+        offloader = Offloader("thread", 2, 1)
+        assert (await offloader.run(_thread_name)).startswith("offload")
+        offloader.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_process_falls_back_to_threads_for_local_stages(self):
+        offloader = Offloader("process", 1, 1)
+        assert (await offloader.run(_thread_name, portable=False)).startswith("offload")
+        offloader.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate(self):
+        offloader = Offloader("thread", 1, 1)
+        with pytest.raises(ZeroDivisionError):
+            await offloader.run(divmod, 1, 0)
+        assert offloader.stats()["running"] == 0
+        offloader.shutdown()
+
+
+class TestBackpressure:
+    @pytest.mark.asyncio
+    async def test_running_bounded_by_workers(self):
+        offloader = Offloader("thread", 2, 10)
+        release = threading.Event()
+        tasks = [asyncio.ensure_future(offloader.run(release.wait)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        stats = offloader.stats()
+        assert (stats["running"], stats["waiting"]) == (2, 3)
+        release.set()
+        await asyncio.gather(*tasks)
+        assert offloader.stats()["calls"] == 5
+        offloader.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_rejects_past_max_pending(self):
+        offloader = Offloader("thread", 1, 1)
+        release = threading.Event()
+        running = asyncio.ensure_future(offloader.run(release.wait))
+        waiting = asyncio.ensure_future(offloader.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as exc:
+            await offloader.run(release.wait)
+        assert exc.value.status_code == 503
+        assert "Retry-After" in exc.value.headers
+        assert offloader.stats()["rejected"] == 1
+        release.set()
+        await asyncio.gather(running, waiting)
+        offloader.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_frees_its_place(self):
+        offloader = Offloader("thread", 1, 1)
+        release = threading.Event()
+        running = asyncio.ensure_future(offloader.run(release.wait))
+        waiting = asyncio.ensure_future(offloader.run(release.wait))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        await asyncio.sleep(0)
+        assert offloader.stats()["waiting"] == 0
+        release.set()
+        await running
+        assert await offloader.run(_thread_name)
+        offloader.shutdown()
@@ -0,0 +1,86 @@
+"""Tests for app.detectors.perceptron."""
+
+import pytest
+
+from app.detectors.perceptron import PerceptronTagger, spans_from_tags, tokenize
+
+_EXAMPLES = [
+    (["성명", ":", "박영희"], ["O", "O", "B-PER"]),
+    (["성명", ":", "김철수"], ["O", "O", "B-PER"]),
+    (["Name", ":", "Robert", "Chen"], ["O", "O", "B-PER", "I-PER"]),
+    (["Name", ":", "Sarah", "Williams"], ["O", "O", "B-PER", "I-PER"]),
+    (["은행", ":", "신한은행"], ["O", "O", "B-ORG"]),
+]
+
+
+def _small_tagger() -> PerceptronTagger:
+    return PerceptronTagger.train(_EXAMPLES * 5, epochs=5, n_buckets=1 << 10)
+
+
+class TestTokenize:
+    def test_offsets(self):
+        text = "Name: Robert Chen"
+        for word, start, end in tokenize(text):
+            assert text[start:end] == word
+
+    def test_korean_particle_split(self):
+        words = [w for w, _, _ in tokenize("홍길동의 주소")]
+        assert words == ["홍길동", "의", "주소"]
+
+    def test_short_hangul_not_split(self):
+        words = [w for w, _, _ in tokenize("이가")]
+        assert words == ["이가"]
+
+
+class TestSpansFromTags:
+    def test_bio_to_spans(self):
+        tokens = [("Robert", 0, 6), ("Chen", 7, 11), ("of", 12, 14), ("Vertex", 15, 21)]
+        spans = spans_from_tags(tokens, ["B-PER", "I-PER", "O", "B-ORG"])
+        assert spans == [(0, 11, "PERSON"), (15, 21, "ORG")]
+
+    def test_dangling_inside_starts_new_span(self):
+        tokens = [("a", 0, 1), ("b", 2, 3)]
+        assert spans_from_tags(tokens, ["O", "I-LOC"]) == [(2, 3, "LOCATION")]
+
+
+class TestTagger:
+    def test_learns_training_data(self):
+        tagger = _small_tagger()
+        for words, gold in _EXAMPLES:
+            assert tagger.tag(words) == gold
+
+    def test_batch_matches_single(self):
+        tagger = _small_tagger()
+        sentences = [words for words, _ in _EXAMPLES]
+        assert tagger.tag_batch(sentences) == [tagger.tag(s) for s in sentences]
+
+    def test_empty_sentence(self):
+        assert _small_tagger().tag([]) == []
+
+    def test_save_load_roundtrip(self, tmp_path):
+        tagger = _small_tagger()
+        path = tmp_path / "ner.bin"
+        tagger.save(path)
+        loaded = PerceptronTagger.load(path)
+        assert loaded.n_buckets == tagger.n_buckets
+        assert loaded.tags == tagger.tags
+        assert list(loaded.weights) == list(tagger.weights)
+        assert path.stat().st_size < 4 * len(tagger.weights) + 128
+
+    def test_mmap_load_matches_copy(self, tmp_path):
+        tagger = _small_tagger()
+        path = tmp_path / "ner.bin"
+        tagger.save(path)
+        mapped = PerceptronTagger.load(path, use_mmap=True)
+        copied = PerceptronTagger.load(path, use_mmap=False)
+        assert isinstance(mapped.weights, memoryview)
+        assert list(mapped.weights) == list(copied.weights)
+        mapped.prefetch()
+        for words, _ in _EXAMPLES:
+            assert mapped.tag(words) == copied.tag(words)
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "bogus.bin"
+        path.write_bytes(b"not a model at all")
+        with pytest.raises(ValueError):
+            PerceptronTagger.load(path)
@@ -249,3 +249,4 @@ class TestCommon:
     def test_confidence_is_one(self):
         spans = detect("user@example.com")
         assert all(s.confidence == 1.0 for s in spans)
+
@@ -0,0 +1,146 @@
+"""Tests for POST /redaction/batch/{model}."""
+
+import asyncio
+import io
+import json
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+from app.routes import redaction
+
+
+def _lines(resp) -> list[dict]:
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def _zip(members: dict[str, bytes]) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buf.getvalue()
+
+
+class TestBatchRedaction:
+    def test_one_line_per_file(self, client):
+        resp = client.post(
+            "/redaction/batch/regex",
+            files=[
+                ("files", ("a.txt", b"email a@test.com", "text/plain")),
+                ("files", ("b.txt", b"no pii", "text/plain")),
+            ],
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        items = sorted(_lines(resp), key=lambda item: item["index"])
+        assert [item["filename"] for item in items] == ["a.txt", "b.txt"]
+        assert all(item["status"] == 200 for item in items)
+        assert "a@test.com" not in items[0]["result"]["masked_text"]
+        assert items[1]["result"]["audit"]["total_found"] == 0
+
+    def test_result_matches_single_file_response(self, client):
+        single = client.post(
+            "/redaction/regex", files={"file": ("a.txt", b"email a@test.com", "text/plain")}
+        ).json()
+        (item,) = _lines(
+            client.post("/redaction/batch/regex", files=[("files", ("a.txt", b"email a@test.com", "text/plain"))])
+        )
+        assert set(item["result"]) == set(single)
+        assert item["result"]["audit"] == single["audit"]
+
+    def test_results_restorable(self, client):
+        (item,) = _lines(
+            client.post("/redaction/batch/regex", files=[("files", ("a.txt", b"email a@test.com", "text/plain"))])
+        )
+        restored = client.post(f"/restore/{item['result']['doc_id']}", headers={"X-ADMIN-KEY": "changeme"})
+        assert restored.json()["restored_text"] == "email a@test.com"
+
+    def test_zip_members_expanded(self, client):
+        archive = _zip({"docs/one.txt": b"010-1234-5678", "docs/two.txt": b"user@test.com", "docs/": b""})
+        resp = client.post("/redaction/batch/regex", files=[("files", ("bundle.zip", archive, "application/zip"))])
+        items = _lines(resp)
+        assert sorted(item["filename"] for item in items) == ["docs/one.txt", "docs/two.txt"]
+        assert all(item["result"]["audit"]["total_found"] == 1 for item in items)
+
+    def test_pdf_in_batch(self, client):
+        pdf = Path(__file__).resolve().parent.parent / "samples" / "contract_ko.pdf"
+        (item,) = _lines(
+            client.post("/redaction/batch/regex", files=[("files", ("c.pdf", pdf.read_bytes(), "application/pdf"))])
+        )
+        assert item["status"] == 200
+        assert item["result"]["audit"]["spans"][0]["page"] >= 1
+
+    def test_per_file_error_does_not_fail_batch(self, client):
+        resp = client.post(
+            "/redaction/batch/regex",
+            files=[
+                ("files", ("empty.pdf", b"%PDF-1.4 broken", "application/pdf")),
+                ("files", ("ok.txt", b"user@test.com", "text/plain")),
+            ],
+        )
+        assert resp.status_code == 200
+        by_name = {item["filename"]: item for item in _lines(resp)}
+        assert by_name["ok.txt"]["status"] == 200
+        assert by_name["empty.pdf"]["status"] >= 400
+        assert by_name["empty.pdf"]["result"] is None
+        assert by_name["empty.pdf"]["error"]
+
+    def test_oversized_file_413_item(self, client):
+        with patch("app.ingest.settings.MAX_UPLOAD_BYTES", 10):
+            (item,) = _lines(
+                client.post("/redaction/batch/regex", files=[("files", ("big.txt", b"x" * 100, "text/plain"))])
+            )
+        assert item["status"] == 413
+
+
+class TestBatchValidation:
+    def test_invalid_model_400(self, client):
+        resp = client.post("/redaction/batch/nope", files=[("files", ("a.txt", b"x", "text/plain"))])
+        assert resp.status_code == 400
+
+    def test_llm_disabled_403(self, client):
+        with patch("app.routes.redaction.settings") as mock_settings:
+            mock_settings.ALLOW_REMOTE_LLM = False
+            resp = client.post("/redaction/batch/hybrid", files=[("files", ("a.txt", b"x", "text/plain"))])
+        assert resp.status_code == 403
+
+    def test_bad_zip_400(self, client):
+        resp = client.post("/redaction/batch/regex", files=[("files", ("a.zip", b"not a zip", "application/zip"))])
+        assert resp.status_code == 400
+
+    def test_too_many_files_400(self, client):
+        archive = _zip({f"{i}.txt": b"x" for i in range(5)})
+        with patch("app.routes.batch_redaction.settings.BATCH_MAX_FILES", 3):
+            resp = client.post("/redaction/batch/regex", files=[("files", ("a.zip", archive, "application/zip"))])
+        assert resp.status_code == 400
+
+    def test_no_files_422(self, client):
+        assert client.post("/redaction/batch/regex").status_code == 422
+
+
+class TestBatchConcurrency:
+    def test_bounded_concurrency_and_completion_order(self, client):
+        in_flight = 0
+        peak = 0
+        original = redaction.redact_spooled
+
+        async def slow(model, spool, size, digest, filename, *args):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            # The first file finishes last
+            await asyncio.sleep(0.2 if filename == "0.txt" else 0.01)
+            in_flight -= 1
+            return await original(model, spool, size, digest, filename, *args)
+
+        files = [("files", (f"{i}.txt", f"user{i}@test.com".encode(), "text/plain")) for i in range(6)]
+        with (
+            patch("app.routes.batch_redaction.redact_spooled", side_effect=slow),
+            patch("app.routes.batch_redaction.settings.BATCH_CONCURRENCY", 2),
+        ):
+            items = _lines(client.post("/redaction/batch/regex", files=files))
+        assert len(items) == 6
+        assert peak == 2
+        assert items[-1]["filename"] == "0.txt"
+        assert sorted(item["index"] for item in items) == list(range(6))
@@ -70,3 +70,21 @@ class TestChat:
     def test_invalid_body_422(self, client):
         resp = client.post("/chat", json={"wrong_field": "value"})
         assert resp.status_code == 422
+
+    def test_evicted_doc_410(self, client):
+        from app import storage
+        from app.schemas import Audit
+
+        audit = Audit(spans=[], total_found=0, sources_used=["regex"])
+        doc_id = storage.store("masked", audit)
+        with patch.object(storage.backend, "max_bytes", 1):
+            storage.store("newer", audit)
+
+        with (
+            patch("app.routes.chat.settings") as mock_settings,
+            patch("app.routes.chat.genai.Client") as mock_client,
+        ):
+            mock_settings.GEMINI_API_KEY = "test-key"
+            resp = client.post("/chat", json={"message": "hello", "doc_id": doc_id})
+        assert resp.status_code == 410
+        mock_client.return_value.models.generate_content.assert_not_called()
@@ -0,0 +1,46 @@
+"""Tests for POST /redaction/csv."""
+
+import csv
+import io
+import json
+
+
+def _post(client, content: bytes, **params):
+    return client.post(
+        "/redaction/csv",
+        files={"file": ("customers.csv", content, "text/csv")},
+        params=params,
+    )
+
+
+class TestCsvRedaction:
+    def test_streams_masked_csv(self, client):
+        resp = _post(
+            client,
+            "name,email\n홍길동,hong@example.com\n".encode(),
+            rules=json.dumps({"name": "skip"}),
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/csv")
+        assert 'filename="customers_masked.csv"' in resp.headers["content-disposition"]
+        rows = list(csv.reader(io.StringIO(resp.text)))
+        assert rows[1][0] == "홍길동"
+        assert rows[1][1].startswith("[[PII:EMAIL:")
+
+    def test_cp949_input(self, client):
+        resp = _post(client, "이름,메모\n김철수,연락처 010-1234-5678\n".encode("cp949"))
+        rows = list(csv.reader(io.StringIO(resp.text)))
+        assert rows[0] == ["이름", "메모"]
+        assert rows[1][1].startswith("연락처 [[PII:PHONE_KR:")
+
+    def test_invalid_rules_400(self, client):
+        assert _post(client, b"a\n1\n", rules="{bad").status_code == 400
+
+    def test_unknown_column_400(self, client):
+        resp = _post(client, b"a\n1\n", rules=json.dumps({"b": "mask"}))
+        assert resp.status_code == 400
+        assert "unknown columns" in resp.json()["detail"]
+
+    def test_not_routed_as_model(self, client):
+        # /redaction/csv must not fall through to /redaction/{model}
+        assert _post(client, b"a\n1\n").status_code == 200
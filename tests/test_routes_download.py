@@ -1,7 +1,17 @@
 """Tests for GET /download/{doc_id}."""
 
+import gzip
+import hashlib
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
 from app import storage
-from app.schemas import Audit
+from app.routes.download import negotiate_encoding, parse_range
+from app.schemas import Audit, Span
+
+_LARGE = "마스킹된 계약서 본문 [[PII:EMAIL:abcd1234]]\n" * 2_000
 
 
 def _store_doc(masked="masked text", envelope="enc"):
@@ -17,6 +27,14 @@ class TestDownloadMasked:
         assert resp.text == "hello masked"
         assert "text/plain" in resp.headers["content-type"]
 
+    def test_streams_large_document(self, client):
+        text = "마스킹된 계약서 본문 [[PII:EMAIL:abcd1234]]\n" * 20_000
+        doc_id = _store_doc(masked=text)
+        resp = client.get(f"/download/{doc_id}?format=masked", headers={"Accept-Encoding": "identity"})
+        assert resp.status_code == 200
+        assert resp.text == text
+        assert resp.headers["content-length"] == str(len(text.encode()))
+
     def test_content_disposition(self, client):
         doc_id = _store_doc()
         resp = client.get(f"/download/{doc_id}?format=masked")
@@ -32,12 +50,157 @@ class TestDownloadAudit:
         assert "total_found" in data
         assert "application/json" in resp.headers["content-type"]
 
+    def test_audit_sent_without_hydrating(self, client):
+        audit = Audit(
+            spans=[Span(start=0, end=3, type="PERSON", text="홍길동", source="ner", page=2)],
+            total_found=1,
+            sources_used=["ner"],
+        )
+        doc_id = storage.store("[[PII:PERSON:abcd1234]]", audit)
+        with patch("app.storage.Audit.model_validate_json") as hydrate:
+            resp = client.get(f"/download/{doc_id}?format=audit")
+        hydrate.assert_not_called()
+        assert Audit.model_validate(resp.json()) == audit
+
     def test_audit_content_disposition(self, client):
         doc_id = _store_doc()
         resp = client.get(f"/download/{doc_id}?format=audit")
         assert f"{doc_id}_audit.json" in resp.headers["content-disposition"]
 
 
+class TestCompression:
+    def test_gzip_when_accepted(self, client):
+        doc_id = _store_doc(masked=_LARGE)
+        resp = client.get(f"/download/{doc_id}", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert "content-length" not in resp.headers
+        assert resp.headers["vary"] == "Accept-Encoding"
+        assert resp.text == _LARGE  # httpx decodes gzip transparently
+
+    def test_body_is_smaller_on_the_wire(self, client):
+        doc_id = _store_doc(masked=_LARGE)
+        with client.stream("GET", f"/download/{doc_id}", headers={"Accept-Encoding": "gzip"}) as resp:
+            wire = b"".join(resp.iter_raw())
+        assert gzip.decompress(wire).decode() == _LARGE
+        assert len(wire) < len(_LARGE.encode()) / 10
+
+    def test_small_bodies_not_compressed(self, client):
+        doc_id = _store_doc(masked="tiny")
+        resp = client.get(f"/download/{doc_id}", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in resp.headers
+        assert resp.headers["content-length"] == "4"
+
+    def test_audit_compressed_too(self, client):
+        with patch("app.routes.download.settings.DOWNLOAD_COMPRESS_MIN_BYTES", 1):
+            doc_id = _store_doc()
+            resp = client.get(f"/download/{doc_id}?format=audit", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.json()["total_found"] == 0
+
+    def test_negotiation(self):
+        assert negotiate_encoding("") is None
+        assert negotiate_encoding("identity") is None
+        assert negotiate_encoding("deflate, gzip;q=0.5") == "gzip"
+        assert negotiate_encoding("gzip;q=0") is None
+        assert negotiate_encoding("*") in ("gzip", "br")
+
+    def test_br_offered_only_when_installed(self):
+        with patch("app.routes.download.brotli", None):
+            assert negotiate_encoding("br") is None
+            assert negotiate_encoding("br, gzip") == "gzip"
+
+
+class TestConditionalGet:
+    def test_strong_etag_from_content(self, client):
+        doc_id = _store_doc(masked="hello masked")
+        resp = client.get(f"/download/{doc_id}", headers={"Accept-Encoding": "identity"})
+        assert resp.headers["etag"] == f'"{hashlib.sha256(b"hello masked").hexdigest()}"'
+
+    def test_if_none_match_304(self, client):
+        doc_id = _store_doc(masked=_LARGE)
+        etag = client.get(f"/download/{doc_id}").headers["etag"]
+        with patch("app.routes.download.iter_masked_bytes") as inflate:
+            resp = client.get(f"/download/{doc_id}", headers={"If-None-Match": etag})
+        inflate.assert_not_called()
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+
+    def test_etag_differs_per_encoding(self, client):
+        doc_id = _store_doc(masked=_LARGE)
+        plain = client.get(f"/download/{doc_id}", headers={"Accept-Encoding": "identity"}).headers["etag"]
+        zipped = client.get(f"/download/{doc_id}", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        assert plain != zipped
+        resp = client.get(f"/download/{doc_id}", headers={"Accept-Encoding": "gzip", "If-None-Match": plain})
+        assert resp.status_code == 200
+
+    def test_stale_etag_gets_body(self, client):
+        doc_id = _store_doc(masked="hello masked")
+        resp = client.get(f"/download/{doc_id}", headers={"If-None-Match": '"stale"'})
+        assert resp.status_code == 200
+        assert resp.text == "hello masked"
+
+    def test_audit_304(self, client):
+        doc_id = _store_doc()
+        etag = client.get(f"/download/{doc_id}?format=audit").headers["etag"]
+        assert client.get(f"/download/{doc_id}?format=audit", headers={"If-None-Match": etag}).status_code == 304
+
+
+class TestRange:
+    def test_partial_content(self, client):
+        doc_id = _store_doc(masked=_LARGE)
+        raw = _LARGE.encode()
+        resp = client.get(f"/download/{doc_id}", headers={"Range": "bytes=100000-100099", "Accept-Encoding": "gzip"})
+        assert resp.status_code == 206
+        assert resp.content == raw[100000:100100]
+        assert resp.headers["content-range"] == f"bytes 100000-100099/{len(raw)}"
+        assert "content-encoding" not in resp.headers
+
+    def test_suffix_range(self, client):
+        doc_id = _store_doc(masked=_LARGE)
+        resp = client.get(f"/download/{doc_id}", headers={"Range": "bytes=-10"})
+        assert resp.status_code == 206
+        assert resp.content == _LARGE.encode()[-10:]
+
+    def test_unsatisfiable_416(self, client):
+        doc_id = _store_doc(masked="short")
+        resp = client.get(f"/download/{doc_id}", headers={"Range": "bytes=100-"})
+        assert resp.status_code == 416
+        assert resp.headers["content-range"] == "bytes */5"
+
+    def test_if_range_mismatch_sends_whole_body(self, client):
+        doc_id = _store_doc(masked="hello masked")
+        resp = client.get(
+            f"/download/{doc_id}",
+            headers={"Range": "bytes=0-4", "If-Range": '"old"', "Accept-Encoding": "identity"},
+        )
+        assert resp.status_code == 200
+        assert resp.text == "hello masked"
+
+    def test_parse_range(self):
+        assert parse_range("bytes=0-9", 100) == (0, 10)
+        assert parse_range("bytes=90-", 100) == (90, 100)
+        assert parse_range("bytes=-5", 100) == (95, 100)
+        assert parse_range("bytes=50-500", 100) == (50, 100)
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        assert parse_range("items=0-1", 100) is None
+        assert parse_range("bytes=9-0", 100) is None
+        with pytest.raises(HTTPException):
+            parse_range("bytes=100-", 100)
+
+    def test_reversed_range_sends_whole_body(self, client):
+        doc_id = _store_doc(masked="hello masked")
+        resp = client.get(f"/download/{doc_id}", headers={"Range": "bytes=9-0", "Accept-Encoding": "identity"})
+        assert resp.status_code == 200
+        assert resp.text == "hello masked"
+
+    def test_if_none_match_checked_before_416(self, client):
+        doc_id = _store_doc(masked="short")
+        etag = client.get(f"/download/{doc_id}", headers={"Accept-Encoding": "identity"}).headers["etag"]
+        resp = client.get(f"/download/{doc_id}", headers={"Range": "bytes=100-", "If-None-Match": etag})
+        assert resp.status_code == 304
+
+
 class TestDownloadErrors:
     def test_invalid_format(self, client):
         doc_id = _store_doc()
@@ -48,6 +211,13 @@ class TestDownloadErrors:
         resp = client.get("/download/nonexistent1?format=masked")
         assert resp.status_code == 404
 
+    def test_evicted_doc_410(self, client):
+        doc_id = _store_doc()
+        with patch.object(storage.backend, "max_bytes", 1):
+            _store_doc()
+        resp = client.get(f"/download/{doc_id}?format=masked")
+        assert resp.status_code == 410
+
     def test_default_format_is_masked(self, client):
         doc_id = _store_doc(masked="default test")
         resp = client.get(f"/download/{doc_id}")
@@ -0,0 +1,150 @@
+"""Tests for the /jobs endpoints."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+from app import jobs
+from app.jobs import JobQueue
+from app.routes import redaction
+
+
+def _wait(client, job_id: str, *states: str) -> dict:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        status = client.get(f"/jobs/{job_id}").json()
+        if status["state"] in states:
+            return status
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {status['state']}")
+
+
+def _submit(client, data: bytes = b"email a@test.com", filename: str = "a.txt", **params):
+    return client.post("/jobs/regex", params=params, files={"file": (filename, data, "text/plain")})
+
+
+class TestSubmit:
+    def test_returns_202_with_job_id(self, client):
+        resp = _submit(client)
+        assert resp.status_code == 202
+        body = resp.json()
+        assert resp.headers["location"] == f"/jobs/{body['job_id']}"
+        assert body["model"] == "regex"
+        assert body["filename"] == "a.txt"
+
+    def test_invalid_model(self, client):
+        resp = client.post("/jobs/bogus", files={"file": ("a.txt", b"x", "text/plain")})
+        assert resp.status_code == 400
+
+    def test_queue_full(self, client):
+        # No workers, so the first job stays queued and fills the queue
+        with patch("app.jobs.queue", JobQueue(workers=0, max_queued=1, retain_sec=60)):
+            assert _submit(client).status_code == 202
+            resp = _submit(client)
+        assert resp.status_code == 503
+        assert "retry-after" in resp.headers
+
+
+class TestStatusAndResult:
+    def test_result_matches_single_file_response(self, client):
+        job_id = _submit(client).json()["job_id"]
+        status = _wait(client, job_id, "done")
+        assert status["progress"]["stage"] == "done"
+        assert status["progress"]["detectors_done"] == ["regex"]
+        result = client.get(f"/jobs/{job_id}/result")
+        assert result.status_code == 200
+        body = result.json()
+        assert body["doc_id"] == status["doc_id"]
+        assert "a@test.com" not in body["masked_text"]
+        single = client.post("/redaction/regex", files={"file": ("a.txt", b"email a@test.com", "text/plain")}).json()
+        assert set(body) == set(single)
+        assert body["audit"] == single["audit"]
+
+    def test_result_restorable(self, client):
+        job_id = _submit(client).json()["job_id"]
+        doc_id = _wait(client, job_id, "done")["doc_id"]
+        restored = client.post(f"/restore/{doc_id}", headers={"X-ADMIN-KEY": "changeme"})
+        assert restored.json()["restored_text"] == "email a@test.com"
+
+    def test_include_envelope(self, client):
+        job_id = _submit(client, include_envelope="true").json()["job_id"]
+        _wait(client, job_id, "done")
+        assert client.get(f"/jobs/{job_id}/result").json()["envelope"]["token_map"]
+
+    def test_job_does_not_retain_plaintext_envelope(self, client):
+        job_id = _submit(client, include_envelope="true").json()["job_id"]
+        _wait(client, job_id, "done")
+        job = jobs.queue.get(job_id)
+        assert "a@test.com" not in repr(job.result)
+
+    def test_include_envelope_requires_stored_envelope(self, client):
+        resp = _submit(client, include_envelope="true", store_envelope="false")
+        assert resp.status_code == 400
+
+    def test_pdf_page_progress(self, client):
+        page = MagicMock()
+        page.extract_text.return_value = "010-1234-5678"
+        reader = MagicMock()
+        reader.pages = [page, page, page]
+        with patch("app.ingest.PdfReader", return_value=reader):
+            job_id = client.post(
+                "/jobs/regex", files={"file": ("s.pdf", b"%PDF" + b"0" * 64, "application/pdf")}
+            ).json()["job_id"]
+            progress = _wait(client, job_id, "done")["progress"]
+        assert progress["pages_total"] == 3
+        assert progress["pages_extracted"] == 3
+
+    def test_failed_job_reports_error_status(self, client):
+        with patch("app.ingest.settings.MAX_UPLOAD_BYTES", 10):
+            resp = _submit(client, data=b"x" * 100)
+        # Oversized uploads are rejected while spooling, before a job exists
+        assert resp.status_code == 413
+
+    def test_pipeline_error_surfaces_on_result(self, client):
+        with patch.object(redaction, "read_document", side_effect=RuntimeError("boom")):
+            job_id = _submit(client).json()["job_id"]
+            status = _wait(client, job_id, "failed")
+        assert status["error"] == "Internal error"
+        assert client.get(f"/jobs/{job_id}/result").status_code == 500
+
+    def test_unknown_job(self, client):
+        assert client.get("/jobs/nope").status_code == 404
+        assert client.get("/jobs/nope/result").status_code == 404
+        assert client.delete("/jobs/nope").status_code == 404
+
+    def test_expired_document(self, client):
+        import app.storage as _st
+
+        job_id = _submit(client).json()["job_id"]
+        _wait(client, job_id, "done")
+        _st.backend.clear()
+        assert client.get(f"/jobs/{job_id}/result").status_code == 404
+
+
+class TestCancel:
+    def test_cancel_running_job(self, client):
+        async def hang(*args, **kwargs):
+            await asyncio.Event().wait()
+
+        with patch.object(redaction, "read_document", side_effect=hang):
+            job_id = _submit(client).json()["job_id"]
+            _wait(client, job_id, "running")
+            resp = client.delete(f"/jobs/{job_id}")
+            assert resp.status_code == 200
+            status = _wait(client, job_id, "cancelled")
+        assert status["finished_at"] is not None
+        assert client.get(f"/jobs/{job_id}/result").status_code == 409
+
+    def test_cancel_finished_job_conflicts(self, client):
+        job_id = _submit(client).json()["job_id"]
+        _wait(client, job_id, "done")
+        assert client.delete(f"/jobs/{job_id}").status_code == 409
+
+
+class TestMetrics:
+    def test_jobs_in_metrics(self, client):
+        job_id = _submit(client).json()["job_id"]
+        _wait(client, job_id, "done")
+        stats = client.get("/metrics").json()["jobs"]
+        assert stats["done"] >= 1
+        assert {"queued", "running", "p95_latency_ms", "p95_wait_ms"} <= set(stats)
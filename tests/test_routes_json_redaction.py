@@ -0,0 +1,46 @@
+"""Tests for POST /redaction/json."""
+
+import json
+
+from app.masker import decrypt_envelope, restore_text
+
+DOC = {"users": [{"name": "홍길동", "email": "hong@example.com", "phone": "010-1234-5678"}]}
+
+
+def _post(client, content: bytes, **params):
+    return client.post(
+        "/redaction/json",
+        files={"file": ("payload.json", content, "application/json")},
+        params=params,
+    )
+
+
+class TestJsonRedaction:
+    def test_masks_string_leaves(self, client):
+        resp = _post(client, json.dumps(DOC, ensure_ascii=False).encode())
+        assert resp.status_code == 200
+        assert 'filename="payload_masked.json"' in resp.headers["content-disposition"]
+        user = resp.json()["users"][0]
+        assert user["email"].startswith("[[PII:EMAIL:")
+        assert user["phone"].startswith("[[PII:PHONE_KR:")
+
+    def test_exclude_rule(self, client):
+        resp = _post(client, json.dumps(DOC).encode(), exclude=["$..phone"])
+        assert resp.json()["users"][0]["phone"] == "010-1234-5678"
+
+    def test_envelope_restores_original(self, client):
+        resp = _post(client, json.dumps(DOC).encode(), include_envelope="true")
+        wrapped = resp.json()
+        token_map = decrypt_envelope(wrapped["envelope_encrypted"]).token_map
+        masked = json.dumps(wrapped["doc"])
+        assert json.loads(restore_text(masked, token_map)) == DOC
+
+    def test_malformed_json_400(self, client):
+        resp = _post(client, b'{"a": [1, 2}')
+        assert resp.status_code == 400
+
+    def test_invalid_rule_400(self, client):
+        assert _post(client, b"{}", include=["users"]).status_code == 400
+
+    def test_llm_model_rejected(self, client):
+        assert _post(client, b"{}", model="gemini").status_code == 400
@@ -1,10 +1,13 @@
 """Tests for POST /redaction/{model}."""
 
 import json
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from app import llm_guard
+
 
 class TestModelValidation:
     def test_invalid_model(self, client):
@@ -187,3 +190,126 @@ class TestE2E:
         )
         assert restore_resp.status_code == 200
         assert restore_resp.json()["restored_text"] == original
+
+
+class TestLLMDegradation:
+    def test_hybrid_records_llm_skipped(self, client):
+        async def skipped(text, pre_masked_spans=None):
+            return None
+
+        with (
+            patch("app.routes.redaction.settings") as mock_settings,
+            patch("app.detection.llm_guard.detect", side_effect=skipped),
+        ):
+            mock_settings.ALLOW_REMOTE_LLM = True
+            resp = client.post(
+                "/redaction/hybrid",
+                files={"file": ("test.txt", "email user@test.com".encode(), "text/plain")},
+            )
+        data = resp.json()
+        assert resp.status_code == 200
+        assert "llm_skipped" in data["audit"]["sources_used"]
+        assert "llm" not in data["audit"]["sources_used"]
+        assert data["audit"]["total_found"] == 1
+
+
+class TestPageAttribution:
+    def test_pdf_spans_carry_page_numbers(self, client):
+        pdf = Path(__file__).resolve().parent.parent / "samples" / "contract_ko.pdf"
+        resp = client.post(
+            "/redaction/regex",
+            files={"file": ("contract_ko.pdf", pdf.read_bytes(), "application/pdf")},
+        )
+        assert resp.status_code == 200
+        pages = {s["page"] for s in resp.json()["audit"]["spans"]}
+        assert None not in pages
+        assert min(pages) == 1
+        assert max(pages) > 1
+
+    def test_txt_spans_have_no_page(self, client):
+        resp = client.post(
+            "/redaction/regex",
+            files={"file": ("test.txt", b"user@test.com", "text/plain")},
+        )
+        assert resp.json()["audit"]["spans"][0]["page"] is None
+
+
+class TestResultCache:
+    def _post(self, client, model="regex", content=b"email user@test.com"):
+        return client.post(
+            f"/redaction/{model}",
+            files={"file": ("test.txt", content, "text/plain")},
+            params={"include_envelope": "true"},
+        )
+
+    def test_repeat_upload_hits_cache(self, client):
+        first = self._post(client).json()
+        with patch("app.routes.redaction.read_document") as mock_read:
+            second = self._post(client).json()
+        mock_read.assert_not_called()
+        assert first["cache_hit"] is False
+        assert second["cache_hit"] is True
+        assert second["audit"] == first["audit"]
+
+    def test_cache_hit_uses_fresh_tokens(self, client):
+        first = self._post(client).json()
+        second = self._post(client).json()
+        assert second["cache_hit"] is True
+        assert second["doc_id"] != first["doc_id"]
+        assert set(first["envelope"]["token_map"]).isdisjoint(second["envelope"]["token_map"])
+        assert list(second["envelope"]["token_map"].values()) == ["user@test.com"]
+
+    def test_cache_keyed_by_model(self, client):
+        self._post(client, model="regex")
+        assert self._post(client, model="ner").json()["cache_hit"] is False
+        assert self._post(client, model="ner").json()["cache_hit"] is True
+
+    def test_cache_keyed_by_document_kind(self, client):
+        content = b"email user@test.com"
+        self._post(client, content=content)
+        page = MagicMock()
+        page.extract_text.return_value = "pdf email pdf@test.com"
+        reader = MagicMock()
+        reader.pages = [page]
+        with patch("app.ingest.PdfReader", return_value=reader):
+            resp = client.post("/redaction/regex", files={"file": ("test.pdf", content, "application/pdf")})
+        assert resp.json()["cache_hit"] is False
+        assert resp.json()["audit"]["spans"][0]["page"] == 1
+
+    def test_different_content_misses(self, client):
+        self._post(client)
+        assert self._post(client, content=b"email other@test.com").json()["cache_hit"] is False
+
+    def test_degraded_llm_result_not_cached(self, client):
+        async def skipped(text, pre_masked_spans=None):
+            return None
+
+        with (
+            patch("app.routes.redaction.settings") as mock_settings,
+            patch("app.detection.llm_guard.detect", side_effect=skipped),
+        ):
+            mock_settings.ALLOW_REMOTE_LLM = True
+            self._post(client, model="hybrid")
+            resp = self._post(client, model="hybrid")
+        assert resp.json()["cache_hit"] is False
+
+    def test_partial_llm_result_not_cached(self, client):
+        async def partial(text, pre_masked_spans=None):
+            return llm_guard.PartialSpans()
+
+        with (
+            patch("app.routes.redaction.settings") as mock_settings,
+            patch("app.detection.llm_guard.detect", side_effect=partial),
+        ):
+            mock_settings.ALLOW_REMOTE_LLM = True
+            self._post(client, model="gemini")
+            resp = self._post(client, model="gemini")
+        assert resp.json()["audit"]["sources_used"] == ["llm_partial"]
+        assert resp.json()["cache_hit"] is False
+
+    def test_metrics_report_cache(self, client):
+        self._post(client)
+        self._post(client)
+        stats = client.get("/metrics").json()["result_cache"]
+        assert stats["entries"] == 1
+        assert stats["hits"] >= 1
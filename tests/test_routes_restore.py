@@ -1,5 +1,7 @@
 """Tests for POST /restore/{doc_id}."""
 
+from unittest.mock import patch
+
 from app import storage
 from app.masker import encrypt_envelope, mask_text
 from app.schemas import Audit, Envelope, Span
@@ -45,6 +47,16 @@ class TestRestore:
         )
         assert resp.status_code == 404
 
+    def test_evicted_doc_410(self, client):
+        doc_id = _store_with_envelope()
+        with patch.object(storage.backend, "max_bytes", 1):
+            _store_with_envelope()
+        resp = client.post(
+            f"/restore/{doc_id}",
+            headers={"X-ADMIN-KEY": "changeme"},
+        )
+        assert resp.status_code == 410
+
     def test_no_envelope_stored(self, client):
         audit = Audit(spans=[], total_found=0, sources_used=["regex"])
         doc_id = storage.store("masked text", audit, None)
@@ -0,0 +1,157 @@
+"""Tests for POST /redaction/stream/{model}."""
+
+import asyncio
+import json
+import tempfile
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.routes import redaction
+from app.routes.stream_redaction import iter_text_pieces, redact_stream
+
+
+def _events(resp) -> list[dict]:
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def _post(client, data: bytes = b"email a@test.com", filename: str = "a.txt", model: str = "regex", **params):
+    return client.post(f"/redaction/stream/{model}", params=params, files={"file": (filename, data, "text/plain")})
+
+
+class TestStreamRedaction:
+    def test_event_order(self, client):
+        resp = _post(client)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        kinds = [event["event"] for event in _events(resp)]
+        assert kinds[0] == "progress"
+        assert kinds[-1] == "result"
+        assert "text" in kinds
+        assert kinds.index("text") > max(i for i, k in enumerate(kinds) if k == "progress")
+
+    def test_matches_plain_endpoint(self, client):
+        events = _events(_post(client))
+        single = client.post("/redaction/regex", files={"file": ("a.txt", b"email a@test.com", "text/plain")}).json()
+        masked = "".join(event["text"] for event in events if event["event"] == "text")
+        result = events[-1]
+        assert "a@test.com" not in masked
+        assert masked.startswith("email [[PII:EMAIL:")
+        assert result["audit"] == single["audit"]
+        assert client.get(f"/download/{result['doc_id']}").text == masked
+
+    def test_include_envelope(self, client):
+        result = _events(_post(client, include_envelope="true"))[-1]
+        assert list(result["envelope"]["token_map"].values()) == ["a@test.com"]
+
+    def test_progress_reports_pages_and_detectors(self, client):
+        page = MagicMock()
+        page.extract_text.return_value = "010-1234-5678"
+        reader = MagicMock()
+        reader.pages = [page, page]
+        with patch("app.ingest.PdfReader", return_value=reader):
+            events = _events(_post(client, data=b"%PDF" + b"0" * 64, filename="s.pdf"))
+        last = [event["progress"] for event in events if event["event"] == "progress"][-1]
+        assert last["pages_total"] == 2
+        assert last["pages_extracted"] == 2
+        assert last["detectors_done"] == ["regex"]
+
+    def test_progress_streamed_while_running(self, client):
+        async def slow(*args, **kwargs):
+            progress = args[3]
+            progress.stage = "extracting"
+            await asyncio.sleep(0.1)
+            progress.pages_total = 3
+            await asyncio.sleep(0.1)
+            return await original(*args, **kwargs)
+
+        original = redaction.read_document
+        with (
+            patch("app.routes.stream_redaction.settings.STREAM_PROGRESS_INTERVAL_MS", 20),
+            patch.object(redaction, "read_document", side_effect=slow),
+        ):
+            events = _events(_post(client))
+        stages = [event["progress"]["stage"] for event in events if event["event"] == "progress"]
+        assert stages[0] == "extracting"
+        assert len(stages) >= 2
+
+    def test_pipeline_error_becomes_event(self, client):
+        with patch.object(redaction, "read_document", side_effect=RuntimeError("boom")):
+            events = _events(_post(client))
+        assert events[-1] == {"event": "error", "status": 500, "error": "Internal error"}
+
+    def test_http_error_keeps_status(self, client):
+        page = MagicMock()
+        page.extract_text.return_value = ""
+        reader = MagicMock()
+        reader.pages = [page]
+        with patch("app.ingest.PdfReader", return_value=reader):
+            events = _events(_post(client, data=b"%PDF" + b"0" * 64, filename="empty.pdf"))
+        assert events[-1]["event"] == "error"
+        assert events[-1]["status"] == 400
+
+    def test_invalid_model_rejected_before_stream(self, client):
+        resp = _post(client, model="bogus")
+        assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+class TestSpoolLifetime:
+    async def _spool(self):
+        spool = tempfile.SpooledTemporaryFile()
+        spool.write(b"email a@test.com")
+
+        async def fake_spool_upload(file):
+            return spool, 16, "0" * 64
+
+        return spool, fake_spool_upload
+
+    async def test_spool_closed_when_body_never_iterated(self):
+        spool, fake = await self._spool()
+        with patch("app.routes.stream_redaction.spool_upload", side_effect=fake):
+            await redact_stream("regex", file=MagicMock(filename="a.txt"), store_envelope=True, include_envelope=False)
+            for _ in range(200):
+                if spool.closed:
+                    break
+                await asyncio.sleep(0.01)
+        assert spool.closed
+
+    async def test_spool_closed_when_cancelled_before_start(self):
+        spool, fake = await self._spool()
+        tasks = []
+        real_ensure_future = asyncio.ensure_future
+
+        def ensure_future(coro):
+            tasks.append(real_ensure_future(coro))
+            return tasks[-1]
+
+        with (
+            patch("app.routes.stream_redaction.spool_upload", side_effect=fake),
+            patch("app.routes.stream_redaction.asyncio.ensure_future", side_effect=ensure_future),
+        ):
+            await redact_stream("regex", file=MagicMock(filename="a.txt"), store_envelope=True, include_envelope=False)
+        (task,) = tasks
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        assert spool.closed
+
+
+class TestTextPieces:
+    def test_rejoins_to_original(self):
+        text = "line one\n" * 50 + "tail without newline"
+        assert "".join(iter_text_pieces(text, 32)) == text
+
+    def test_pieces_end_at_newlines(self):
+        pieces = list(iter_text_pieces("aaaa\nbbbb\ncccc\n", 7))
+        assert pieces == ["aaaa\n", "bbbb\n", "cccc\n"]
+
+    def test_tokens_never_split(self):
+        text = "x" * 10 + "[[PII:EMAIL:1a2b3c4d]]" + "y" * 10
+        pieces = list(iter_text_pieces(text, 16))
+        assert "".join(pieces) == text
+        assert any("[[PII:EMAIL:1a2b3c4d]]" in piece for piece in pieces)
+
+    def test_empty(self):
+        assert list(iter_text_pieces("", 16)) == []
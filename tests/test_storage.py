@@ -1,8 +1,17 @@
 """Tests for app.storage."""
 
+import asyncio
+import hashlib
+import multiprocessing
 import re
+import sqlite3
+import sys
+import time
+import zlib
 from unittest.mock import patch
 
+import pytest
+
 from app.schemas import Audit, Span
 from app import storage
 
@@ -67,3 +76,468 @@ class TestCleanup:
         storage.store("text", _make_audit())
         removed = storage.cleanup()
         assert removed == 0
+
+    def test_only_expired_entries_touched(self):
+        backend = storage.MemoryBackend(storage.OrderedDict())
+        with patch("app.storage.time.time", return_value=1000.0):
+            old = backend.store("old", _make_audit())
+        with patch("app.storage.time.time", return_value=5000.0):
+            fresh = [backend.store("fresh", _make_audit()) for _ in range(50)]
+        with (
+            patch("app.storage.time.time", return_value=1000.0 + storage.settings.DOC_TTL_SEC + 1),
+            patch("app.storage.heapq.heappop", wraps=storage.heapq.heappop) as pop,
+        ):
+            assert backend.cleanup() == 1
+            assert pop.call_count == 1
+            assert backend.get(old) is None
+            assert all(backend.get(doc_id) for doc_id in fresh)
+
+    def test_entry_dropped_by_get_not_counted(self):
+        backend = storage.MemoryBackend(storage.OrderedDict())
+        doc_id = backend.store("text", _make_audit())
+        created = backend.get(doc_id)["created_at"]
+        with patch("app.storage.time.time", return_value=created + 99999):
+            assert backend.get(doc_id) is None
+            assert backend.cleanup() == 0
+        assert backend.next_expiry() is None
+
+
+class TestByteBudget:
+    def _backend(self, max_bytes):
+        return storage.MemoryBackend(storage.OrderedDict(), max_bytes)
+
+    def test_bytes_accounted(self):
+        backend = self._backend(0)
+        backend.store("x" * 1000, _make_audit(), "e" * 100)
+        masked_blob, _, audit_blob, _, _ = storage._pack("x" * 1000, _make_audit())
+        expected = storage.entry_nbytes(masked_blob, audit_blob, "e" * 100)
+        assert backend.stats()["bytes"] == expected
+        assert expected > 100
+
+    def test_lru_evicted_past_budget(self):
+        masked_blob, _, audit_blob, _, _ = storage._pack("x" * 1000, _make_audit())
+        size = storage.entry_nbytes(masked_blob, audit_blob, None)
+        backend = self._backend(size * 3)
+        first, second, third = (backend.store("x" * 1000, _make_audit()) for _ in range(3))
+        assert backend.get(first) is not None  # first is now most recently used
+        fourth = backend.store("x" * 1000, _make_audit())
+        assert backend.get(second) is None
+        assert backend.is_evicted(second)
+        assert all(backend.get(d) for d in (first, third, fourth))
+        stats = backend.stats()
+        assert stats["entries"] == 3
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= stats["max_bytes"]
+
+    def test_newest_entry_kept_even_if_oversized(self):
+        backend = self._backend(100)
+        old = backend.store("small", _make_audit())
+        big = backend.store("x" * 10_000, _make_audit())
+        assert backend.get(big) is not None
+        assert backend.is_evicted(old)
+
+    def test_unknown_id_not_evicted(self):
+        assert not self._backend(100).is_evicted("nonexistent123")
+
+    def test_eviction_marker_dropped_at_ttl(self):
+        backend = self._backend(100)
+        old = backend.store("a", _make_audit())
+        backend.store("b", _make_audit())
+        with patch("app.storage.time.time", return_value=storage.time.time() + 99999):
+            backend.cleanup()
+        assert not backend.is_evicted(old)
+        assert backend.stats()["bytes"] == 0
+
+    def test_expired_get_releases_bytes(self):
+        backend = self._backend(0)
+        doc_id = backend.store("text", _make_audit())
+        created = backend.get(doc_id)["created_at"]
+        with patch("app.storage.time.time", return_value=created + 99999):
+            backend.get(doc_id)
+        assert backend.stats()["bytes"] == 0
+
+
+class TestCompression:
+    def test_memory_entry_stored_compressed(self):
+        text = "[[PII:EMAIL:abcd1234]] 계약 당사자는 아래 조항에 동의한다. " * 500
+        doc_id = storage.store(text, _make_audit())
+        raw = storage._store[doc_id]
+        assert "masked_text" not in raw
+        assert len(raw["masked_blob"]) < len(text.encode()) / 10
+        assert storage.get(doc_id)["masked_text"] == text
+        assert storage.get(doc_id)["masked_bytes"] == len(text.encode())
+
+    def test_audit_hydrated_on_access(self):
+        audit = Audit(
+            spans=[Span(start=0, end=5, type="EMAIL", text="a@b.c", source="regex")],
+            total_found=1,
+            sources_used=["regex"],
+        )
+        doc_id = storage.store("masked", audit)
+        with patch("app.storage.Audit.model_validate_json", wraps=Audit.model_validate_json) as hydrate:
+            entry = storage.get(doc_id)
+            hydrate.assert_not_called()
+            assert entry["audit"] == audit
+        hydrate.assert_called_once()
+
+    def test_audit_json_without_hydrating(self):
+        audit = Audit(
+            spans=[Span(start=0, end=3, type="PERSON", text="홍길동", source="ner")],
+            total_found=1,
+            sources_used=["ner"],
+        )
+        doc_id = storage.store("masked", audit)
+        with patch("app.storage.Audit.model_validate_json") as hydrate:
+            raw = storage.get(doc_id)["audit_json"]
+        hydrate.assert_not_called()
+        assert raw == audit.model_dump_json().encode()
+
+    def test_compress_level_configurable(self):
+        text = "".join(f"row {i} [[PII:PHONE_KR:{i:08x}]]\n" for i in range(2000))
+        with patch("app.storage.settings") as mock_settings:
+            mock_settings.STORAGE_COMPRESS_LEVEL = 1
+            fast = storage._pack(text, _make_audit())[0]
+            mock_settings.STORAGE_COMPRESS_LEVEL = 9
+            small = storage._pack(text, _make_audit())[0]
+        assert len(small) < len(fast)
+
+    def test_masked_sha256(self):
+        doc_id = storage.store("masked body", _make_audit())
+        assert storage.get(doc_id)["masked_sha256"] == hashlib.sha256(b"masked body").hexdigest()
+
+    def test_iter_masked_bytes_streams_in_chunks(self):
+        text = "가나다라 " * 100_000
+        doc_id = storage.store(text, _make_audit())
+        chunks = list(storage.iter_masked_bytes(doc_id))
+        assert len(chunks) > 1
+        assert max(len(c) for c in chunks) <= storage._INFLATE_CHUNK
+        assert b"".join(chunks).decode() == text
+
+    def test_stream_survives_expiry(self):
+        doc_id = storage.store("still here", _make_audit())
+        stream = storage.iter_masked_bytes(doc_id)
+        storage.backend.clear()
+        assert b"".join(stream) == "still here".encode()
+
+    def test_stats_report_ratio(self):
+        storage.store("반복 " * 10_000, _make_audit())
+        stats = storage.stats()
+        assert stats["raw_bytes"] > stats["bytes"]
+        assert stats["compression_ratio"] > 1
+        assert stats["bytes_per_doc"] == stats["bytes"]
+
+
+class TestTextCache:
+    def test_repeat_reads_hit_cache(self):
+        doc_id = storage.store("hello", _make_audit())
+        before = storage.text_cache.stats()
+        storage.get(doc_id)["masked_text"]
+        storage.get(doc_id)["masked_text"]
+        after = storage.text_cache.stats()
+        assert after["misses"] - before["misses"] == 1
+        assert after["hits"] - before["hits"] == 1
+
+    def test_lru_bounded(self):
+        cache = storage.TextCache(max_bytes=sys.getsizeof("x" * 100) * 2)
+        for doc_id in ("a", "b", "c"):
+            cache.load(doc_id, lambda: zlib.compress(b"x" * 100))
+        assert cache.stats()["entries"] == 2
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+    def test_oversized_text_not_cached(self):
+        cache = storage.TextCache(max_bytes=10)
+        assert cache.load("a", lambda: zlib.compress(b"x" * 100)) == "x" * 100
+        assert cache.stats()["entries"] == 0
+
+    def test_dropped_doc_leaves_cache(self):
+        doc_id = storage.store("text", _make_audit())
+        storage.get(doc_id)["masked_text"]
+        created = storage._store[doc_id]["created_at"]
+        with patch("app.storage.time.time", return_value=created + 99999):
+            storage.cleanup()
+        assert storage.text_cache.stats()["entries"] == 0
+
+
+class TestNextExpiry:
+    def test_empty_store(self):
+        assert storage.MemoryBackend(storage.OrderedDict()).next_expiry() is None
+
+    def test_oldest_deadline(self):
+        backend = storage.MemoryBackend(storage.OrderedDict())
+        with patch("app.storage.time.time", return_value=2000.0):
+            backend.store("b", _make_audit())
+        with patch("app.storage.time.time", return_value=1000.0):
+            backend.store("a", _make_audit())
+        assert backend.next_expiry() == 1000.0 + storage.settings.DOC_TTL_SEC
+
+
+class TestSqliteBackend:
+    @pytest.fixture()
+    def backend(self, tmp_path):
+        b = storage.SqliteBackend(str(tmp_path / "docs.sqlite3"))
+        yield b
+        b.close()
+
+    def _audit(self) -> Audit:
+        return Audit(
+            spans=[Span(start=0, end=5, type="EMAIL", text="a@b.c", source="regex", page=2)],
+            total_found=1,
+            sources_used=["regex"],
+        )
+
+    def test_store_get_roundtrip(self, backend):
+        doc_id = backend.store("마스킹된 문서 " * 100, self._audit(), "enc-data")
+        entry = backend.get(doc_id)
+        assert entry["masked_text"] == "마스킹된 문서 " * 100
+        assert entry["audit"] == self._audit()
+        assert entry["envelope_encrypted"] == "enc-data"
+        assert entry.get("missing") is None
+
+    def test_masked_sha256(self, backend):
+        doc_id = backend.store("마스킹", self._audit())
+        assert backend.get(doc_id)["masked_sha256"] == hashlib.sha256("마스킹".encode()).hexdigest()
+
+    def test_adds_digest_column_to_old_store(self, tmp_path):
+        path = str(tmp_path / "old.sqlite3")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE documents (doc_id TEXT PRIMARY KEY, created_at REAL NOT NULL, audit BLOB NOT NULL,"
+            " envelope_encrypted TEXT, masked_text BLOB NOT NULL, masked_bytes INTEGER NOT NULL,"
+            " raw_bytes INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO documents VALUES ('old', ?, ?, NULL, ?, 3, 3)",
+            (time.time(), zlib.compress(self._audit().model_dump_json().encode()), zlib.compress(b"abc")),
+        )
+        conn.commit()
+        conn.close()
+        backend = storage.SqliteBackend(path)
+        try:
+            assert backend.get("old")["masked_sha256"] is None
+            assert backend.get("old")["masked_text"] == "abc"
+            assert backend.get(backend.store("new", self._audit()))["masked_sha256"]
+        finally:
+            backend.close()
+
+    def test_migrates_uncompressed_store(self, tmp_path):
+        path = str(tmp_path / "old.sqlite3")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE documents (doc_id TEXT PRIMARY KEY, created_at REAL NOT NULL, audit TEXT NOT NULL,"
+            " envelope_encrypted TEXT, masked_text BLOB NOT NULL)"
+        )
+        conn.execute("CREATE INDEX documents_created_at ON documents (created_at)")
+        conn.execute(
+            "INSERT INTO documents VALUES ('old', ?, ?, 'enc', ?)",
+            (time.time(), self._audit().model_dump_json(), zlib.compress("마스킹".encode())),
+        )
+        conn.execute(
+            "INSERT INTO documents VALUES ('stale', 0, ?, NULL, ?)",
+            (self._audit().model_dump_json(), zlib.compress(b"x")),
+        )
+        conn.commit()
+        conn.close()
+        backend = storage.SqliteBackend(path)
+        try:
+            entry = backend.get("old")
+            assert entry["audit"] == self._audit()
+            assert entry["masked_text"] == "마스킹"
+            assert entry["masked_bytes"] == len("마스킹".encode())
+            assert entry["envelope_encrypted"] == "enc"
+            assert entry["masked_sha256"] == hashlib.sha256("마스킹".encode()).hexdigest()
+            assert backend.get("stale") is None
+            assert backend.get(backend.store("new", self._audit()))["audit"] == self._audit()
+        finally:
+            backend.close()
+        conn = sqlite3.connect(path)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        conn.close()
+        assert "documents_legacy" not in tables
+        assert "documents_created_at" in tables
+
+    def test_masked_text_compressed_at_rest(self, backend):
+        text = "[[PII:EMAIL:abcd1234]] 반복되는 문장입니다. " * 1000
+        doc_id = backend.store(text, self._audit())
+        (blob,) = backend._conn.execute(
+            "SELECT masked_text FROM documents WHERE doc_id = ?", (doc_id,)
+        ).fetchone()
+        assert len(blob) < len(text.encode()) / 10
+
+    def test_masked_text_read_lazily(self, backend):
+        doc_id = backend.store("hello", self._audit(), "enc")
+        with patch.object(backend, "read_masked_text", wraps=backend.read_masked_text) as read:
+            entry = backend.get(doc_id)
+            assert entry["envelope_encrypted"] == "enc"
+            read.assert_not_called()
+            assert entry["masked_text"] == "hello"
+            assert entry["masked_text"] == "hello"
+        read.assert_called_once_with(doc_id)
+
+    def test_wal_mode(self, backend):
+        (mode,) = backend._conn.execute("PRAGMA journal_mode").fetchone()
+        assert mode == "wal"
+
+    def test_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "docs.sqlite3")
+        first = storage.SqliteBackend(path)
+        doc_id = first.store("persisted", self._audit())
+        first.close()
+        second = storage.SqliteBackend(path)
+        assert second.get(doc_id)["masked_text"] == "persisted"
+        second.close()
+
+    def test_ttl_expired_returns_none_and_deletes(self, backend):
+        doc_id = backend.store("text", self._audit())
+        created = backend.get(doc_id)["created_at"]
+        with patch("app.storage.time.time", return_value=created + 99999):
+            assert backend.get(doc_id) is None
+        assert backend.get(doc_id) is None
+
+    def test_next_expiry(self, backend):
+        assert backend.next_expiry() is None
+        doc_id = backend.store("text", self._audit())
+        created = backend.get(doc_id)["created_at"]
+        assert backend.next_expiry() == created + storage.settings.DOC_TTL_SEC
+
+    def test_stats(self, backend):
+        backend.store("hello", self._audit(), "enc")
+        stats = backend.stats()
+        assert stats["backend"] == "sqlite"
+        assert stats["entries"] == 1
+        assert stats["bytes"] > 0
+
+    def test_cleanup_removes_expired(self, backend):
+        old = backend.store("old", self._audit())
+        created = backend.get(old)["created_at"]
+        with patch("app.storage.time.time", return_value=created + 99999):
+            fresh = backend.store("fresh", self._audit())
+            assert backend.cleanup() == 1
+            assert backend.get(fresh) is not None
+        assert backend.get(old) is None
+
+
+class TestBackendSelection:
+    def test_unknown_backend_rejected(self):
+        with patch("app.storage.settings") as mock_settings:
+            mock_settings.STORAGE_BACKEND = "redis"
+            with pytest.raises(ValueError):
+                storage._make_backend()
+
+    def test_module_functions_delegate(self, tmp_path):
+        sqlite_backend = storage.SqliteBackend(str(tmp_path / "docs.sqlite3"))
+        with patch("app.storage.backend", sqlite_backend):
+            doc_id = storage.store("via sqlite", _make_audit())
+            assert storage.get(doc_id)["masked_text"] == "via sqlite"
+        assert doc_id not in storage._store
+        sqlite_backend.close()
+
+
+
+@pytest.mark.asyncio
+class TestAsyncAccess:
+    async def test_sqlite_write_lock_does_not_block_loop(self, tmp_path):
+        path = str(tmp_path / "docs.sqlite3")
+        sqlite_backend = storage.SqliteBackend(path)
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")  # another worker holding the write lock
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        try:
+            with patch("app.storage.backend", sqlite_backend):
+                pending = asyncio.create_task(storage.store_async("locked out", _make_audit()))
+                await asyncio.sleep(0.3)
+                assert not pending.done()
+                assert ticks >= 10
+                other.execute("COMMIT")
+                doc_id = await pending
+                entry = await storage.get_async(doc_id, "masked_text")
+            assert entry["masked_text"] == "locked out"
+        finally:
+            ticking.cancel()
+            other.close()
+            sqlite_backend.close()
+
+    async def test_memory_backend_inline(self):
+        doc_id = await storage.store_async("in memory", _make_audit())
+        assert (await storage.get_async(doc_id))["masked_text"] == "in memory"
+        assert await storage.cleanup_async() == 0
+
+
+def _store_in_subprocess(path: str, text: str) -> str:
+    backend = storage.SqliteBackend(path)
+    try:
+        return backend.store(text, Audit(spans=[], total_found=0, sources_used=["regex"]))
+    finally:
+        backend.close()
+
+
+class TestSharedState:
+    def test_sqlite_shared_across_processes(self, tmp_path):
+        path = str(tmp_path / "docs.sqlite3")
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(2) as pool:
+            ids = pool.starmap(_store_in_subprocess, [(path, "from worker a"), (path, "from worker b")])
+        backend = storage.SqliteBackend(path)
+        assert sorted(backend.get(d)["masked_text"] for d in ids) == ["from worker a", "from worker b"]
+        backend.close()
+
+    def test_memory_backend_single_worker_ok(self):
+        with patch("app.storage.settings") as mock_settings:
+            mock_settings.STORAGE_BACKEND = "memory"
+            mock_settings.WEB_CONCURRENCY = 1
+            storage.check_shared_state("abc")
+
+    def test_memory_backend_multi_worker_rejected(self):
+        with patch("app.storage.settings") as mock_settings:
+            mock_settings.STORAGE_BACKEND = "memory"
+            mock_settings.WEB_CONCURRENCY = 4
+            with pytest.raises(storage.SharedStateError, match="4 workers"):
+                storage.check_shared_state("abc")
+
+    @pytest.mark.parametrize(
+        "argv", [["uvicorn", "app.main:app", "--workers", "4"], ["uvicorn", "--workers=4"], ["gunicorn", "-w", "4"]]
+    )
+    def test_memory_backend_workers_flag_rejected(self, argv):
+        with patch("app.storage.settings") as mock_settings, patch.object(sys, "argv", argv):
+            mock_settings.STORAGE_BACKEND = "memory"
+            mock_settings.WEB_CONCURRENCY = 1
+            with pytest.raises(storage.SharedStateError, match="4 workers"):
+                storage.check_shared_state("abc")
+
+    def test_reload_single_worker_allowed(self):
+        with (
+            patch("app.storage.settings") as mock_settings,
+            patch.object(sys, "argv", ["uvicorn", "app.main:app", "--reload"]),
+        ):
+            mock_settings.STORAGE_BACKEND = "memory"
+            mock_settings.WEB_CONCURRENCY = 1
+            storage.check_shared_state("abc")
+
+    def test_sqlite_requires_configured_key(self, tmp_path):
+        with (
+            patch("app.storage.settings") as mock_settings,
+            patch("app.storage.backend", storage.SqliteBackend(str(tmp_path / "docs.sqlite3"))),
+        ):
+            mock_settings.STORAGE_BACKEND = "sqlite"
+            mock_settings.FERNET_KEY = ""
+            with pytest.raises(storage.SharedStateError, match="FERNET_KEY"):
+                storage.check_shared_state("abc")
+
+    def test_sqlite_key_fingerprint_must_match(self, tmp_path):
+        path = str(tmp_path / "docs.sqlite3")
+        with patch("app.storage.settings") as mock_settings:
+            mock_settings.STORAGE_BACKEND = "sqlite"
+            mock_settings.FERNET_KEY = "configured"
+            with patch("app.storage.backend", storage.SqliteBackend(path)):
+                storage.check_shared_state("first-key")
+            with patch("app.storage.backend", storage.SqliteBackend(path)):
+                storage.check_shared_state("first-key")
+                with pytest.raises(storage.SharedStateError, match="fingerprint"):
+                    storage.check_shared_state("other-key")